@@ -1,7 +1,39 @@
 import os
 import os.path
+import sys
+import json
+import time
+import hashlib
+import subprocess
+import xml.etree.ElementTree as ET
+from concurrent.futures import ThreadPoolExecutor
 
 dir = './'
+cacheFile = os.path.join(dir, '.convert_resources_cache.json') # 记录上次成功转换时各.qrc文件（含其引用的资源文件）的内容哈希
+
+# 二进制模式下生成的_rc.py桩模块：只在导入时注册同名.rcc文件。
+# QResource.registerResource直接内存映射.rcc文件，不再需要编译、加载以bytes字面量内嵌的资源数据。
+stubTemplate = '''# Resource loader stub (Python 3)
+# Created by: Convert_Resources.py --binary
+# WARNING! All changes made in this file will be lost!
+
+import os
+from PySide2 import QtCore
+
+rccFile = os.path.join(os.path.dirname(os.path.abspath(__file__)), '{rccfile}')
+
+
+def qInitResources():
+    if not QtCore.QResource.registerResource(rccFile):
+        raise RuntimeError('Failed to register resource file ' + rccFile)
+
+
+def qCleanupResources():
+    QtCore.QResource.unregisterResource(rccFile)
+
+
+qInitResources()
+'''
 
 
 def listQrcFile():
@@ -18,13 +50,96 @@ def transPyFile(filename):
     return os.path.splitext(filename)[0] + '_rc.py'
 
 
-def runMain():
-    list = listQrcFile()
-    for qrcfile in list:
-        pyfile = transPyFile(qrcfile)
-        cmd = 'pyside2-rcc -o {pyfile} {qrcfile}'.format(pyfile=pyfile, qrcfile=qrcfile)
-        os.system(cmd)
+def transRccFile(filename):
+    return os.path.splitext(filename)[0] + '.rcc'
+
+
+def writeStubFile(pyfile, rccfile):
+    with open(os.path.join(dir, pyfile), 'w') as f:
+        f.write(stubTemplate.format(rccfile=os.path.basename(rccfile)))
+
+
+def qrcHash(qrcfile, binary):
+    '''
+    .qrc文件本身、其引用的全部资源文件及输出模式共同决定转换结果，一并计入哈希。
+    '''
+    digest = hashlib.sha256(b'binary' if binary else b'python')
+    qrcPath = os.path.join(dir, qrcfile)
+    with open(qrcPath, 'rb') as f:
+        digest.update(f.read())
+    for node in ET.parse(qrcPath).iter('file'):
+        resourcePath = os.path.join(os.path.dirname(qrcPath), node.text.strip())
+        digest.update(node.text.strip().encode())
+        try:
+            with open(resourcePath, 'rb') as f:
+                digest.update(f.read())
+        except OSError: # 缺失的资源文件交由pyside2-rcc报错
+            digest.update(b'missing')
+    return digest.hexdigest()
+
+
+def loadCache():
+    try:
+        with open(cacheFile, 'r') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def saveCache(cache):
+    with open(cacheFile, 'w') as f:
+        json.dump(cache, f, indent=2, sort_keys=True)
+
+
+def outputFiles(qrcfile, binary):
+    pyfile = transPyFile(qrcfile)
+    return [pyfile, transRccFile(qrcfile)] if binary else [pyfile]
+
+
+def convert(qrcfile, binary):
+    '''转换单个.qrc文件，返回(文件名, 是否成功, 耗时s, 错误输出)'''
+    pyfile = transPyFile(qrcfile)
+    start = time.perf_counter()
+    try:
+        if binary:
+            rccfile = transRccFile(qrcfile)
+            proc = subprocess.run(['pyside2-rcc', '-binary', '-o', rccfile, qrcfile], cwd=dir,
+                                  capture_output=True, text=True)
+            if proc.returncode == 0:
+                writeStubFile(pyfile, rccfile)
+        else:
+            proc = subprocess.run(['pyside2-rcc', '-o', pyfile, qrcfile], cwd=dir, capture_output=True, text=True)
+    except OSError as e: # 未安装pyside2-rcc（或不在PATH中）时按转换失败报告，不中断其他文件的转换
+        return qrcfile, False, time.perf_counter() - start, str(e)
+    return qrcfile, proc.returncode == 0, time.perf_counter() - start, proc.stderr.strip()
+
+
+def runMain(binary=False, force=False):
+    '''
+    binary为False时生成内嵌资源数据的_rc.py（默认）；
+    为True时生成二进制.rcc文件及负责注册它的_rc.py桩模块，导入方式不变（import resources_rc）。
+    增量转换：只转换哈希与上次不同或输出文件缺失的.qrc文件，并行调用pyside2-rcc，并输出各文件耗时。
+    force为True时忽略缓存，全部重新转换。
+    '''
+    cache = {} if force else loadCache()
+    hashes = {qrcfile: qrcHash(qrcfile, binary) for qrcfile in listQrcFile()}
+    list = [qrcfile for qrcfile, digest in hashes.items()
+            if cache.get(qrcfile) != digest
+            or not all(os.path.exists(os.path.join(dir, f)) for f in outputFiles(qrcfile, binary))]
+    for qrcfile in sorted(set(hashes) - set(list)):
+        print('{:<40} up to date'.format(qrcfile))
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=os.cpu_count() or 1) as executor:
+        for qrcfile, success, elapsed, error in executor.map(lambda f: convert(f, binary), list):
+            if success:
+                cache[qrcfile] = hashes[qrcfile]
+                print('{:<40} {:8.2f} s'.format(qrcfile, elapsed))
+            else:
+                cache.pop(qrcfile, None)
+                print('{:<40} FAILED\n{}'.format(qrcfile, error))
+    saveCache(cache)
+    print('{} of {} file(s) converted in {:.2f} s'.format(len(list), len(hashes), time.perf_counter() - start))
 
 
 if __name__ == "__main__":
-    runMain()
\ No newline at end of file
+    runMain('--binary' in sys.argv, '--force' in sys.argv)
\ No newline at end of file
@@ -2,6 +2,7 @@ from copy import deepcopy
 import PySide2.QtWidgets as QtW, PySide2.QtGui as QtG, PySide2.QtCore as QtC
 from ..customUtilities.customExceptions import *
 from ..customUtilities.customFunctions import *
+from ..customUtilities.sharedBuffer import sharedBuffers
 import numpy as np
 
 __all__ = ['QNumpyArray2DModel', 'QNumpyMatrixModel', 'QNumpyArray1DModel', 'QNumpyArray1Model_Transpose']
@@ -18,7 +19,7 @@ class QAbstractNumpyModel(QtC.QAbstractTableModel):
     operationFailure = QtC.Signal(str) # 操作失败的信号。
     def __init__(self, parent=None):
         super(QAbstractNumpyModel, self).__init__(parent)
-        self._editable = True  # 默认可编辑
+        self._editable = True  # 默认可编辑（使用者的设置，实际能否编辑还取决于数组是否可写，见isEditable）
         self._displayDecimal = None
         self.editConfirmed.connect(self.cacheArray)
         self.editRefuted.connect(self.cacheArray)
@@ -28,7 +29,11 @@ class QAbstractNumpyModel(QtC.QAbstractTableModel):
         return self.npArray_Orig.dtype
 
     def isEditable(self):
-        return self._editable
+        """
+        模型是否可编辑：使用者允许编辑（setEditable）且当前数组可写。
+        只读数组（如共享数组视图）不改变使用者的设置，换回可写数组后恢复。
+        """
+        return self._editable and self.npArray_Orig.flags.writeable
 
     def setEditable(self, editable):
         if type(editable) is not bool:
@@ -51,8 +56,14 @@ class QAbstractNumpyModel(QtC.QAbstractTableModel):
         """
         生成nparray_orig的一个缓存副本nparray，用于界面编辑。
         nparray_orig为实际外部传入的数组对象。对nparray_orig的改变会直接反应在外部，而副本nparray则不会。
+        若nparray_orig为只读视图（如共享数组），则不生成副本，nparray直接引用nparray_orig。
         """
-        self.npArray = deepcopy(self.npArray_Orig)
+        if not self.npArray_Orig.flags.writeable:
+            self.npArray = self.npArray_Orig
+        elif self.npArray_Orig.dtype == object:  # object数组需深拷贝其中的元素
+            self.npArray = deepcopy(self.npArray_Orig)
+        else:
+            self.npArray = self.npArray_Orig.copy()
         self.dataChanged.emit(self.index(0, 0),
                               self.index(self.npArray_Orig.shape[0] - 1, self.npArray_Orig.shape[1] - 1))
 
@@ -85,16 +96,30 @@ class QAbstractNumpy2DModel(QAbstractNumpyModel):
     def setNumpyArray(self, npArray):
         """
         设置数据模型对应的二维Numpy数组。
+        传入只读数组（如sharedBuffers中的共享数组视图）时直接引用而不拷贝，模型在引用只读数组期间不可编辑。
         """
-        if not isinstance(npArray, np.core.ndarray):
+        if not isinstance(npArray, np.ndarray):
             raise TypeError("The input argument must be a numpy.ndarray object.")
 
         self.layoutAboutToBeChanged.emit()
         self.npArray_Orig = npArray
-        self.npArray = np.empty((npArray.shape[0], npArray.shape[1]), dtype=npArray.dtype)
         self.cacheArray()
         self.layoutChanged.emit()
 
+    def setSharedBuffer(self, name, registry = sharedBuffers):
+        """
+        以共享数组登记处中的数组作为数据源，直接显示其只读视图，不拷贝数据。
+        生产者更新数组后调用refreshSharedBuffer通知视图刷新。
+        """
+        self.setNumpyArray(registry.get(name))
+
+    def refreshSharedBuffer(self):
+        """
+        通知视图数据已被生产者更新。
+        """
+        if self.npArray.shape[0] > 0 and self.npArray.shape[1] > 0:
+            self.dataChanged.emit(self.index(0, 0), self.index(self.npArray.shape[0] - 1, self.npArray.shape[1] - 1))
+
     def confirmEdit(self):
         """
         确认编辑时调用的槽函数。
@@ -158,8 +183,8 @@ class QAbstractNumpy2DModel(QAbstractNumpyModel):
         为使模型数据可在视图中编辑，需要额外返回ItemIsEditable这一flag。
         """
         flag = super(QAbstractNumpy2DModel, self).flags(index)
-        # 若_editable为True，则返回打开了ItemIsEditable的flag
-        return flag | QtC.Qt.ItemIsEditable if self._editable else flag
+        # 若模型可编辑，则返回打开了ItemIsEditable的flag
+        return flag | QtC.Qt.ItemIsEditable if self.isEditable() else flag
 
     def setData(self, index, value, role=QtC.Qt.EditRole):
         """
@@ -368,12 +393,11 @@ class QAbstractNumpy1DModel(QAbstractNumpyModel):
         """
         设置数据模型对应的一维Numpy数组。
         """
-        if not isinstance(npArray, np.core.ndarray):
+        if not isinstance(npArray, np.ndarray):
             raise TypeError("The input argument must be a numpy.ndarray object.")
 
         self.layoutAboutToBeChanged.emit()
         self.npArray_Orig = npArray
-        self.npArray = np.empty(npArray.shape[0], dtype=npArray.dtype)
         self.cacheArray()
         self.layoutChanged.emit()
 
@@ -0,0 +1,160 @@
+import PySide2.QtCore as QtC
+from ..customUtilities.customExceptions import QueryError
+from ..globalParameters import boringParameterFields
+
+__all__ = ['QPagedQueryModel']
+
+
+class PageLoader(QtC.QObject):
+    """
+    分页查询的后台加载器，运行于QPagedQueryModel的加载线程中。
+    """
+    pageLoaded = QtC.Signal(object, int, object)  # 查询键、页码、记录列表
+    pageFailed = QtC.Signal(object, int, str)  # 查询键、页码、错误信息
+
+    def __init__(self, queryClient, parent = None):
+        super(PageLoader, self).__init__(parent)
+        self.queryClient = queryClient
+
+    @QtC.Slot(object, int)
+    def load(self, queryKey, page):
+        try:
+            records = self.queryClient.getPage(queryKey, page)
+        except QueryError as e:
+            self.pageFailed.emit(queryKey, page, str(e))
+            return
+        self.pageLoaded.emit(queryKey, page, records)
+
+    @QtC.Slot(object, int)
+    def prefetch(self, queryKey, page):
+        """
+        只把页面读入QueryClient的缓存，不通知模型。预取失败时忽略，真正加载时再报告错误。
+        """
+        if self.queryClient.isPageCached(queryKey, page):
+            return
+        try:
+            self.queryClient.getPage(queryKey, page)
+        except QueryError:
+            pass
+
+
+class QPagedQueryModel(QtC.QAbstractTableModel):
+    """
+    分页加载的只读查询结果模型。
+    视图滚动到底部时通过canFetchMore/fetchMore请求下一页，页面在后台线程中由QueryClient获取（优先读取页面缓存），
+    加载完成后以beginInsertRows追加，界面线程不等待网络请求；每加载一页即在后台预取其下一页。
+    每行只保存一个按列排列的元组，内存占用与已浏览的行数成正比，而不是整个查询结果。
+    """
+    requestPage = QtC.Signal(object, int)
+    requestPrefetch = QtC.Signal(object, int)
+    loadingChanged = QtC.Signal(bool)
+    operationFailure = QtC.Signal(str)
+
+    def __init__(self, queryClient, parent = None):
+        """
+        构造器。
+        必要参数：
+            1. queryClient: QueryClient对象。
+        """
+        super(QPagedQueryModel, self).__init__(parent)
+        self.queryClient = queryClient
+        self.columns = ['record_time'] + list(boringParameterFields)
+        self.rows = []
+        self.queryKey = None
+        self.__nextPage = 0
+        self.__exhausted = True
+        self.__loading = False
+        self.loader = PageLoader(queryClient)
+        self.loaderThread = QtC.QThread(self)
+        self.loader.moveToThread(self.loaderThread)
+        self.requestPage.connect(self.loader.load)
+        self.requestPrefetch.connect(self.loader.prefetch)
+        self.loader.pageLoaded.connect(self.onPageLoaded)
+        self.loader.pageFailed.connect(self.onPageFailed)
+        self.loaderThread.start()
+        QtC.QCoreApplication.instance().aboutToQuit.connect(self.loaderThread.quit)
+
+    def setQuery(self, start, end, fields = None, pageSize = None):
+        """
+        设置新的查询，清空已加载的行。视图会随后通过fetchMore加载第一页。
+        参数：
+            1. start, end: 查询的时间范围[start, end)，datetime对象。
+            2. fields: 查询的字段，默认为全部掘进参数。
+            3. pageSize: 每页的记录数，默认取gParam['qc_PSize']。
+        """
+        self.beginResetModel()
+        self.queryKey = self.queryClient.queryKey(start, end, fields, pageSize)
+        self.columns = ['record_time'] + list(fields or boringParameterFields)
+        self.rows = []
+        self.__nextPage = 0
+        self.__exhausted = False
+        self.setLoading(False)
+        self.endResetModel()
+
+    def setLoading(self, loading):
+        if loading != self.__loading:
+            self.__loading = loading
+            self.loadingChanged.emit(loading)
+
+    def isLoading(self):
+        return self.__loading
+
+    def rowCount(self, parent = QtC.QModelIndex()):
+        return 0 if parent.isValid() else len(self.rows)
+
+    def columnCount(self, parent = QtC.QModelIndex()):
+        return 0 if parent.isValid() else len(self.columns)
+
+    def data(self, index, role = QtC.Qt.DisplayRole):
+        if not index.isValid() or not 0 <= index.row() < len(self.rows):
+            return None
+        if role == QtC.Qt.DisplayRole:
+            value = self.rows[index.row()][index.column()]
+            return '' if value is None else str(value)
+        elif role == QtC.Qt.TextAlignmentRole:
+            return QtC.Qt.AlignHCenter | QtC.Qt.AlignVCenter
+        return None
+
+    def headerData(self, section, orientation, role = QtC.Qt.DisplayRole):
+        if orientation == QtC.Qt.Horizontal and role == QtC.Qt.DisplayRole:
+            return self.columns[section]
+        return super(QPagedQueryModel, self).headerData(section, orientation, role)
+
+    def canFetchMore(self, parent = QtC.QModelIndex()):
+        return not parent.isValid() and not self.__exhausted and not self.__loading
+
+    def fetchMore(self, parent = QtC.QModelIndex()):
+        if not self.canFetchMore(parent):
+            return
+        self.setLoading(True)
+        self.requestPage.emit(self.queryKey, self.__nextPage)
+
+    @QtC.Slot(object, int, object)
+    def onPageLoaded(self, queryKey, page, records):
+        if queryKey != self.queryKey or page != self.__nextPage: # 查询已被替换，丢弃旧查询的结果
+            return
+        self.__nextPage += 1
+        self.__exhausted = len(records) < queryKey[3]
+        if records:
+            self.beginInsertRows(QtC.QModelIndex(), len(self.rows), len(self.rows) + len(records) - 1)
+            self.rows.extend(tuple(record.get(column) for column in self.columns) for record in records)
+            self.endInsertRows()
+        self.setLoading(False)
+        if not self.__exhausted:
+            self.requestPrefetch.emit(queryKey, self.__nextPage)
+
+    @QtC.Slot(object, int, str)
+    def onPageFailed(self, queryKey, page, msg):
+        if queryKey != self.queryKey:
+            return
+        self.__exhausted = True # 失败后不再自动请求，避免视图反复触发fetchMore；由retry重试
+        self.setLoading(False)
+        self.operationFailure.emit(msg)
+
+    def retry(self):
+        """
+        加载失败后重新请求下一页。
+        """
+        if self.queryKey is not None and self.__exhausted and not self.__loading:
+            self.__exhausted = False
+            self.fetchMore()
@@ -29,4 +29,17 @@ class MatrixSizeError(Exception):
         self.input = input
 
     def __str__(self):
-        return '\nThe size of inputed matrix ' + str(self.input) + ' is incorrect.\nIt must be a square matrix.'
\ No newline at end of file
+        return '\nThe size of inputed matrix ' + str(self.input) + ' is incorrect.\nIt must be a square matrix.'
+
+
+class QueryError(Exception):
+    """
+    服务端查询失败异常。
+    """
+
+    def __init__(self, url, msg):
+        self.url = url
+        self.msg = msg
+
+    def __str__(self):
+        return '\nQuery to ' + str(self.url) + ' failed: ' + str(self.msg)
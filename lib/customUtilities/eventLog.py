@@ -0,0 +1,180 @@
+import math
+import struct
+import logging
+from .timeUtilities import localNowMs, toIsoformat
+
+__all__ = ['DaemonEvent', 'BinaryEventLog', 'readBinaryEventLog']
+
+# 接口名称 → 日志中显示的数据名称
+endpointNames = {
+    'alive': 'connection status',
+    'boring_parameter': 'boring parameters',
+    'muck_information': 'muck information',
+    'vibration_information': 'vibration information',
+    'rock_information': 'rock information'
+}
+
+# 事件代码 → 日志文本模板
+eventMessages = {
+    'timeout': 'Request timed out.',
+    'connection_failed': 'Connection failed.',
+    'http_error': 'Unknown error occurred when establishing connection (HTTP {detail}).',
+    'invalid_response': 'Invalid response from server.',
+    'record_missing': 'Failed to get in-time {endpoint}.',
+    'message': '{detail}'
+}
+
+
+class DaemonEvent:
+    """
+    一条后台事件，以字段而不是格式化好的文本在线程间传递。
+    创建及发送的开销与一个小元组相当；只有日志界面可见（或写文本日志文件）时才调用format生成文本。
+    """
+    __slots__ = ('timestamp', 'level', 'machine', 'endpoint', 'code', 'latency', 'detail')
+
+    def __init__(self, level, endpoint, code, latency = None, detail = None, machine = '', timestamp = None):
+        """
+        构造器。
+        必要参数：
+            1. level: logging中的日志级别，如logging.WARNING。
+            2. endpoint: 接口名称，如'boring_parameter'，与性能指标一致。
+            3. code: 事件代码，见eventMessages。
+        可选参数：
+            1. latency: 请求耗时ms。
+            2. detail: 附加信息，整数（如HTTP状态码）或文本（code为'message'时即日志文本）。
+            3. machine: 机器名称。
+            4. timestamp: 本机毫秒时间戳，默认为当前时间。
+        """
+        self.timestamp = localNowMs() if timestamp is None else timestamp
+        self.level = level
+        self.machine = machine
+        self.endpoint = endpoint
+        self.code = code
+        self.latency = latency
+        self.detail = detail
+
+    @classmethod
+    def message(cls, text, level = logging.INFO, machine = ''):
+        """
+        由一段文本构造事件，用于界面自身的日志。
+        """
+        return cls(level, '', 'message', detail = text, machine = machine)
+
+    def text(self):
+        return eventMessages.get(self.code, self.code).format(
+            endpoint = endpointNames.get(self.endpoint, self.endpoint), detail = self.detail)
+
+    def format(self, withMachine = False):
+        """
+        生成日志文本，形如“12:00:00 [1号机] Request timed out. (3001 ms)”。
+        """
+        parts = [toIsoformat(self.timestamp)[11:]]
+        if withMachine and self.machine:
+            parts.append('[' + self.machine + ']')
+        parts.append(self.text())
+        if self.latency is not None:
+            parts.append('({:.0f} ms)'.format(self.latency))
+        return ' '.join(parts)
+
+    def __str__(self):
+        return self.format(True)
+
+    def __repr__(self):
+        return 'DaemonEvent({})'.format(', '.join(
+            '{}={!r}'.format(field, getattr(self, field)) for field in self.__slots__))
+
+
+# 二进制日志格式（小端）：
+#     文件头：MAGIC。每次打开追加写入时重新写一次文件头，字符串编号随之重新开始。
+#     字符串定义：类型1，编号uint16，长度uint16，utf-8字节。机器名称、接口名称、事件代码只在首次出现时写出。
+#     事件：类型2（无附加信息）/3（整数附加信息int64）/4（文本附加信息：长度uint16，utf-8字节），
+#           时间戳int64、级别uint8、机器/接口/事件代码编号uint16、耗时float32（NaN表示无）。
+MAGIC = b'ABEV\x01'
+_stringStruct = struct.Struct('<BHH')
+_eventStruct = struct.Struct('<BqBHHHf')
+_intStruct = struct.Struct('<q')
+_lengthStruct = struct.Struct('<H')
+
+
+class BinaryEventLog:
+    """
+    二进制事件日志。
+    每条事件按固定格式写出数十字节，不做任何文本格式化，可长期开启；用readBinaryEventLog离线读回。
+    只应在一个线程中写入。
+    """
+    def __init__(self, filename):
+        self.filename = filename
+        self.file = open(filename, 'ab')
+        self.file.write(MAGIC)
+        self.__stringIds = {}
+
+    def __stringId(self, string):
+        stringId = self.__stringIds.get(string)
+        if stringId is None:
+            stringId = self.__stringIds[string] = len(self.__stringIds)
+            data = string.encode('utf-8')
+            self.file.write(_stringStruct.pack(1, stringId, len(data)) + data)
+        return stringId
+
+    def write(self, event):
+        ids = (self.__stringId(event.machine), self.__stringId(event.endpoint), self.__stringId(event.code))
+        latency = math.nan if event.latency is None else event.latency
+        if event.detail is None:
+            self.file.write(_eventStruct.pack(2, event.timestamp, event.level, *ids, latency))
+        elif isinstance(event.detail, int):
+            self.file.write(_eventStruct.pack(3, event.timestamp, event.level, *ids, latency)
+                            + _intStruct.pack(event.detail))
+        else:
+            data = str(event.detail).encode('utf-8')[:65535]
+            self.file.write(_eventStruct.pack(4, event.timestamp, event.level, *ids, latency)
+                            + _lengthStruct.pack(len(data)) + data)
+
+    def flush(self):
+        self.file.flush()
+
+    def close(self):
+        self.file.close()
+
+
+def readBinaryEventLog(filename):
+    """
+    读回二进制事件日志，依次产生DaemonEvent。文件末尾不完整的事件（写入时进程被终止）被忽略。
+    """
+    with open(filename, 'rb') as f:
+        data = f.read()
+    strings = {}
+    position = 0
+    while position < len(data):
+        if data.startswith(MAGIC, position):
+            strings = {}
+            position += len(MAGIC)
+            continue
+        recordType = data[position]
+        try:
+            if recordType == 1:
+                _, stringId, length = _stringStruct.unpack_from(data, position)
+                position += _stringStruct.size
+                if position + length > len(data):
+                    return
+                strings[stringId] = data[position:position + length].decode('utf-8', 'replace')
+                position += length
+                continue
+            if recordType not in (2, 3, 4):
+                raise ValueError('Corrupted event log at byte {}.'.format(position))
+            _, timestamp, level, machineId, endpointId, codeId, latency = _eventStruct.unpack_from(data, position)
+            position += _eventStruct.size
+            detail = None
+            if recordType == 3:
+                detail = _intStruct.unpack_from(data, position)[0]
+                position += _intStruct.size
+            elif recordType == 4:
+                length = _lengthStruct.unpack_from(data, position)[0]
+                position += _lengthStruct.size
+                if position + length > len(data):
+                    return
+                detail = data[position:position + length].decode('utf-8', 'replace')
+                position += length
+        except struct.error:
+            return
+        yield DaemonEvent(level, strings[endpointId], strings[codeId], None if math.isnan(latency) else latency,
+                          detail, strings[machineId], timestamp)
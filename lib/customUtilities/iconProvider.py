@@ -0,0 +1,34 @@
+import qtawesome as qta
+
+__all__ = ['IconProvider', 'iconProvider']
+
+
+class IconProvider:
+    """
+    带缓存的qtawesome图标提供器。
+    qta.icon每次调用都会重新渲染字体图标，窗口焦点频繁切换时开销明显；
+    此处以(name, color, scale_factor)为键缓存QIcon对象，同一图标只渲染一次。
+    """
+    def __init__(self):
+        self.__cache = {}
+
+    def icon(self, name, color = 'deepskyblue', scale_factor = 1.0):
+        key = (name, color, scale_factor)
+        icon = self.__cache.get(key)
+        if icon is None:
+            icon = self.__cache[key] = qta.icon(name, color = color, scale_factor = scale_factor)
+        return icon
+
+    def preload(self, names, colors, scale_factor = 1.0):
+        """
+        预先渲染names × colors的全部组合。
+        """
+        for name in names:
+            for color in colors:
+                self.icon(name, color, scale_factor)
+
+    def clear(self):
+        self.__cache.clear()
+
+
+iconProvider = IconProvider()  # 全局共享的图标提供器，需在QApplication创建后使用
@@ -0,0 +1,135 @@
+import numpy as np
+from .timeSeriesBuffer import RingBuffer
+
+__all__ = ['IndicatorEngine']
+
+
+class IndicatorEngine:
+    """
+    TBM衍生指标计算引擎。
+    从掘进参数的RingBuffer中增量读取新样本，按数组整体（向量化）计算衍生指标及其滑动均值/标准差，
+    结果写入自身的RingBuffer，可作为额外的曲线序列绘制。
+    输入字段及单位：
+        total_thrust        总推力，kN
+        torque              刀盘扭矩，kN·m
+        RPM                 刀盘转速，r/min
+        penetration         贯入度，mm/r
+        propulsion_rate     推进速度，mm/min
+    输出指标：
+        thrust_per_cutter   单刀推力，kN
+        FPI                 场贯入指数，单刀推力/贯入度，kN/(mm/r)
+        TPI                 扭矩贯入指数，单刀滚动力/贯入度，kN/(mm/r)
+        specific_energy     比能，F/A + 2πNT/(Av)，MJ/m³
+    """
+    indicators = ('thrust_per_cutter', 'FPI', 'TPI', 'specific_energy')
+
+    def __init__(self, source, fields, cutterheadDiameter, cutterCount, window = 60,
+                 torqueArmRatio = 0.3, capacity = None):
+        """
+        构造器。
+        必要参数：
+            1. source: 掘进参数RingBuffer。
+            2. fields: source中各列对应的字段名称序列。
+            3. cutterheadDiameter: 刀盘直径，m。
+            4. cutterCount: 滚刀数量。
+        可选参数：
+            1. window: 滑动统计的窗口长度（样本数）。
+            2. torqueArmRatio: 滚刀平均力臂与刀盘直径之比，用于由扭矩估算单刀滚动力。
+            3. capacity: 结果缓冲区容量，默认与source一致。
+        """
+        self.source = source
+        self.columns = {field: i for i, field in enumerate(fields)}
+        self.cutterheadDiameter = cutterheadDiameter
+        self.cutterCount = cutterCount
+        self.window = window
+        self.torqueArmRatio = torqueArmRatio
+        # 结果列布局为：[指标 × k, 滑动均值 × k, 滑动标准差 × k]
+        self.result = RingBuffer(source.capacity if capacity is None else capacity, 3 * len(self.indicators))
+        self._processedCount = 0
+
+    @property
+    def seriesNames(self):
+        """
+        可绘制的序列名称列表。
+        """
+        return list(self.indicators) + [name + '_mean' for name in self.indicators] \
+               + [name + '_std' for name in self.indicators]
+
+    def compute(self, values):
+        """
+        对形如(n, 字段数)的掘进参数数组整体计算衍生指标，返回形如(n, 指标数)的数组。
+        分母为零（停机）时结果为NaN。
+        """
+        thrust = values[:, self.columns['total_thrust']]
+        torque = values[:, self.columns['torque']]
+        rpm = values[:, self.columns['RPM']]
+        penetration = values[:, self.columns['penetration']]
+        velocity = values[:, self.columns['propulsion_rate']] / 1000  # mm/min → m/min
+        area = np.pi * self.cutterheadDiameter ** 2 / 4
+        thrustPerCutter = thrust / self.cutterCount
+        rollingForce = torque / (self.cutterCount * self.torqueArmRatio * self.cutterheadDiameter)
+        with np.errstate(divide = 'ignore', invalid = 'ignore'):
+            fpi = np.where(penetration > 0, thrustPerCutter / penetration, np.nan)
+            tpi = np.where(penetration > 0, rollingForce / penetration, np.nan)
+            specificEnergy = np.where(velocity > 0,
+                                      (thrust / area + 2 * np.pi * rpm * torque / (area * velocity)) / 1000,
+                                      np.nan)
+        return np.column_stack((thrustPerCutter, fpi, tpi, specificEnergy))
+
+    def rollingStatistics(self, history, new):
+        """
+        以前缀和计算new中每一行在窗口内（含history中的前序行）的均值与标准差。
+        忽略NaN，窗口内无有效值时结果为NaN。
+        """
+        extended = np.vstack((history, new))
+        valid = ~np.isnan(extended)
+        filled = np.where(valid, extended, 0.0)
+        zeros = np.zeros((1, extended.shape[1]))
+        sum1 = np.vstack((zeros, np.cumsum(filled, axis = 0)))
+        sum2 = np.vstack((zeros, np.cumsum(filled ** 2, axis = 0)))
+        count = np.vstack((zeros, np.cumsum(valid, axis = 0)))
+        end = np.arange(history.shape[0] + 1, extended.shape[0] + 1)
+        start = np.maximum(end - self.window, 0)
+        n = count[end] - count[start]
+        with np.errstate(divide = 'ignore', invalid = 'ignore'):
+            mean = (sum1[end] - sum1[start]) / n
+            variance = np.maximum((sum2[end] - sum2[start]) / n - mean ** 2, 0.0)
+        return mean, np.sqrt(variance)
+
+    def update(self):
+        """
+        处理source中自上次更新以来新增的样本。
+        新样本一次性整体计算，不逐条循环。
+        """
+        newCount = min(self.source.totalCount - self._processedCount, len(self.source))
+        if newCount <= 0:
+            return 0
+        times = self.source.times()[-newCount:]
+        indicatorValues = self.compute(self.source.values()[-newCount:])
+        width = len(self.indicators)
+        history = self.result.values()[-(self.window - 1):, :width] if self.window > 1 \
+            else np.empty((0, width))
+        mean, std = self.rollingStatistics(history, indicatorValues)
+        self.result.extend(times, np.hstack((indicatorValues, mean, std)))
+        self._processedCount = self.source.totalCount
+        return newCount
+
+    def reset(self):
+        """
+        清空结果，下次更新时按source中的全部样本重新计算。source被整体替换（如载入历史数据）后调用。
+        """
+        self.result.clear()
+        self._processedCount = self.source.totalCount - len(self.source)
+
+    def series(self, name, start = None, end = None):
+        """
+        返回指定序列的(times, values)，times为毫秒时间戳。
+        调用前自动处理新样本。start/end为None时返回全部数据。
+        """
+        self.update()
+        column = self.seriesNames.index(name)
+        if start is None and end is None:
+            return self.result.times(), self.result.values()[:, column]
+        times, values = self.result.slice(start if start is not None else np.iinfo(np.int64).min,
+                                          end if end is not None else np.iinfo(np.int64).max)
+        return times, values[:, column]
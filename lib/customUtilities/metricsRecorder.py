@@ -0,0 +1,181 @@
+import bisect
+import csv
+import json
+import threading
+import time
+import datetime
+from .timeUtilities import localNowMs, toEpochMs
+
+__all__ = ['MetricsRecorder', 'EndpointMetrics']
+
+
+class EndpointMetrics:
+    """
+    单个接口的性能统计数据。
+    请求时延以直方图形式累计，另记录响应体大小、解码耗时、错误/超时次数及“记录时刻→绘图完成”的端到端时延。
+    """
+    latencyBuckets = (5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000, float('inf'))  # 时延直方图的桶上界，单位ms
+
+    def __init__(self, endpoint):
+        self.endpoint = endpoint
+        self.requestCount = 0
+        self.errorCount = 0
+        self.timeoutCount = 0
+        self.latencyHistogram = [0] * len(self.latencyBuckets)
+        self.latencySum = 0.0
+        self.latencyMax = 0.0
+        self.payloadBytes = 0
+        self.decodeSum = 0.0
+        self.decodeCount = 0
+        self.renderLatencySum = 0.0
+        self.renderLatencyMax = 0.0
+        self.renderCount = 0
+
+    def addLatency(self, latency):
+        self.requestCount += 1
+        self.latencySum += latency
+        self.latencyMax = max(self.latencyMax, latency)
+        self.latencyHistogram[bisect.bisect_left(self.latencyBuckets, latency)] += 1
+
+    def latencyPercentile(self, percent):
+        """
+        由直方图估计时延的百分位数，返回所在桶的上界（ms）。
+        """
+        total = sum(self.latencyHistogram)
+        if total == 0:
+            return 0.0
+        threshold = total * percent / 100.0
+        accumulated = 0
+        for bound, count in zip(self.latencyBuckets, self.latencyHistogram):
+            accumulated += count
+            if accumulated >= threshold:
+                return bound if bound != float('inf') else self.latencyMax
+        return self.latencyMax
+
+    def summary(self):
+        """
+        返回统计摘要字典，用于界面显示及导出。
+        """
+        latencyCount = sum(self.latencyHistogram)
+        return {
+            'endpoint': self.endpoint,
+            'requests': self.requestCount,
+            'errors': self.errorCount,
+            'timeouts': self.timeoutCount,
+            'latency_mean_ms': self.latencySum / latencyCount if latencyCount else 0.0,
+            'latency_p50_ms': self.latencyPercentile(50),
+            'latency_p95_ms': self.latencyPercentile(95),
+            'latency_max_ms': self.latencyMax,
+            'payload_bytes': self.payloadBytes,
+            'payload_mean_bytes': self.payloadBytes / self.requestCount if self.requestCount else 0.0,
+            'decode_mean_ms': self.decodeSum / self.decodeCount if self.decodeCount else 0.0,
+            'render_latency_mean_ms': self.renderLatencySum / self.renderCount if self.renderCount else 0.0,
+            'render_latency_max_ms': self.renderLatencyMax,
+        }
+
+
+class MetricsRecorder:
+    """
+    后台监控的性能指标记录器。
+    DaemonWorker在后台线程中写入，DaemonWidget在界面线程中读取，因此所有操作均加锁。
+    """
+    summaryKeys = ('endpoint', 'requests', 'errors', 'timeouts',
+                   'latency_mean_ms', 'latency_p50_ms', 'latency_p95_ms', 'latency_max_ms',
+                   'payload_bytes', 'payload_mean_bytes', 'decode_mean_ms',
+                   'render_latency_mean_ms', 'render_latency_max_ms')
+
+    def __init__(self):
+        self.__lock = threading.Lock()
+        self.__endpoints = {}
+        self.startTime = datetime.datetime.now()
+
+    def __getEndpoint(self, endpoint):
+        if endpoint not in self.__endpoints:
+            self.__endpoints[endpoint] = EndpointMetrics(endpoint)
+        return self.__endpoints[endpoint]
+
+    def recordRequest(self, endpoint, latency, payloadBytes = 0, decodeTime = None):
+        """
+        记录一次成功返回的请求。
+        参数：
+            1. endpoint: 接口名称。
+            2. latency: 请求往返时延（ms）。
+            3. payloadBytes: 响应体字节数。
+            4. decodeTime: JSON解码耗时（ms），为None时不计入。
+        """
+        with self.__lock:
+            metrics = self.__getEndpoint(endpoint)
+            metrics.addLatency(latency)
+            metrics.payloadBytes += payloadBytes
+            if decodeTime is not None:
+                metrics.decodeSum += decodeTime
+                metrics.decodeCount += 1
+
+    def recordError(self, endpoint):
+        with self.__lock:
+            metrics = self.__getEndpoint(endpoint)
+            metrics.requestCount += 1
+            metrics.errorCount += 1
+
+    def recordTimeout(self, endpoint):
+        with self.__lock:
+            metrics = self.__getEndpoint(endpoint)
+            metrics.requestCount += 1
+            metrics.timeoutCount += 1
+
+    def recordRendered(self, endpoint, recordTime, now = None):
+        """
+        记录一条数据绘制完成，计算自record_time至绘图完成的端到端时延。
+        recordTime可为毫秒时间戳（记录对象的recordTime）、isoformat字符串或datetime对象。
+        now为绘图完成时的服务端时间（ServerClock.serverNowMs），省略时取本机时间，此时时延包含两端的时钟偏差。
+        """
+        latency = (localNowMs() if now is None else now) - toEpochMs(recordTime)
+        with self.__lock:
+            metrics = self.__getEndpoint(endpoint)
+            metrics.renderLatencySum += latency
+            metrics.renderLatencyMax = max(metrics.renderLatencyMax, latency)
+            metrics.renderCount += 1
+
+    def summaries(self):
+        """
+        返回所有接口的统计摘要列表。
+        """
+        with self.__lock:
+            return [metrics.summary() for metrics in self.__endpoints.values()]
+
+    def histograms(self):
+        with self.__lock:
+            return {endpoint: list(metrics.latencyHistogram) for endpoint, metrics in self.__endpoints.items()}
+
+    def reset(self):
+        with self.__lock:
+            self.__endpoints.clear()
+            self.startTime = datetime.datetime.now()
+
+    def exportToFile(self, filename):
+        """
+        将统计结果导出到文件。
+        扩展名为.json时导出摘要及完整直方图，否则导出CSV格式的摘要表。
+        """
+        summaries = self.summaries()
+        if filename.lower().endswith('.json'):
+            with open(filename, 'w', encoding='utf-8') as f:
+                json.dump({
+                    'start_time': self.startTime.isoformat(),
+                    'export_time': datetime.datetime.now().isoformat(),
+                    'latency_buckets_ms': [str(bound) for bound in EndpointMetrics.latencyBuckets],
+                    'summaries': summaries,
+                    'histograms': self.histograms()
+                }, f, ensure_ascii=False, indent=2)
+        else:
+            with open(filename, 'w', encoding='utf-8', newline='') as f:
+                writer = csv.DictWriter(f, fieldnames=self.summaryKeys)
+                writer.writeheader()
+                writer.writerows(summaries)
+
+    @staticmethod
+    def clock():
+        """
+        计时用的单调时钟，单位ms。
+        """
+        return time.perf_counter() * 1000
@@ -0,0 +1,29 @@
+import importlib
+import time
+import PySide2.QtCore as QtC
+
+__all__ = ['ModuleWarmer']
+
+
+class ModuleWarmer(QtC.QThread):
+    """
+    后台模块预热线程。
+    在用户输入登录信息期间，于后台线程中依次导入耗时较长的模块，登录后主窗口再导入时直接命中sys.modules。
+    导入失败的模块会被跳过，留待真正使用时在界面线程中报错。
+    """
+    moduleLoaded = QtC.Signal(str, float)  # 模块名、导入耗时（ms）
+
+    def __init__(self, moduleNames, parent = None):
+        super(ModuleWarmer, self).__init__(parent)
+        self.moduleNames = list(moduleNames)
+
+    def run(self):
+        for moduleName in self.moduleNames:
+            if self.isInterruptionRequested():
+                return
+            start = time.perf_counter()
+            try:
+                importlib.import_module(moduleName)
+            except Exception:
+                continue
+            self.moduleLoaded.emit(moduleName, (time.perf_counter() - start) * 1000)
@@ -0,0 +1,153 @@
+import numpy as np
+from ..globalParameters import boringParameterFields
+from .timeUtilities import toEpochMs, toIsoformat
+
+__all__ = ['Record', 'BoringParameterRecord', 'RockInformationRecord', 'PayloadRecord']
+
+
+class Record:
+    """
+    后台线程发往界面线程的一条记录。
+    使用__slots__，不为每个样本创建字典；record_time在后台线程中解析一次，以int64毫秒时间戳保存于recordTime，
+    下游（缓冲区、聚合金字塔、性能指标、本地存储）直接使用，不再重复解析字符串。
+    保留record['字段名']的字典式访问以兼容旧代码，其中record['record_time']返回服务端传回的isoformat字符串。
+    synthetic为True表示记录不是服务端返回的，而是请求失败时重发的上一条记录（retimed），只用于保持绘图连续，不应存储。
+    """
+    __slots__ = ('recordTime', 'isoTime', 'synthetic')
+    fields = ()
+
+    def __init__(self, recordTime, isoTime = None):
+        """
+        构造器。
+        必要参数：
+            1. recordTime: 毫秒时间戳。
+        可选参数：
+            1. isoTime: 服务端传回的isoformat字符串，为None时在需要时由recordTime生成。
+        """
+        self.recordTime = recordTime
+        self.isoTime = isoTime
+        self.synthetic = False
+
+    @property
+    def datetime64(self):
+        return np.datetime64(self.recordTime, 'ms')
+
+    def __getitem__(self, key):
+        if key == 'record_time':
+            if self.isoTime is None:
+                self.isoTime = toIsoformat(self.recordTime, 'auto')
+            return self.isoTime
+        if key in self.fields:
+            return getattr(self, key)
+        raise KeyError(key)
+
+    def __contains__(self, key):
+        return key == 'record_time' or key in self.fields
+
+    def get(self, key, default = None):
+        try:
+            return self[key]
+        except KeyError:
+            return default
+
+    def keys(self):
+        return ('record_time',) + tuple(self.fields)
+
+    def asDict(self):
+        """
+        转化为字典（如写入json时使用）。
+        """
+        return {key: self[key] for key in self.keys()}
+
+    def retimed(self, recordTime, isoTime = None):
+        """
+        返回记录时间替换为recordTime的副本（synthetic为True），用于请求失败时重发上一条记录。
+        不修改原记录，因为它可能仍在界面线程中使用。
+        """
+        record = type(self)(recordTime, isoTime, *(getattr(self, field) for field in self.fields))
+        record.synthetic = True
+        return record
+
+    @classmethod
+    def fromDict(cls, record):
+        """
+        由服务端返回的记录字典构造，字段转化为浮点数，空值转化为NaN。
+        """
+        return cls(toEpochMs(record['record_time']), record['record_time'],
+                   *(np.nan if record.get(field) is None else float(record[field]) for field in cls.fields))
+
+    def __repr__(self):
+        return '{}({})'.format(type(self).__name__,
+                               ', '.join('{}={!r}'.format(key, self[key]) for key in self.keys()))
+
+
+class BoringParameterRecord(Record):
+    """
+    一条掘进参数，字段与boringParameterFields一致。
+    """
+    __slots__ = boringParameterFields
+    fields = boringParameterFields
+
+    def __init__(self, recordTime, isoTime = None, *values):
+        super(BoringParameterRecord, self).__init__(recordTime, isoTime)
+        for field, value in zip(self.fields, values or (0.0,) * len(self.fields)):
+            setattr(self, field, value)
+
+    def values(self):
+        """
+        按boringParameterFields排列的一维数组，可直接写入RingBuffer/AggregatePyramid。
+        """
+        return np.array([getattr(self, field) for field in self.fields], dtype = float)
+
+
+class RockInformationRecord(Record):
+    """
+    一条岩石信息。
+    """
+    __slots__ = ('rock_grade', 'UCS', 'Kv')
+    fields = ('rock_grade', 'UCS', 'Kv')
+
+    def __init__(self, recordTime, isoTime = None, rock_grade = 0, UCS = 0.0, Kv = 0.0):
+        super(RockInformationRecord, self).__init__(recordTime, isoTime)
+        self.rock_grade = rock_grade
+        self.UCS = UCS
+        self.Kv = Kv
+
+    @classmethod
+    def fromDict(cls, record):
+        """
+        岩石等级保持为整数，其余字段转化为浮点数。
+        """
+        return cls(toEpochMs(record['record_time']), record['record_time'], record.get('rock_grade'),
+                   *(np.nan if record.get(field) is None else float(record[field]) for field in ('UCS', 'Kv')))
+
+
+class PayloadRecord(Record):
+    """
+    字段不固定的记录（渣土信息、振动信息），只解析record_time，其余字段原样保存在payload字典中。
+    """
+    __slots__ = ('payload',)
+
+    def __init__(self, recordTime, isoTime = None, payload = None):
+        super(PayloadRecord, self).__init__(recordTime, isoTime)
+        self.payload = payload if payload is not None else {}
+
+    def __getitem__(self, key):
+        if key == 'record_time':
+            return super(PayloadRecord, self).__getitem__(key)
+        return self.payload[key]
+
+    def __contains__(self, key):
+        return key == 'record_time' or key in self.payload
+
+    def keys(self):
+        return ('record_time',) + tuple(key for key in self.payload if key != 'record_time')
+
+    def retimed(self, recordTime, isoTime = None):
+        record = PayloadRecord(recordTime, isoTime, self.payload)
+        record.synthetic = True
+        return record
+
+    @classmethod
+    def fromDict(cls, record):
+        return cls(toEpochMs(record['record_time']), record['record_time'], record)
@@ -0,0 +1,118 @@
+import time
+import PySide2.QtCore as QtC
+
+__all__ = ['RepaintScheduler']
+
+
+class RepaintScheduler(QtC.QObject):
+    """
+    限帧率的重绘调度器。
+    绘图控件不再在每次数据更新时立即重绘，而是调用requestRepaint登记重绘请求：
+        1. 所在MDI子窗口可见时，按不超过fps的频率合并执行重绘；
+        2. 所在子窗口被隐藏或最小化时，只保留请求，待窗口重新可见时重绘一次。
+    没有待执行的请求时计时器停止，空闲时不占用CPU。
+    """
+    repainted = QtC.Signal(object)  # 每次实际重绘后发出，参数为绘图控件
+    def __init__(self, fps = 10, parent = None):
+        super(RepaintScheduler, self).__init__(parent)
+        self.__owners = {}  # 绘图控件 → (所在子窗口, 重绘函数, 安装了事件过滤器的对象)
+        self.__filters = {}  # 安装了事件过滤器的对象 → 引用它的绘图控件数
+        self.__pending = []  # 有待执行重绘请求的绘图控件，按请求顺序排列
+        self.__lastFlush = 0.0
+        self.timer = QtC.QTimer(self)
+        self.timer.setSingleShot(True)
+        self.timer.timeout.connect(self.flush)
+        self.setFps(fps)
+
+    def setFps(self, fps):
+        if fps <= 0:
+            raise ValueError("FPS must be positive.")
+        self.fps = fps
+        self.__interval = 1000.0 / fps
+
+    def register(self, widget, subWindow, renderFunc):
+        """
+        登记绘图控件。
+        参数：
+            1. widget: 绘图控件。
+            2. subWindow: 控件所在的MDI子窗口（或其他顶层容器）。
+            3. renderFunc: 实际执行重绘的无参函数。
+        """
+        self.unregister(widget)
+        topLevel = subWindow.window()
+        watched = (subWindow,) if topLevel is subWindow else (subWindow, topLevel)
+        self.__owners[widget] = (subWindow, renderFunc, watched)
+        for obj in watched:
+            if obj not in self.__filters:
+                obj.installEventFilter(self)
+            self.__filters[obj] = self.__filters.get(obj, 0) + 1
+
+    def unregister(self, widget):
+        """
+        注销绘图控件，丢弃其待执行的重绘请求；不再被任何控件引用的子窗口（或主窗口）移除事件过滤器。
+        须在控件或其子窗口被删除前调用（或在子窗口的destroyed信号中调用）。
+        """
+        owner = self.__owners.pop(widget, None)
+        if widget in self.__pending:
+            self.__pending.remove(widget)
+        if owner is None:
+            return
+        for obj in owner[2]:
+            self.__filters[obj] -= 1
+            if not self.__filters[obj]:
+                del self.__filters[obj]
+                try:
+                    obj.removeEventFilter(self)
+                except RuntimeError:  # 对象已被删除，其事件过滤器随之失效
+                    pass
+
+    def unregisterWindow(self, subWindow):
+        """
+        注销子窗口中的全部绘图控件。只比较登记时的子窗口，子窗口已被删除时也可调用。
+        """
+        for widget in [widget for widget, owner in self.__owners.items() if owner[0] is subWindow]:
+            self.unregister(widget)
+
+    @staticmethod
+    def isShowing(subWindow):
+        return subWindow.isVisible() and not subWindow.isMinimized() and not subWindow.window().isMinimized()
+
+    def requestRepaint(self, widget):
+        """
+        登记一次重绘请求。同一控件在一帧内的多次请求只重绘一次。
+        """
+        if widget not in self.__owners:
+            return
+        if widget not in self.__pending:
+            self.__pending.append(widget)
+        if self.isShowing(self.__owners[widget][0]):
+            self.__schedule()
+
+    def __schedule(self):
+        if self.timer.isActive():
+            return
+        elapsed = time.perf_counter() * 1000 - self.__lastFlush
+        self.timer.start(max(0, int(self.__interval - elapsed)))
+
+    @QtC.Slot()
+    def flush(self):
+        """
+        重绘所有可见且有待执行请求的控件，不可见控件的请求保留。
+        """
+        self.__lastFlush = time.perf_counter() * 1000
+        remaining = []
+        for widget in self.__pending:
+            subWindow, renderFunc, _ = self.__owners[widget]
+            if self.isShowing(subWindow):
+                renderFunc()
+                self.repainted.emit(widget)
+            else:
+                remaining.append(widget)
+        self.__pending = remaining
+
+    def eventFilter(self, watched, event):
+        # 子窗口或主窗口重新可见时，补画积压的请求
+        if event.type() in (QtC.QEvent.Show, QtC.QEvent.WindowStateChange):
+            if any(self.isShowing(self.__owners[widget][0]) for widget in self.__pending):
+                self.__schedule()
+        return super(RepaintScheduler, self).eventFilter(watched, event)
@@ -0,0 +1,101 @@
+import threading
+from multiprocessing import shared_memory
+import numpy as np
+
+__all__ = ['SharedBufferRegistry', 'sharedBuffers']
+
+
+class SharedBufferRegistry:
+    """
+    共享数组登记处。
+    生产者将大数组发布（publish）一次，数据存放于multiprocessing.shared_memory中；
+    同一进程内的消费者通过get取得Numpy视图，其他进程通过descriptor/attach挂载同一块内存，均不再拷贝。
+    """
+    def __init__(self):
+        self.__lock = threading.Lock()
+        self.__buffers = {}  # 名称 → (SharedMemory, 生产者视图)
+
+    def publish(self, name, array = None, shape = None, dtype = float):
+        """
+        发布一个共享数组，返回生产者可写的视图。
+        参数：
+            1. name: 登记名称。同名数组已存在时先释放旧数组。
+            2. array: 初始数据，拷贝一次进入共享内存。
+            3. shape, dtype: array为None时按此分配（清零）共享数组，生产者可直接向返回的视图写入。
+        """
+        if array is not None:
+            array = np.ascontiguousarray(array)
+            shape, dtype = array.shape, array.dtype
+        dtype = np.dtype(dtype)
+        shm = shared_memory.SharedMemory(create = True, size = max(int(np.prod(shape)) * dtype.itemsize, 1))
+        view = np.ndarray(shape, dtype = dtype, buffer = shm.buf)
+        if array is not None:
+            view[...] = array
+        else:
+            view.fill(0)
+        self.release(name)
+        with self.__lock:
+            self.__buffers[name] = (shm, view)
+        return view
+
+    def get(self, name, readOnly = True):
+        """
+        取得共享数组的视图。readOnly为True时返回只读视图，防止消费者误改生产者的数据。
+        """
+        with self.__lock:
+            view = self.__buffers[name][1]
+        view = view.view()
+        if readOnly:
+            view.flags.writeable = False
+        return view
+
+    def descriptor(self, name):
+        """
+        返回可传给其他进程的描述符(共享内存名称, shape, dtype字符串)。
+        """
+        with self.__lock:
+            shm, view = self.__buffers[name]
+        return shm.name, view.shape, view.dtype.str
+
+    @staticmethod
+    def attach(descriptor, readOnly = False):
+        """
+        按描述符挂载共享数组，返回(SharedMemory, 视图)。
+        使用完毕后须先释放视图，再调用SharedMemory.close()。
+        """
+        name, shape, dtype = descriptor
+        shm = shared_memory.SharedMemory(name = name)
+        view = np.ndarray(shape, dtype = np.dtype(dtype), buffer = shm.buf)
+        if readOnly:
+            view.flags.writeable = False
+        return shm, view
+
+    def release(self, name):
+        """
+        释放共享数组。已交出的视图在释放后不可再使用。
+        """
+        with self.__lock:
+            entry = self.__buffers.pop(name, None)
+        if entry is not None:
+            shm, view = entry
+            del view
+            try:
+                shm.close()
+            except BufferError:  # 仍有视图引用时无法解除映射，待其回收后由操作系统释放
+                pass
+            shm.unlink()
+
+    def names(self):
+        with self.__lock:
+            return list(self.__buffers.keys())
+
+    def __contains__(self, name):
+        with self.__lock:
+            return name in self.__buffers
+
+    def clear(self):
+        for name in self.names():
+            self.release(name)
+
+
+sharedBuffers = SharedBufferRegistry()  # 进程内默认的共享数组登记处
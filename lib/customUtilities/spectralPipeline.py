@@ -0,0 +1,117 @@
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+import PySide2.QtCore as QtC
+from .timeSeriesBuffer import RingBuffer
+
+__all__ = ['StreamingSpectrogram', 'SpectralWorker']
+
+
+class StreamingSpectrogram:
+    """
+    流式短时傅里叶变换（STFT）。
+    只对新到达的样本组成的重叠帧做加窗FFT，结果追加到滚动的时频图缓冲区，已算过的帧不再重复计算。
+    不足一帧的尾部样本保留到下次push时与新样本拼接；新样本与其不连续（中间缺失或重叠）时丢弃尾部样本，帧不跨越间断。
+    """
+    def __init__(self, frameSize = 1024, hop = 512, samplingRate = 1000.0, capacity = 600, bands = None,
+                 gapTolerance = None):
+        """
+        构造器。
+        可选参数：
+            1. frameSize: 每帧样本数。
+            2. hop: 相邻帧起点的间隔样本数，小于frameSize时帧间重叠。
+            3. samplingRate: 采样频率，Hz。
+            4. capacity: 时频图保留的帧数。
+            5. bands: 频带功率特征的频带列表，形如[(0, 50), (50, 200)]，单位Hz。为None时不计算。
+            6. gapTolerance: 判断样本是否连续时允许的时刻偏差，毫秒，默认为两个采样周期。
+        """
+        self.frameSize = frameSize
+        self.hop = hop
+        self.samplingRate = samplingRate
+        self.gapTolerance = 2000 / samplingRate if gapTolerance is None else gapTolerance
+        self.window = np.hanning(frameSize)
+        self.windowPower = np.sum(self.window ** 2) * samplingRate  # 功率谱密度归一化系数
+        self.frequencies = np.fft.rfftfreq(frameSize, 1 / samplingRate)
+        self.spectrogram = RingBuffer(capacity, self.frequencies.shape[0])
+        self.bands = list(bands) if bands else []
+        self.bandMasks = np.array([(self.frequencies >= low) & (self.frequencies < high) for low, high in self.bands],
+                                  dtype = float).reshape(len(self.bands), self.frequencies.shape[0])
+        self.bandPower = RingBuffer(capacity, len(self.bands)) if self.bands else None
+        self._pending = np.empty(0)
+        self._pendingStartTime = 0.0  # 待处理样本中第一个样本的时刻，毫秒时间戳
+
+    def push(self, samples, startTime = None):
+        """
+        追加一段样本，计算其中新形成的完整帧。
+        参数：
+            1. samples: 一维样本数组。
+            2. startTime: 这段样本第一个样本的毫秒时间戳。为None时视为与上次push的样本连续。
+        返回新计算的帧数。
+        """
+        samples = np.asarray(samples, dtype = float)
+        if startTime is not None:
+            expected = self._pendingStartTime + self._pending.shape[0] * 1000 / self.samplingRate
+            if self._pending.shape[0] and abs(startTime - expected) > self.gapTolerance:
+                self._pending = np.empty(0)  # 样本不连续，尾部样本无法与新样本组成帧
+            self._pendingStartTime = startTime - self._pending.shape[0] * 1000 / self.samplingRate
+        data = np.concatenate((self._pending, samples)) if self._pending.shape[0] else samples
+        frameCount = 0 if data.shape[0] < self.frameSize else 1 + (data.shape[0] - self.frameSize) // self.hop
+        if frameCount:
+            frames = sliding_window_view(data, self.frameSize)[::self.hop][:frameCount]
+            power = np.abs(np.fft.rfft(frames * self.window, axis = 1)) ** 2 / self.windowPower
+            power[:, 1:-1] *= 2  # 单边谱
+            times = self._pendingStartTime + np.arange(frameCount) * self.hop * 1000 / self.samplingRate
+            self.spectrogram.extend(times.astype(np.int64), power)
+            if self.bandPower is not None:
+                self.bandPower.extend(times.astype(np.int64), power @ self.bandMasks.T)
+        consumed = frameCount * self.hop
+        self._pending = data[consumed:].copy()
+        self._pendingStartTime += consumed * 1000 / self.samplingRate
+        return frameCount
+
+    def image(self, decibel = True):
+        """
+        返回时频图数组，形如(帧数, 频点数)。decibel为True时转换为dB。
+        """
+        power = self.spectrogram.values()
+        return 10 * np.log10(np.maximum(power, 1e-20)) if decibel else power
+
+    def reset(self):
+        self.spectrogram.clear()
+        if self.bandPower is not None:
+            self.bandPower.clear()
+        self._pending = np.empty(0)
+
+
+class SpectralWorker(QtC.QObject):
+    """
+    振动信息的频谱分析工作对象。
+    应移入独立线程运行，界面线程只需将收到的时频图绘制（blit）出来。
+    vibration_Information中的样本数组位于sampleKey字段，采样频率位于'sampling_rate'字段（缺省时取构造参数）。
+    没有连接接收方的信号不计算、不复制其数据（如未打开时频图时不生成dB图像）。
+    """
+    spectrogramUpdated = QtC.Signal(object, object, object)  # 时刻数组、频率数组、dB时频图
+    bandPowerUpdated = QtC.Signal(object, object)  # 时刻数组、频带功率数组
+
+    def __init__(self, frameSize = 1024, hop = 512, samplingRate = 1000.0, capacity = 600, bands = None,
+                 sampleKey = 'samples', parent = None):
+        super(SpectralWorker, self).__init__(parent)
+        self.sampleKey = sampleKey
+        self.spectrogramArgs = (frameSize, hop, capacity, bands)
+        self.stft = StreamingSpectrogram(frameSize, hop, samplingRate, capacity, bands)
+
+    @QtC.Slot(object)
+    def processVibrationInformation(self, information):
+        samples = information.get(self.sampleKey)
+        if samples is None or len(samples) == 0:
+            return
+        samplingRate = float(information.get('sampling_rate', self.stft.samplingRate))
+        if samplingRate != self.stft.samplingRate:  # 采样频率变化时重建流水线
+            frameSize, hop, capacity, bands = self.spectrogramArgs
+            self.stft = StreamingSpectrogram(frameSize, hop, samplingRate, capacity, bands)
+        if self.stft.push(samples, information.recordTime):
+            if self.receivers(QtC.SIGNAL('spectrogramUpdated(PyObject,PyObject,PyObject)')):
+                self.spectrogramUpdated.emit(self.stft.spectrogram.times().copy(), self.stft.frequencies,
+                                             self.stft.image())
+            if self.stft.bandPower is not None and self.receivers(QtC.SIGNAL('bandPowerUpdated(PyObject,PyObject)')):
+                self.bandPowerUpdated.emit(self.stft.bandPower.times().copy(),
+                                           self.stft.bandPower.values().copy())
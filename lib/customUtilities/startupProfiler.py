@@ -0,0 +1,155 @@
+import sys
+import time
+import threading
+import datetime
+import contextlib
+import importlib.abc
+
+__all__ = ['StartupProfiler', 'startupProfiler']
+
+
+class _TimedImportFinder(importlib.abc.MetaPathFinder):
+    """
+    位于sys.meta_path首位的计时查找器。
+    自身不负责查找，只将其余查找器返回的loader的exec_module替换为计时版本。
+    """
+    def __init__(self, profiler):
+        self.profiler = profiler
+
+    def find_spec(self, fullname, path, target = None):
+        for finder in sys.meta_path:
+            if finder is self or not hasattr(finder, 'find_spec'):
+                continue
+            spec = finder.find_spec(fullname, path, target)
+            if spec is not None:
+                break
+        else:
+            return None
+        loader = spec.loader
+        # 内置/冻结模块的loader是类本身，修改会影响所有模块，不计时
+        if loader is not None and not isinstance(loader, type) and hasattr(loader, 'exec_module'):
+            loader.exec_module = self.profiler.timedExecModule(fullname, loader.exec_module)
+        return spec
+
+
+class StartupProfiler:
+    """
+    启动过程分析器。
+    启用后记录每个模块的导入耗时（累计/自身）、各启动阶段的耗时及关键时间点，并写出报告文件，用于发现启动时延的退化。
+    未启用时phase/mark均为空操作，不影响正常启动。
+    """
+    def __init__(self):
+        self.enabled = False
+        self.reportFile = None
+        self.origin = time.perf_counter()
+        self.imports = []  # (模块名, 累计耗时ms, 自身耗时ms)
+        self.phases = []  # (阶段名, 开始时刻ms, 耗时ms)
+        self.marks = []  # (时间点名称, 时刻ms)
+        self.budgets = {}  # 时间点名称 → 耗时上限ms
+        self.__local = threading.local()  # 各线程正在导入的模块的子模块耗时累计栈（模块预热线程也会导入）
+        self.__finder = None
+
+    def enable(self, reportFile = 'startup_profile.txt'):
+        """
+        启用分析器。应在导入其他模块之前调用。
+        """
+        if self.enabled:
+            return
+        self.enabled = True
+        self.reportFile = reportFile
+        self.__finder = _TimedImportFinder(self)
+        sys.meta_path.insert(0, self.__finder)
+
+    def disable(self):
+        if self.__finder in sys.meta_path:
+            sys.meta_path.remove(self.__finder)
+        self.enabled = False
+
+    def setBudgets(self, budgets):
+        """
+        设置各时间点的耗时上限，超出上限的时间点在报告中标记为OVER BUDGET。
+        """
+        self.budgets.update(budgets)
+
+    def overBudget(self):
+        """
+        返回超出耗时上限的时间点列表[(名称, 时刻ms, 上限ms)]。
+        """
+        return [(name, at, self.budgets[name]) for name, at in self.marks
+                if name in self.budgets and at > self.budgets[name]]
+
+    def elapsed(self):
+        """
+        自分析器创建以来经过的时间，ms。
+        """
+        return (time.perf_counter() - self.origin) * 1000
+
+    def timedExecModule(self, fullname, execModule):
+        def wrapper(module):
+            stack = self.__local.__dict__.setdefault('stack', [])
+            start = time.perf_counter()
+            stack.append(0.0)
+            try:
+                execModule(module)
+            finally:
+                childTime = stack.pop()
+                total = (time.perf_counter() - start) * 1000
+                if stack:
+                    stack[-1] += total
+                self.imports.append((fullname, total, total - childTime))
+        return wrapper
+
+    @contextlib.contextmanager
+    def phase(self, name):
+        """
+        记录一个启动阶段的耗时，用法：with startupProfiler.phase('setupUi'): ...
+        """
+        if not self.enabled:
+            yield
+            return
+        start = self.elapsed()
+        try:
+            yield
+        finally:
+            self.phases.append((name, start, self.elapsed() - start))
+
+    def mark(self, name, once = True):
+        """
+        记录一个关键时间点。once为True时同名时间点只记录第一次。
+        """
+        if not self.enabled or (once and any(markName == name for markName, _ in self.marks)):
+            return
+        self.marks.append((name, self.elapsed()))
+
+    def report(self, topImports = 40):
+        lines = ['Startup profile generated at ' + datetime.datetime.now().isoformat(), '']
+        lines.append('[Milestones] (ms since profiler start)')
+        for name, at in self.marks:
+            budget = self.budgets.get(name)
+            if budget is None:
+                lines.append('{:>10.1f}  {}'.format(at, name))
+            else:
+                lines.append('{:>10.1f}  {} (budget {} ms{})'.format(
+                    at, name, budget, ', OVER BUDGET' if at > budget else ''))
+        lines.append('')
+        lines.append('[Phases] (start ms, duration ms)')
+        for name, start, duration in self.phases:
+            lines.append('{:>10.1f}  {:>10.1f}  {}'.format(start, duration, name))
+        lines.append('')
+        lines.append('[Imports] total {} modules, top {} by self time (cumulative ms, self ms)'.format(
+            len(self.imports), topImports))
+        for name, total, selfTime in sorted(self.imports, key = lambda item: item[2], reverse = True)[:topImports]:
+            lines.append('{:>10.1f}  {:>10.1f}  {}'.format(total, selfTime, name))
+        return '\n'.join(lines) + '\n'
+
+    def writeReport(self, filename = None):
+        """
+        写出报告文件。未启用时不写出。
+        """
+        if not self.enabled:
+            return
+        with open(filename or self.reportFile, 'w', encoding = 'utf-8') as f:
+            f.write(self.report())
+
+
+startupProfiler = StartupProfiler()  # 全局唯一的启动分析器
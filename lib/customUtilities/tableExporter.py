@@ -0,0 +1,218 @@
+import os
+import csv
+import pandas as pd
+import PySide2.QtCore as QtC
+from ..globalParameters import globalParameters as gParam
+from ..customModels.pandasTableModel import QDataFrameModel
+from ..customModels.numpyTableModel import QAbstractNumpy2DModel
+from ..customModels.pagedQueryModel import QPagedQueryModel
+
+__all__ = ['exportFormats', 'iterModelChunks', 'TableExporter']
+
+# 导出格式 → 文件对话框过滤器
+exportFormats = {
+    'CSV': 'Comma Separated Values (*.csv)',
+    'XLSX': 'Microsoft Excel Spreedsheets (*.xlsx)',
+    'PARQUET': 'Apache Parquet (*.parquet)'
+}
+
+
+def iterModelChunks(model, chunkSize):
+    """
+    按块遍历模型的底层数据，依次产生(列名列表, 不超过chunkSize行的DataFrame)。
+    每次只构造一块数据，不复制整张表：
+        1. QDataFrameModel: 对其DataFrame按行切片。
+        2. QAbstractNumpy2DModel: 对其Numpy数组按行切片。
+        3. QPagedQueryModel: 逐页读取整个查询结果（优先使用QueryClient的页面缓存），不限于视图中已加载的行。
+    """
+    if isinstance(model, QDataFrameModel):
+        dataFrame = model.dataFrame
+        columns = [str(column) for column in dataFrame.columns]
+        for start in range(0, dataFrame.shape[0], chunkSize):
+            yield columns, dataFrame.iloc[start:start + chunkSize].set_axis(columns, axis = 1)
+    elif isinstance(model, QAbstractNumpy2DModel):
+        npArray = model.npArray
+        if getattr(model, '_hasHeader_H', False):
+            columns = [str(column) for column in model.headerArray_H]
+        else:
+            columns = [str(i) for i in range(npArray.shape[1])]
+        for start in range(0, npArray.shape[0], chunkSize):
+            yield columns, pd.DataFrame(npArray[start:start + chunkSize], columns = columns)
+    elif isinstance(model, QPagedQueryModel):
+        if model.queryKey is None:
+            return
+        columns = list(model.columns)
+        page = 0
+        while True:
+            records = model.queryClient.getPage(model.queryKey, page)
+            if records:
+                yield columns, pd.DataFrame([[record.get(column) for column in columns] for record in records],
+                                            columns = columns)
+            if len(records) < model.queryKey[3]:
+                return
+            page += 1
+    else:
+        raise TypeError("Exporting is not supported for {}.".format(type(model).__name__))
+
+
+def modelRowCount(model):
+    """
+    导出的总行数，无法预先得知时（分页查询）返回-1。
+    """
+    if isinstance(model, QDataFrameModel):
+        return model.dataFrame.shape[0]
+    elif isinstance(model, QAbstractNumpy2DModel):
+        return model.npArray.shape[0]
+    return -1
+
+
+class _CsvWriter:
+    def __init__(self, filename):
+        self.file = open(filename, 'w', newline = '', encoding = 'utf-8-sig')  # 带BOM，Excel直接打开时中文不乱码
+        self.headerWritten = False
+
+    def write(self, columns, chunk):
+        if not self.headerWritten:
+            csv.writer(self.file).writerow(columns)
+            self.headerWritten = True
+        chunk.to_csv(self.file, header = False, index = False)
+
+    def close(self):
+        self.file.close()
+
+
+class _XlsxWriter:
+    """
+    使用openpyxl的只写模式，逐行写入，不在内存中保存整个工作表。
+    单个工作表最多1048576行，超出时续写到新的工作表。
+    """
+    maxRows = 1048576
+
+    def __init__(self, filename):
+        import openpyxl
+        self.filename = filename
+        self.workbook = openpyxl.Workbook(write_only = True)
+        self.sheet = None
+        self.sheetRows = 0
+
+    def write(self, columns, chunk):
+        chunk = chunk.astype(object).where(chunk.notna(), None)  # NaN写为空单元格
+        for row in chunk.itertuples(index = False, name = None):
+            if self.sheet is None or self.sheetRows >= self.maxRows:
+                self.sheet = self.workbook.create_sheet()
+                self.sheet.append(columns)
+                self.sheetRows = 1
+            self.sheet.append(row)
+            self.sheetRows += 1
+
+    def close(self):
+        if self.sheet is None:
+            self.workbook.create_sheet()
+        self.workbook.save(self.filename)
+
+
+class _ParquetWriter:
+    """
+    使用pyarrow.parquet.ParquetWriter，每块写为一个行组。
+    schema由第一块推断，其中整数列及全为空值的列一律定为float64（分页查询的json数据中，数值字段在某一页可能恰好全为整数或空值），
+    后续各块推断后转换为此schema，整数、空值均可无损转换为浮点数。
+    """
+    def __init__(self, filename):
+        import pyarrow
+        import pyarrow.parquet
+        self.pa = pyarrow
+        self.pq = pyarrow.parquet
+        self.filename = filename
+        self.writer = None
+
+    def write(self, columns, chunk):
+        table = self.pa.Table.from_pandas(chunk, preserve_index = False).replace_schema_metadata()
+        if self.writer is None:
+            types = self.pa.types
+            schema = self.pa.schema([self.pa.field(field.name, self.pa.float64())
+                                     if types.is_integer(field.type) or types.is_null(field.type) else field
+                                     for field in table.schema])
+            self.writer = self.pq.ParquetWriter(self.filename, schema)
+        self.writer.write_table(table.cast(self.writer.schema))
+
+    def close(self):
+        if self.writer is not None:
+            self.writer.close()
+
+
+_writers = {'CSV': _CsvWriter, 'XLSX': _XlsxWriter, 'PARQUET': _ParquetWriter}
+
+
+class TableExporter(QtC.QObject):
+    """
+    表格导出器，需移入后台线程，先调用reset再通过队列连接调用export。
+    按块从模型的底层数据写入文件，每写完一块报告一次进度。先写入临时文件，完成后再替换目标文件，
+    失败或取消时删除临时文件，不会留下不完整的导出结果。
+    导出期间调用方应禁止编辑模型。
+    """
+    progress = QtC.Signal(int, int)  # 已写入行数、总行数（未知时为-1）
+    finished = QtC.Signal(str)  # 导出的文件名
+    failed = QtC.Signal(str)
+    cancelled = QtC.Signal(str)  # 被取消导出的文件名
+
+    def __init__(self, chunkSize = None, parent = None):
+        super(TableExporter, self).__init__(parent)
+        self.chunkSize = chunkSize or gParam['ex_CSize']
+        self.__cancelled = False
+
+    def reset(self):
+        """
+        清除取消标志，应在请求export之前（安排导出时）调用。
+        export本身不清除标志，在export排队期间调用的cancel因此不会丢失。
+        """
+        self.__cancelled = False
+
+    def cancel(self):
+        """
+        取消已安排或正在进行的导出，可从任意线程调用。导出尚未开始时直接放弃，否则在写完当前块后生效。
+        """
+        self.__cancelled = True
+
+    @QtC.Slot(object, str, str)
+    def export(self, model, filename, fileType):
+        """
+        导出模型数据。
+        参数：
+            1. model: QDataFrameModel、QAbstractNumpy2DModel或QPagedQueryModel。
+            2. filename: 目标文件名。
+            3. fileType: exportFormats中的格式，'CSV'、'XLSX'或'PARQUET'。
+        """
+        if self.__cancelled:  # 排队期间已被取消
+            self.cancelled.emit(filename)
+            return
+        tempFilename = filename + '.part'
+        writer = None
+        try:
+            writer = _writers[fileType](tempFilename)
+            total = modelRowCount(model)
+            written = 0
+            self.progress.emit(written, total)
+            for columns, chunk in iterModelChunks(model, self.chunkSize):
+                writer.write(columns, chunk)
+                written += chunk.shape[0]
+                self.progress.emit(written, total)
+                if self.__cancelled:
+                    break
+            writer.close()
+            writer = None
+            if self.__cancelled:
+                os.remove(tempFilename)
+                self.cancelled.emit(filename)
+                return
+            os.replace(tempFilename, filename)
+        except Exception as e:
+            if writer is not None:
+                try:
+                    writer.close()
+                except Exception:
+                    pass
+            if os.path.exists(tempFilename):
+                os.remove(tempFilename)
+            self.failed.emit('Failed to export {}: {}'.format(os.path.basename(filename), e))
+            return
+        self.finished.emit(filename)
@@ -0,0 +1,204 @@
+import numpy as np
+from .customExceptions import SizeError
+from .timeUtilities import toEpochMs
+
+__all__ = ['RingBuffer', 'AggregatePyramid']
+
+
+class RingBuffer:
+    """
+    定长时间序列环形缓冲区。
+    时间以int64毫秒时间戳存储，数值以二维float数组存储（每列一个字段）。
+    内部数组长度为容量的两倍，每个样本同时写入i和i+capacity两处，
+    从而最近capacity个样本总是连续的，读取时可直接返回视图而无需拷贝。
+    """
+    def __init__(self, capacity, width, dtype = float):
+        """
+        构造器。
+        必要参数：
+            1. capacity: 缓冲区容量（样本数）。
+            2. width: 每个样本的数值个数（列数）。
+        """
+        self.capacity = capacity
+        self.width = width
+        self._times = np.zeros(2 * capacity, dtype = np.int64)
+        self._values = np.full((2 * capacity, width), np.nan, dtype = dtype)
+        self._head = 0  # 下一个样本的写入位置，取值范围[0, capacity)
+        self._size = 0
+        self.totalCount = 0  # 累计追加的样本数（含已被覆盖的），供增量计算判断新样本个数
+
+    def __len__(self):
+        return self._size
+
+    def append(self, time, values):
+        """
+        追加一个样本。
+        """
+        self._times[self._head] = self._times[self._head + self.capacity] = time
+        self._values[self._head] = self._values[self._head + self.capacity] = values
+        self._head = (self._head + 1) % self.capacity
+        self._size = min(self._size + 1, self.capacity)
+        self.totalCount += 1
+
+    def extend(self, times, values):
+        """
+        批量追加样本（向量化）。
+        """
+        times = np.asarray(times, dtype = np.int64)
+        values = np.asarray(values, dtype = self._values.dtype).reshape(-1, self.width)
+        if times.shape[0] != values.shape[0]:
+            raise SizeError(values.shape[0])
+        if times.shape[0] > self.capacity:  # 超出容量的部分会被覆盖，只保留最后capacity个
+            self.totalCount += times.shape[0] - self.capacity
+            times, values = times[-self.capacity:], values[-self.capacity:]
+        count = times.shape[0]
+        positions = (self._head + np.arange(count)) % self.capacity
+        self._times[positions] = self._times[positions + self.capacity] = times
+        self._values[positions] = self._values[positions + self.capacity] = values
+        self._head = (self._head + count) % self.capacity
+        self._size = min(self._size + count, self.capacity)
+        self.totalCount += count
+
+    def times(self):
+        """
+        按时间顺序返回所有样本的时间戳视图。
+        """
+        end = self._head + self.capacity
+        return self._times[end - self._size:end]
+
+    def values(self):
+        """
+        按时间顺序返回所有样本的数值视图。
+        """
+        end = self._head + self.capacity
+        return self._values[end - self._size:end]
+
+    def slice(self, start, end):
+        """
+        返回时间位于[start, end)内的(times, values)视图，start/end为毫秒时间戳。
+        """
+        times = self.times()
+        i, j = np.searchsorted(times, (start, end))
+        return times[i:j], self.values()[i:j]
+
+    def clear(self):
+        self._head = 0
+        self._size = 0
+
+
+class AggregatePyramid:
+    """
+    多分辨率聚合金字塔。
+    对每个分辨率级别维护当前未结束的时间桶（min/sum/max/count），每到达一条记录增量更新；
+    时间桶结束时将其min/mean/max/count写入该级别的RingBuffer。
+    绘图时按可见时间跨度选取级别，输出的点数与像素数同阶，与原始样本数无关。
+    """
+    levels = (1, 10, 60, 600)  # 时间桶大小，单位s
+
+    def __init__(self, fields, capacity = 3600):
+        """
+        构造器。
+        必要参数：
+            1. fields: 字段名称序列。
+        可选参数：
+            1. capacity: 每个级别保留的时间桶个数。
+        """
+        self.fields = tuple(fields)
+        self.fieldIndex = {field: i for i, field in enumerate(self.fields)}
+        width = len(self.fields)
+        # 每个级别的RingBuffer列布局为：[min × width, mean × width, max × width, count]
+        self.rings = {level: RingBuffer(capacity, 3 * width + 1) for level in self.levels}
+        self._openBucket = {level: None for level in self.levels}
+        self._openMin = {level: np.empty(width) for level in self.levels}
+        self._openMax = {level: np.empty(width) for level in self.levels}
+        self._openSum = {level: np.empty(width) for level in self.levels}
+        self._openCount = {level: 0 for level in self.levels}
+
+    @staticmethod
+    def toMilliseconds(recordTime):
+        """
+        将isoformat字符串、datetime或datetime64转化为int64毫秒时间戳，同timeUtilities.toEpochMs。
+        """
+        return toEpochMs(recordTime)
+
+    def appendRecord(self, record):
+        """
+        追加一条记录对象（如sendBoringParameter发出的BoringParameterRecord）。
+        """
+        self.append(record.recordTime, np.array([record[field] for field in self.fields], dtype = float))
+
+    def append(self, time, values):
+        """
+        追加一个样本并增量更新各级别的时间桶。
+        参数：
+            1. time: 毫秒时间戳。
+            2. values: 与fields顺序一致的一维数组。
+        """
+        for level in self.levels:
+            bucket = time // (level * 1000)
+            openBucket = self._openBucket[level]
+            if openBucket is not None and bucket < openBucket:  # 迟到的记录不再回写已结束的时间桶
+                continue
+            if openBucket is not None and bucket != openBucket:
+                self._closeBucket(level)
+                openBucket = None
+            if openBucket is None:
+                self._openBucket[level] = bucket
+                self._openMin[level][:] = values
+                self._openMax[level][:] = values
+                self._openSum[level][:] = values
+                self._openCount[level] = 1
+            else:
+                np.minimum(self._openMin[level], values, out = self._openMin[level])
+                np.maximum(self._openMax[level], values, out = self._openMax[level])
+                self._openSum[level] += values
+                self._openCount[level] += 1
+
+    def _openRow(self, level):
+        count = self._openCount[level]
+        return np.concatenate((self._openMin[level], self._openSum[level] / count, self._openMax[level], (count,)))
+
+    def _closeBucket(self, level):
+        self.rings[level].append(self._openBucket[level] * level * 1000, self._openRow(level))
+        self._openBucket[level] = None
+
+    @classmethod
+    def selectLevel(cls, span, pixels):
+        """
+        按可见时间跨度span（s）和像素数pixels选择级别：每个像素对应时长以内最粗的级别。
+        """
+        secondsPerPixel = span / max(pixels, 1)
+        level = cls.levels[0]
+        for candidate in cls.levels:
+            if candidate <= secondsPerPixel:
+                level = candidate
+        return level
+
+    def query(self, level, start, end, field, includeOpen = True):
+        """
+        返回某一级别、某一字段在[start, end)（毫秒时间戳）内的(times, mins, means, maxs, counts)。
+        includeOpen为True时附带当前未结束的时间桶，使曲线末端与最新记录同步。
+        """
+        width = len(self.fields)
+        column = self.fieldIndex[field]
+        times, values = self.rings[level].slice(start, end)
+        columns = [column, width + column, 2 * width + column, 3 * width]
+        openBucket = self._openBucket[level]
+        if includeOpen and openBucket is not None and start <= openBucket * level * 1000 < end:
+            times = np.append(times, openBucket * level * 1000)
+            values = np.vstack((values[:, columns], self._openRow(level)[columns]))
+        else:
+            values = values[:, columns]
+        return times, values[:, 0], values[:, 1], values[:, 2], values[:, 3]
+
+    def queryForView(self, start, end, pixels, field):
+        """
+        按视图宽度自动选择级别后查询，返回(level, times, mins, means, maxs, counts)。
+        """
+        level = self.selectLevel((end - start) / 1000, pixels)
+        return (level,) + self.query(level, start, end, field)
+
+    def clear(self):
+        for level in self.levels:
+            self.rings[level].clear()
+            self._openBucket[level] = None
@@ -0,0 +1,208 @@
+import time
+import warnings
+import datetime
+import threading
+import collections
+import email.utils
+import numpy as np
+import pandas as pd
+
+__all__ = ['epoch', 'localNowMs', 'toEpochMs', 'toIsoformat', 'parseIsoArray', 'ServerClock', 'IngestionDelay']
+
+# 全部时间统一为int64毫秒时间戳（datetime64[ms]的整数值）。
+# 服务端的record_time为不带时区的本地时间，这里同样把不带时区的本地时间当作自epoch起的毫秒数，
+# 与np.datetime64(isoformat字符串, 'ms')的结果一致；带时区的时间先转换为本机本地时间。
+epoch = datetime.datetime(1970, 1, 1)
+_millisecond = datetime.timedelta(milliseconds = 1)
+
+
+def localNowMs():
+    """
+    本机当前的本地时间，毫秒时间戳。
+    """
+    now = time.time()
+    return int((now + time.localtime(now).tm_gmtoff) * 1000)
+
+
+def toEpochMs(value):
+    """
+    将isoformat字符串、datetime、datetime64或整数转化为int64毫秒时间戳。
+    """
+    if isinstance(value, (int, np.integer)):
+        return int(value)
+    if isinstance(value, str):
+        value = datetime.datetime.fromisoformat(value)
+    if isinstance(value, datetime.datetime):
+        if value.tzinfo is not None:
+            value = value.astimezone().replace(tzinfo = None)
+        return (value - epoch) // _millisecond
+    return int(np.datetime64(value, 'ms').astype(np.int64))
+
+
+def toIsoformat(ms, timespec = 'seconds'):
+    """
+    将毫秒时间戳转化为isoformat字符串（默认精确到秒，与发向服务端的time参数格式一致）。
+    """
+    return (epoch + datetime.timedelta(milliseconds = int(ms))).isoformat(timespec = timespec)
+
+
+def parseIsoArray(strings):
+    """
+    向量化地把一组isoformat字符串解析为int64毫秒时间戳数组。
+    先由numpy直接解析（不带时区的ISO 8601）；含时区等numpy不支持的格式时退回pandas逐格式解析。
+    """
+    strings = np.asarray(strings, dtype = object)
+    try:
+        with warnings.catch_warnings():
+            warnings.simplefilter('error', UserWarning)  # numpy对带时区的字符串只给出警告并按UTC解析
+            return strings.astype('datetime64[ms]').astype(np.int64)
+    except (ValueError, UserWarning):
+        parsed = pd.to_datetime(pd.Series(strings), format = 'ISO8601')
+        if parsed.dt.tz is not None:
+            parsed = parsed.dt.tz_convert(datetime.datetime.now().astimezone().tzinfo).dt.tz_localize(None)
+        return parsed.to_numpy(dtype = 'datetime64[ms]').astype(np.int64)
+
+
+class ServerClock:
+    """
+    服务端时钟估计。
+    工控机与服务器的时钟可能相差数秒，直接按本机时间请求“当前”记录会错过服务端的记录。
+    每次请求记录发出和收到响应的本机时刻t0、t1，以及响应头Date给出的服务端时刻D（精确到秒），
+    则时钟偏差offset满足D - t1 <= offset <= D + 1s - t0。对最近window个样本的区间取交集，
+    得到的区间中点即偏差估计，区间宽度即估计误差；样本越多、往返越快，估计越准。
+    交集为空（时钟被调整或漂移）时依次丢弃最旧的样本，直至与最新样本相容。
+    Date头为UTC时间，按本机时区换算，即假定服务器与本机处于同一时区。
+    """
+    def __init__(self, window = 32):
+        self.__samples = collections.deque(maxlen = window)
+        self.__lock = threading.Lock()
+        self.__offset = 0
+        self.__uncertainty = None
+
+    def addSample(self, sendMs, receiveMs, serverMs, resolutionMs = 1000):
+        """
+        加入一个时钟样本。
+        参数：
+            1. sendMs, receiveMs: 请求发出、响应收到时的本机时间（localNowMs）。
+            2. serverMs: 服务端在处理请求时给出的时间，向下取整到resolutionMs。
+        """
+        with self.__lock:
+            self.__samples.append((serverMs - receiveMs, serverMs + resolutionMs - sendMs))
+            while True:
+                lower = max(sample[0] for sample in self.__samples)
+                upper = min(sample[1] for sample in self.__samples)
+                if lower <= upper:
+                    break
+                self.__samples.popleft()
+            self.__offset = (lower + upper) // 2
+            self.__uncertainty = (upper - lower) // 2
+
+    def addResponse(self, res, sendMs, receiveMs):
+        """
+        从requests响应的Date头取得服务端时间并加入样本。没有Date头时忽略，返回是否加入了样本。
+        """
+        date = res.headers.get('Date')
+        if not date:
+            return False
+        try:
+            serverTime = email.utils.parsedate_to_datetime(date)
+        except (TypeError, ValueError):
+            return False
+        self.addSample(sendMs, receiveMs, toEpochMs(serverTime))
+        return True
+
+    @property
+    def offset(self):
+        """
+        服务端时间减本机时间，毫秒。尚无样本时为0。
+        """
+        return self.__offset
+
+    @property
+    def uncertainty(self):
+        """
+        偏差估计的误差（±毫秒），尚无样本时为None。
+        """
+        return self.__uncertainty
+
+    def isSynchronized(self):
+        return self.__uncertainty is not None
+
+    def serverNowMs(self):
+        """
+        按估计的偏差换算的服务端当前时间，毫秒时间戳。
+        """
+        return localNowMs() + self.__offset
+
+
+class IngestionDelay:
+    """
+    估计服务端的数据入库延迟：记录时间为T的记录在服务端时间T + delay之后才能查询到。
+    以请求时的“记录年龄”age = 服务端当前时间 - 请求的记录时间为观测量：
+    请求失败（或服务端返回的记录早于T）说明delay > age，记为下界；请求到记录时间为T的记录说明delay <= age，记为上界。
+    上界未知时按initial请求；上下界相差超过margin时取中点试探（二分查找）；收敛后按上界加margin请求。
+    以不小于上界的年龄请求失败通常是服务端确实缺少该记录，只有连续confirm次失败才认为入库变慢、丢弃上界重新估计。
+    下界在expiry次观测内未被刷新时下调一个margin，从而重新试探更小的年龄，入库变快时估计也能回落。
+    可在多个线程中调用。
+    """
+    def __init__(self, initial = 2000, margin = 300, confirm = 3, expiry = 60):
+        self.initial = initial
+        self.margin = margin
+        self.confirm = confirm
+        self.expiry = expiry
+        self.__lower = 0
+        self.__upper = None
+        self.__failures = 0  # 以不小于上界的年龄连续请求失败的次数
+        self.__lowerAge = 0  # 下界最近一次刷新后的观测次数
+        self.__lock = threading.Lock()
+
+    def requestAge(self):
+        """
+        下一次请求应使用的记录年龄，毫秒。
+        """
+        with self.__lock:
+            if self.__upper is None:
+                return self.__lower + self.initial
+            if self.__upper - self.__lower <= self.margin:
+                return self.__upper + self.margin
+            return (self.__lower + self.__upper) // 2
+
+    def isProbing(self, age):
+        """
+        以age请求失败是否只是试探的结果（age小于已知可成功的年龄），此时不应视为数据缺失。
+        """
+        with self.__lock:
+            return self.__upper is not None and age < self.__upper
+
+    def addObservation(self, age, available):
+        """
+        加入一次观测：以年龄age请求时记录是否已可查询。
+        """
+        with self.__lock:
+            self.__lowerAge += 1
+            if available:
+                self.__failures = 0
+                if age <= self.__lower:
+                    self.__lower = 0
+                self.__upper = age if self.__upper is None else min(self.__upper, age)
+            elif self.__upper is None or age < self.__upper:
+                self.__raiseLower(age)
+            else:
+                self.__failures += 1
+                if self.__failures >= self.confirm:  # 连续失败，入库确已变慢
+                    self.__failures = 0
+                    self.__upper = None
+                    self.__raiseLower(age)
+            if self.__lowerAge >= self.expiry and self.__lower > 0:
+                self.__lower = max(0, self.__lower - self.margin)
+                self.__lowerAge = 0
+
+    def __raiseLower(self, age):
+        if age >= self.__lower:
+            self.__lower = age
+            self.__lowerAge = 0
+
+    @property
+    def bounds(self):
+        with self.__lock:
+            return self.__lower, self.__upper
@@ -0,0 +1,140 @@
+import os
+import time
+import hashlib
+import marshal
+import importlib
+import importlib.util
+import subprocess
+import xml.etree.ElementTree as ET
+import PySide2.QtWidgets as QtW
+from lib.globalParameters import globalParameters as gParam
+
+__all__ = ['UiFormLoader', 'uiFormLoader']
+
+defaultUiDir = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))), 'ui')
+
+
+class UiFormLoader:
+    """
+    Designer表单加载器。
+    窗口类通过formClass取得带setupUi方法的Ui_*类，支持两种模式：
+        1. 'generated': 导入ui目录下由Convert.py生成的Ui_*.py模块；
+        2. 'loaded': 运行时读取.ui文件，经pyside2-uic转换并编译。编译后的字节码以.ui文件内容哈希为键缓存在磁盘上，
+           .ui文件未修改时直接加载缓存，修改后自动重新编译，无需再运行Convert.py。
+    两种模式得到的类完全相同，窗口类的多重继承写法不变。另提供基于QUiLoader的loadWidget及比较各方式耗时的benchmark。
+    """
+    def __init__(self, uiDir = defaultUiDir, cacheDir = None):
+        self.uiDir = uiDir
+        self.cacheDir = cacheDir or os.path.join(uiDir, '.uicache')
+
+    def uiFile(self, formName):
+        return os.path.join(self.uiDir, formName + '.ui')
+
+    def formClass(self, formName, mode = None):
+        """
+        取得表单类。
+        参数：
+            1. formName: 表单名，即.ui文件名及生成的类名，如'Ui_MainWindow'。
+            2. mode: 'generated'或'loaded'，为None时按gParam['ui_Mode']选择。
+        'loaded'模式转换失败（如未安装pyside2-uic）时退回'generated'模式。
+        """
+        if mode is None:
+            mode = gParam['ui_Mode'].get(formName, 'generated')
+        if mode == 'loaded':
+            try:
+                return self.loadFormClass(formName)
+            except (OSError, RuntimeError):
+                pass
+        return getattr(importlib.import_module('ui.' + formName), formName)
+
+    def loadFormClass(self, formName):
+        """
+        由.ui文件编译表单类，优先使用磁盘缓存。
+        """
+        uiFile = self.uiFile(formName)
+        with open(uiFile, 'rb') as f:
+            digest = hashlib.sha256(importlib.util.MAGIC_NUMBER + f.read()).hexdigest()[:16]  # 字节码与解释器版本相关，一并计入
+        cacheFile = os.path.join(self.cacheDir, '{}-{}.bin'.format(formName, digest))
+        try:
+            with open(cacheFile, 'rb') as f:
+                code = marshal.load(f)
+        except (OSError, EOFError, ValueError, TypeError):
+            code = compile(self.compileUi(uiFile), uiFile, 'exec')
+            os.makedirs(self.cacheDir, exist_ok = True)
+            tempFile = cacheFile + '.tmp'
+            with open(tempFile, 'wb') as f:
+                marshal.dump(code, f)
+            os.replace(tempFile, cacheFile)  # 先写临时文件再替换，避免留下不完整的缓存
+        namespace = {'__name__': 'ui.' + formName, '__file__': uiFile}
+        exec(code, namespace)
+        return namespace[formName]
+
+    @staticmethod
+    def compileUi(uiFile):
+        """
+        调用pyside2-uic将.ui文件转换为Python源码。未安装pyside2-uic或转换失败时抛出RuntimeError。
+        """
+        try:
+            proc = subprocess.run(['pyside2-uic', uiFile], capture_output = True, text = True)
+        except OSError as e:
+            raise RuntimeError('pyside2-uic could not be run on ' + uiFile + ': ' + str(e))
+        if proc.returncode != 0:
+            raise RuntimeError('pyside2-uic failed on ' + uiFile + ': ' + proc.stderr.strip())
+        return proc.stdout
+
+    def clearCache(self):
+        if not os.path.isdir(self.cacheDir):
+            return
+        for filename in os.listdir(self.cacheDir):
+            os.remove(os.path.join(self.cacheDir, filename))
+
+    def loadWidget(self, formName, parent = None, customWidgets = ()):
+        """
+        使用QUiLoader直接由.ui文件构建控件并返回。
+        QUiLoader返回新建的控件而不是填充已有窗口，适用于独立表单及耗时比较；
+        .ui中使用的自定义控件类须通过customWidgets传入注册。
+        """
+        from PySide2.QtUiTools import QUiLoader
+        loader = QUiLoader()
+        for widgetClass in customWidgets:
+            loader.registerCustomWidget(widgetClass)
+        widget = loader.load(self.uiFile(formName), parent)
+        if widget is None:
+            raise RuntimeError(loader.errorString())
+        return widget
+
+    def hostClass(self, formName):
+        """
+        返回.ui文件顶层控件对应的Qt类，如QMainWindow。
+        """
+        return getattr(QtW, ET.parse(self.uiFile(formName)).getroot().find('widget').get('class'))
+
+    def benchmark(self, formName, repeat = 5, customWidgets = ()):
+        """
+        比较各方式的耗时（ms），需在QApplication创建后调用。
+        返回字典，键为模式，值为(取得表单类耗时, 平均构建耗时)。
+        'generated'的取类耗时仅在模块首次导入时有意义；'uiloader'无取类步骤，取类耗时为0。
+        """
+        host = self.hostClass(formName)
+        result = {}
+        for mode in ('generated', 'loaded'):
+            start = time.perf_counter()
+            try:
+                formClass = self.loadFormClass(formName) if mode == 'loaded' else self.formClass(formName, mode)
+            except (OSError, RuntimeError):
+                continue
+            classTime = (time.perf_counter() - start) * 1000
+            start = time.perf_counter()
+            for _ in range(repeat):
+                widget = host()
+                formClass().setupUi(widget)
+                widget.deleteLater()
+            result[mode] = (classTime, (time.perf_counter() - start) * 1000 / repeat)
+        start = time.perf_counter()
+        for _ in range(repeat):
+            self.loadWidget(formName, customWidgets = customWidgets).deleteLater()
+        result['uiloader'] = (0.0, (time.perf_counter() - start) * 1000 / repeat)
+        return result
+
+
+uiFormLoader = UiFormLoader()  # 默认加载ui目录下的表单
@@ -1,10 +1,11 @@
 import os
 import PySide2.QtCore as QtC, PySide2.QtWidgets as QtW
-import qtawesome as qta
 import pandas as pd
 
 from ..customModels.pandasTableModel import QDataFrameModel
 from ..customModels.customDelegates import *
+from ..customUtilities.iconProvider import iconProvider
+from ..customUtilities.tableExporter import exportFormats, TableExporter
 
 __all__ = ['QDataSheetWidget']
 
@@ -16,6 +17,7 @@ class QDataSheetWidget(QtW.QWidget):
     没有对应的界面文件。一般用于其他窗体中的一个子窗体。
     """
     dataFrameChanged = QtC.Signal()
+    requestExport = QtC.Signal(object, str, str)  # 模型、文件名、格式
 
     def __init__(self, parent = None):
         """
@@ -29,6 +31,9 @@ class QDataSheetWidget(QtW.QWidget):
         self.__workFolder = None
         self.__delegates = {}
         self.delegates_Solid = {}
+        self.exporter = None
+        self.exportThread = None
+        self.__exportEditTriggers = None
         self.setupUi()
         self.setOperatingAuthorization()
 
@@ -48,66 +53,72 @@ class QDataSheetWidget(QtW.QWidget):
 
         self.loadDataButton = QtW.QToolButton(self.buttonFrame)  # 读取数据按钮
         self.loadDataButton.setObjectName('loadDataButton')
-        self.loadDataButton.setIcon(qta.icon('mdi6.folder-open', color='deepskyblue'))
+        self.loadDataButton.setIcon(iconProvider.icon('mdi6.folder-open', 'deepskyblue'))
         self.loadDataButton.setText(self.tr('load'))
         self.loadDataButton.setToolTip(self.tr('load data'))
 
         self.clearDataButton = QtW.QToolButton(self.buttonFrame)  # 清空数据按钮
         self.clearDataButton.setObjectName('clearDataButton')
-        self.clearDataButton.setIcon(qta.icon('mdi6.eraser', color='deepskyblue'))
+        self.clearDataButton.setIcon(iconProvider.icon('mdi6.eraser', 'deepskyblue'))
         self.clearDataButton.setText(self.tr('clear'))
         self.clearDataButton.setToolTip(self.tr('clear data'))
         self.clearDataButton.setEnabled(False)
 
+        self.exportDataButton = QtW.QToolButton(self.buttonFrame)  # 导出数据按钮，导出期间再次点击取消导出
+        self.exportDataButton.setObjectName('exportDataButton')
+        self.exportDataButton.setIcon(iconProvider.icon('mdi6.file-export', 'deepskyblue'))
+        self.exportDataButton.setText(self.tr('export'))
+        self.exportDataButton.setToolTip(self.tr('export data'))
+
         self.editDataButton = QtW.QToolButton(self.buttonFrame)  # 编辑数据按钮
         self.editDataButton.setObjectName('editDataButton')
-        self.editDataButton.setIcon(qta.icon('mdi6.file-document-edit', color='deepskyblue'))
+        self.editDataButton.setIcon(iconProvider.icon('mdi6.file-document-edit', 'deepskyblue'))
         self.editDataButton.setText(self.tr('edit'))
         self.editDataButton.setToolTip(self.tr('edit data'))
 
         self.addColumnButton = QtW.QToolButton(self.buttonFrame)  # 新增列按钮
         self.addColumnButton.setObjectName('addColumnButton')
-        self.addColumnButton.setIcon(qta.icon('mdi6.arrow-collapse-right', color='deepskyblue'))
+        self.addColumnButton.setIcon(iconProvider.icon('mdi6.arrow-collapse-right', 'deepskyblue'))
         self.addColumnButton.setText(self.tr('+col'))
         self.addColumnButton.setToolTip(self.tr('add new column'))
         self.addColumnButton.setEnabled(False)
 
         self.addRowButton = QtW.QToolButton(self.buttonFrame)  # 新增行按钮
         self.addRowButton.setObjectName('addRowButton')
-        self.addRowButton.setIcon(qta.icon('mdi6.arrow-collapse-down', color='deepskyblue'))
+        self.addRowButton.setIcon(iconProvider.icon('mdi6.arrow-collapse-down', 'deepskyblue'))
         self.addRowButton.setText(self.tr('+row'))
         self.addRowButton.setToolTip(self.tr('add new row'))
         self.addRowButton.setEnabled(False)
 
         self.removeColumnButton = QtW.QToolButton(self.buttonFrame)  # 删除列按钮
         self.removeColumnButton.setObjectName('removeColumnButton')
-        self.removeColumnButton.setIcon(qta.icon('mdi6.arrow-expand-right', color='deepskyblue'))
+        self.removeColumnButton.setIcon(iconProvider.icon('mdi6.arrow-expand-right', 'deepskyblue'))
         self.removeColumnButton.setText(self.tr('-col'))
         self.removeColumnButton.setToolTip(self.tr('remove a column'))
         self.removeColumnButton.setEnabled(False)
 
         self.removeRowButton = QtW.QToolButton(self.buttonFrame)  # 删除行按钮
         self.removeRowButton.setObjectName('removeRowButton')
-        self.removeRowButton.setIcon(qta.icon('mdi6.arrow-expand-down', color='deepskyblue'))
+        self.removeRowButton.setIcon(iconProvider.icon('mdi6.arrow-expand-down', 'deepskyblue'))
         self.removeRowButton.setText(self.tr('-row'))
         self.removeRowButton.setToolTip(self.tr('remove selected rows'))
         self.removeRowButton.setEnabled(False)
 
         self.confirmButton = QtW.QToolButton(self.buttonFrame)  # 确认编辑按钮
         self.confirmButton.setObjectName('confirmButton')
-        self.confirmButton.setIcon(qta.icon('mdi6.check-circle', color='green'))
+        self.confirmButton.setIcon(iconProvider.icon('mdi6.check-circle', 'green'))
         self.confirmButton.setText(self.tr('confirm'))
         self.confirmButton.setToolTip(self.tr('confirm edit'))
         self.confirmButton.setEnabled(False)
 
         self.refuteButton = QtW.QToolButton(self.buttonFrame)  # 撤销编辑按钮
         self.refuteButton.setObjectName('refuteButton')
-        self.refuteButton.setIcon(qta.icon('mdi6.close-circle', color='red'))
+        self.refuteButton.setIcon(iconProvider.icon('mdi6.close-circle', 'red'))
         self.refuteButton.setText(self.tr('refute'))
         self.refuteButton.setToolTip(self.tr('refute edit'))
         self.refuteButton.setEnabled(False)
 
-        self.buttons = [self.loadDataButton, self.editDataButton, self.clearDataButton,
+        self.buttons = [self.loadDataButton, self.exportDataButton, self.editDataButton, self.clearDataButton,
                         self.addColumnButton, self.addRowButton,
                         self.removeColumnButton, self.removeRowButton,
                         self.confirmButton, self.refuteButton]
@@ -120,6 +131,11 @@ class QDataSheetWidget(QtW.QWidget):
             self.buttonFrameLayout.addWidget(button, 0, index, 1, 1)
         self.buttonFrameLayout.addItem(spacerItemButton, 0, index +1, 1, 1)
 
+        self.exportProgressBar = QtW.QProgressBar(self.buttonFrame)  # 导出进度，仅在导出期间显示
+        self.exportProgressBar.setMaximumSize(QtC.QSize(160, self.__iconSize.height()))
+        self.exportProgressBar.setVisible(False)
+        self.buttonFrameLayout.addWidget(self.exportProgressBar, 0, index + 2, 1, 1)
+
         self.tableView = QtW.QTableView(self)  # tableView窗体
         self.tableView.setAlternatingRowColors(True)
         self.tableView.setSortingEnabled(False)
@@ -225,6 +241,91 @@ class QDataSheetWidget(QtW.QWidget):
             self.dataFrameChanged.emit()
             self.sender().setChecked(False)
 
+    def startExportThread(self):
+        """
+        首次导出时创建导出器及其后台线程。
+        """
+        self.exporter = TableExporter()
+        self.exportThread = QtC.QThread(self)
+        self.exporter.moveToThread(self.exportThread)
+        self.requestExport.connect(self.exporter.export)
+        self.exporter.progress.connect(self.onExportProgress)
+        self.exporter.finished.connect(self.onExportFinished)
+        self.exporter.failed.connect(self.onExportFailed)
+        self.exporter.cancelled.connect(self.onExportFinished)
+        self.exportThread.start()
+        QtC.QCoreApplication.instance().aboutToQuit.connect(self.exporter.cancel, QtC.Qt.DirectConnection)
+        QtC.QCoreApplication.instance().aboutToQuit.connect(self.exportThread.quit)
+
+    def setExporting(self, exporting):
+        """
+        导出期间隐藏/显示进度条，并禁止编辑模型（导出器直接读取模型的底层数据）。
+        """
+        self.exportProgressBar.setVisible(exporting)
+        for button in self.buttons:
+            if button is not self.exportDataButton:
+                button.setEnabled(not exporting and button.isEnabled())
+        if exporting:
+            self.__exportEditTriggers = self.tableView.editTriggers()
+            self.tableView.setEditTriggers(QtW.QAbstractItemView.NoEditTriggers)
+            self.exportProgressBar.setRange(0, 0)
+        else:
+            self.tableView.setEditTriggers(self.__exportEditTriggers)
+            self.exportDataButton.blockSignals(True)
+            self.exportDataButton.setChecked(False)
+            self.exportDataButton.blockSignals(False)
+            self.loadDataButton.setEnabled(self.__allowLoad)
+            self.editDataButton.setEnabled(not self.editDataButton.isChecked() and self.__allowEdit)
+            if self.tableView.model():
+                self.onModelChanged()
+
+    @QtC.Slot(bool)
+    def on_exportDataButton_toggled(self, triggered):
+        """
+        将tableView控件的数据模型导出为CSV、XLSX或Parquet文件。
+        导出在后台线程中按块进行；导出期间再次点击按钮则取消导出。
+        """
+        if not triggered:
+            if self.exporter is not None:
+                self.exporter.cancel()
+            return
+        model = self.tableView.model()
+        filename, filetype = \
+            QtW.QFileDialog.getSaveFileName(self, '导出数据文件',
+                                            os.getcwd() if self.__workFolder == None else self.__workFolder,
+                                            ';;'.join(exportFormats.values()))
+        fileTypes = {value: key for key, value in exportFormats.items()}
+        if model is None or not filename or filetype not in fileTypes:
+            self.exportDataButton.blockSignals(True)
+            self.exportDataButton.setChecked(False)
+            self.exportDataButton.blockSignals(False)
+            return
+        extension = '.' + fileTypes[filetype].lower()
+        if os.path.splitext(filename)[1].lower() != extension:
+            filename += extension
+        if self.exporter is None:
+            self.startExportThread()
+        self.setExporting(True)
+        self.exporter.reset()
+        self.requestExport.emit(model, filename, fileTypes[filetype])
+
+    @QtC.Slot(int, int)
+    def onExportProgress(self, written, total):
+        if total > 0:
+            self.exportProgressBar.setRange(0, total)
+            self.exportProgressBar.setValue(written)
+        self.exportProgressBar.setToolTip(self.tr('{} rows exported').format(written))
+
+    @QtC.Slot(str)
+    def onExportFinished(self, filename):
+        self.setExporting(False)
+
+    @QtC.Slot(str)
+    def onExportFailed(self, msg):
+        self.setExporting(False)
+        if self.isVisible():
+            QtW.QMessageBox.warning(self, '导出失败', msg)
+
     @QtC.Slot(bool)
     def on_clearDataButton_toggled(self, triggered):
         if triggered:
@@ -247,12 +348,12 @@ class QDataSheetWidget(QtW.QWidget):
         if triggered:
             self.tableView.model().setEditable(True)
             self.editDataButton.setEnabled(False and self.__allowEdit)
-            self.editDataButton.setIcon(qta.icon('mdi6.file-document-edit', color='darkblue'))
+            self.editDataButton.setIcon(iconProvider.icon('mdi6.file-document-edit', 'darkblue'))
             self.setDelegates()
         else:
             self.tableView.model().setEditable(False)
             self.editDataButton.setEnabled(True and self.__allowEdit)
-            self.editDataButton.setIcon(qta.icon('mdi6.file-document-edit', color='deepskyblue'))
+            self.editDataButton.setIcon(iconProvider.icon('mdi6.file-document-edit', 'deepskyblue'))
             # self.tableView.model().confirmEdit()  # 改动直接反映至DataFrameModel中的原始DataFrame中，此句可根据实际需要调整
             # self.dataFrameChanged.emit()
         self.onModelChanged()
@@ -3,10 +3,9 @@ matplotlib.use("Qt5Agg")
 from matplotlib.backends.backend_qt5agg import FigureCanvasQTAgg as FigureCanvas
 from matplotlib.backends.backend_qt5agg import NavigationToolbar2QT as NavigationToolbar
 from matplotlib.figure import Figure
-from mpl_toolkits.mplot3d import Axes3D
-import matplotlib.pyplot as plt
 import PySide2.QtWidgets as QtW, PySide2.QtCore as QtC
 from ..customUtilities.customExceptions import ArgumentError
+from ..customUtilities.sharedBuffer import sharedBuffers
 
 __all__ = ['QMatplotlibWidget']
 
@@ -20,8 +19,8 @@ class MyMplCanvas(FigureCanvas):
     def __init__(self, parent=None, width=5, height=4, dpi=100):
 
         # 配置中文显示
-        plt.rcParams['font.family'] = ['SimHei']  # 用来正常显示中文标签
-        plt.rcParams['axes.unicode_minus'] = False  # 用来正常显示负号
+        matplotlib.rcParams['font.family'] = ['SimHei']  # 用来正常显示中文标签
+        matplotlib.rcParams['axes.unicode_minus'] = False  # 用来正常显示负号
 
         # plt.ion()  # 打开交互式绘图
 
@@ -45,6 +44,7 @@ class QMatplotlibWidget(QtW.QWidget):
     """
     def __init__(self, parent=None, ntb_on = False):
         super(QMatplotlibWidget, self).__init__(parent)
+        self.repaintScheduler = None
         self.initUi(ntb_on)
 
     def initUi(self, ntb_on):
@@ -52,14 +52,34 @@ class QMatplotlibWidget(QtW.QWidget):
         self.matplotlibCanvas = MyMplCanvas(self, width=5, height=4, dpi=100)
         self.axesList = []
         self.fig = self.matplotlibCanvas.fig
-        self.add_subplot = self.matplotlibCanvas.fig.add_subplot
-        self.draw = self.matplotlibCanvas.draw
         self.navigationToolbar = NavigationToolbar(self.matplotlibCanvas, self)  # 添加完整的 toolbar
         self.layout.addWidget(self.matplotlibCanvas)
         self.layout.setContentsMargins(0, 0, 0, 0)
         if ntb_on:
             self.layout.addWidget(self.navigationToolbar)
 
+    def add_subplot(self, *args, **kwargs):
+        """
+        等价于Figure.add_subplot。
+        mplot3d导入耗时较长，仅在创建3D子图时导入以注册'3d'投影。
+        """
+        if kwargs.get('projection') == '3d':
+            from mpl_toolkits.mplot3d import Axes3D
+        return self.matplotlibCanvas.fig.add_subplot(*args, **kwargs)
+
+    def setRepaintScheduler(self, scheduler, subWindow):
+        """
+        设置重绘调度器。设置后draw()只登记重绘请求，由调度器在子窗口可见时按限定帧率执行实际重绘。
+        """
+        self.repaintScheduler = scheduler
+        scheduler.register(self, subWindow, self.matplotlibCanvas.draw)
+
+    def draw(self):
+        if self.repaintScheduler:
+            self.repaintScheduler.requestRepaint(self)
+        else:
+            self.matplotlibCanvas.draw()
+
     def clear(self):
         self.matplotlibCanvas.fig.clf()
         self.axesList.clear()
@@ -99,4 +119,29 @@ class QMatplotlibWidget(QtW.QWidget):
 
     def plotSurface(self, axesindex, *args, **kwargs):
         obj = self.axesList[axesindex].plot_surface(*args, **kwargs)
-        return obj
\ No newline at end of file
+        return obj
+
+    def plotSharedBuffer(self, axesindex, name, *args, registry = sharedBuffers, **kwargs):
+        """
+        以共享数组登记处中的数组绘制曲线，直接使用其只读视图，不拷贝数据。
+        一维数组作为y值；二维数组第0列作为x值，其余各列作为y值。
+        """
+        x, y = self.splitSharedBuffer(registry.get(name))
+        if x is None:
+            return self.axesList[axesindex].plot(y, *args, **kwargs)
+        return self.axesList[axesindex].plot(x, y, *args, **kwargs)
+
+    def updateSharedBuffer(self, lines, name, registry = sharedBuffers):
+        """
+        生产者更新共享数组后，将plotSharedBuffer返回的曲线重新指向最新视图。
+        """
+        x, y = self.splitSharedBuffer(registry.get(name))
+        y = y.reshape(y.shape[0], -1)
+        for i, line in enumerate(lines):
+            line.set_data(range(y.shape[0]) if x is None else x, y[:, i])
+
+    @staticmethod
+    def splitSharedBuffer(view):
+        if view.ndim == 1:
+            return None, view
+        return view[:, 0], view[:, 1:]
@@ -6,5 +6,49 @@ globalParameters = {
     'gri_Int': 2000, # getRockInformation_Interval
     'sb_Tout': 5000, # statusBar_DefaultTimeout
     'bpp_TS': 61, # boringParameterPlotTrunkSize
-    'rip_TS': 121 # rockInformationPlotTrunkSize
-}
\ No newline at end of file
+    'rip_TS': 121, # rockInformationPlotTrunkSize
+    'req_Tout': 3000, # daemonRequest_Timeout
+    'sc_Win': 32, # serverClock_Window（估计服务端时钟偏差时保留的样本数）
+    'id_Init': 2000, # ingestionDelay_Initial（ms，尚未估计出入库延迟时请求的记录年龄）
+    'id_Mgn': 300, # ingestionDelay_Margin（ms，入库延迟估计收敛后额外留出的余量）
+    'id_Cfm': 3, # ingestionDelay_Confirm（以已知可成功的年龄连续请求失败多少次才认为入库变慢，少于此数视为数据缺失）
+    'id_Exp': 60, # ingestionDelay_Expiry（下界经过多少次观测未被刷新即下调一个余量，使估计可以回落）
+    'si_Tout': 5000, # signin_Timeout
+    'pw_Tout': 2000, # connectionPrewarm_Timeout
+    'cm_PS': 10, # connectionManager_PoolSize，每个服务器的连接池大小
+    'mt_RInt': 1000, # metricsTable_RefreshInterval
+    'dl_MBC': 5000, # daemonLog_MaximumBlockCount
+    'dl_FInt': 200, # daemonLog_FlushInterval
+    'dl_File': None, # daemonLog_RotatingFile，为None时不写入文件
+    'dl_FSize': 1048576, # daemonLog_RotatingFileSize
+    'dl_FCnt': 5, # daemonLog_RotatingFileBackupCount
+    'dl_BFile': None, # daemonLog_BinaryFile，二进制事件日志，为None时不写入
+    'qc_CS': 256, # queryClient_CacheSize（数据块个数）
+    'qc_CB': 1000, # queryClient_ChunkBuckets（每个数据块的时间桶个数）
+    'qc_PSize': 500, # queryClient_PageSize（分页查询每页的记录数）
+    'qc_PCS': 128, # queryClient_PageCacheSize（缓存的页数）
+    'qc_Settle': 5000, # queryClient_SettleMargin（ms，数据块结束时刻早于服务端当前时间减入库延迟再减此余量时才视为完整并缓存）
+    'ex_CSize': 10000, # tableExporter_ChunkSize（每次写入的行数）
+    'ap_Cap': 3600, # aggregatePyramid_Capacity（每个级别保留的时间桶个数）
+    'bpb_Cap': 86400, # boringParameterBuffer_Capacity（原始样本数）
+    'tbm_D': 6.0, # TBM_CutterheadDiameter（m）
+    'tbm_NC': 40, # TBM_CutterCount
+    'ie_RW': 60, # indicatorEngine_RollingWindow（样本数）
+    'sp_FSize': 1024, # spectralPipeline_FrameSize（样本数）
+    'sp_Hop': 512, # spectralPipeline_Hop（样本数）
+    'sp_Fs': 1000.0, # spectralPipeline_DefaultSamplingRate（Hz）
+    'sp_Cap': 600, # spectralPipeline_Capacity（帧数）
+    'sp_Bands': ((0, 50), (50, 200), (200, 500)), # spectralPipeline_Bands（Hz）
+    'sp_SKey': 'samples', # spectralPipeline_SampleKey（vibration_Information中样本数组的字段名）
+    'je_MW': None, # jobExecutor_MaxWorkers，为None时取CPU核数
+    'ps_MW': 8, # pollScheduler_MaxWorkers，全部机器共用的轮询线程数
+    'hr_Store': 'records.sqlite', # headlessRecorder_Store，无界面记录器写入的本地时序数据库
+    'hr_FInt': 1000, # headlessRecorder_FlushInterval
+    'hr_Backfill': 3600, # headlessRecorder_Backfill，主窗口开始监控时从记录器数据库载入的历史时长（s），为0时不载入
+    'mm_Servers': [], # multiMachine_Servers，登录后一并监控的其他机器，元素形如{'name': '2号机', 'urlHead': 'http://10.0.0.2:8000/'}，使用相同的用户名和密码登录
+    'rp_FPS': 10, # repaintScheduler_FPS
+    'ui_Mode': {'Ui_LoginWindow': 'generated', 'Ui_MainWindow': 'generated'}, # uiFormLoader_Mode，各表单的加载方式，'generated'或'loaded'
+    'su_Budget': {'login window shown': 1500, 'main window shown': 3000, 'first plotted sample': 6000} # startup_Budget，启动分析时各时间点的耗时上限（ms，自分析器启用起算）
+}
+
+boringParameterFields = ('propulsion_rate', 'total_thrust', 'RPM', 'torque', 'penetration')
\ No newline at end of file
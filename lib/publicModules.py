@@ -1,3 +1,5 @@
 class GlobalContainer:
     mainWindow = None
-    loginWindow = None
\ No newline at end of file
+    loginWindow = None
+    jobExecutor = None
+    pollScheduler = None
\ No newline at end of file
@@ -0,0 +1,157 @@
+import threading
+import requests as rq
+from requests.adapters import HTTPAdapter
+from lib.globalParameters import globalParameters as gParam
+
+__all__ = ['ServerConnection', 'ConnectionManager', 'connectionManager']
+
+
+class ServerConnection:
+    """
+    与单个服务器的已认证连接。
+    同一服务器的全部请求共用一个连接池（HTTPAdapter）和一个cookie容器（含认证cookie）；
+    requests.Session并非线程安全，因此每个线程各自持有一个挂载了共享连接池和cookie的Session。
+    提供与requests.Session相同的get/post/request接口，可直接替代Session传给各子系统；
+    响应表明认证失效（HTTP 401/403）时，以登录时的凭据重新登录并重发一次请求。
+    """
+    signinPath = 'api/mgr/signin'
+    expiredStatus = (401, 403)  # 表明认证失效的HTTP状态码
+
+    def __init__(self, urlHead, poolSize = None):
+        """
+        构造器。
+        必要参数：
+            1. urlHead: 服务端地址前缀，形如'http://127.0.0.1:80/'。
+        可选参数：
+            1. poolSize: 连接池大小，默认取gParam['cm_PS']。
+        """
+        self.urlHead = urlHead
+        self.adapter = HTTPAdapter(pool_connections = 1, pool_maxsize = gParam['cm_PS'] if poolSize is None else poolSize)
+        self.cookies = rq.cookies.RequestsCookieJar()
+        self.__local = threading.local()
+        self.__authLock = threading.Lock()
+        self.__credentials = None
+        self.__generation = 0  # 每次登录成功后加一，避免多个线程同时发现认证失效时重复登录
+
+    def session(self):
+        """
+        返回当前线程的Session，首次调用时创建。
+        """
+        session = getattr(self.__local, 'session', None)
+        if session is None:
+            session = self.__local.session = rq.Session()
+            session.cookies = self.cookies
+            session.mount('http://', self.adapter)
+            session.mount('https://', self.adapter)
+        return session
+
+    @property
+    def authenticated(self):
+        return self.__credentials is not None
+
+    def signin(self, username, password, timeout = None):
+        """
+        登录并返回服务端的响应json。登录成功时保存凭据，供认证失效时自动重新登录。
+        网络错误及响应解码错误原样抛出，由调用方处理。
+        """
+        res = self.session().post(self.urlHead + self.signinPath, json = {
+            "action": "signin",
+            "username": username,
+            "password": password
+        }, timeout = (gParam['si_Tout'] if timeout is None else timeout) / 1000)
+        resObj = res.json()
+        if resObj.get('ret') == 0:
+            with self.__authLock:
+                self.__credentials = (username, password)
+                self.__generation += 1
+        return resObj
+
+    def reauthenticate(self, generation):
+        """
+        以保存的凭据重新登录，成功返回True。
+        generation为发出失效请求时的登录代数，若其他线程已在此期间重新登录，则不再重复登录。
+        """
+        with self.__authLock:
+            if self.__credentials is None:
+                return False
+            if generation != self.__generation:
+                return True
+            username, password = self.__credentials
+            try:
+                res = self.session().post(self.urlHead + self.signinPath, json = {
+                    "action": "signin",
+                    "username": username,
+                    "password": password
+                }, timeout = gParam['si_Tout'] / 1000)
+                if res.json().get('ret') != 0:
+                    return False
+            except (rq.exceptions.RequestException, ValueError):
+                return False
+            self.__generation += 1
+            return True
+
+    @classmethod
+    def isExpired(cls, res):
+        """
+        判断响应是否表明认证失效。只检查状态码，不解码响应体。
+        """
+        return res.status_code in cls.expiredStatus
+
+    def request(self, method, url, **kwargs):
+        kwargs.setdefault('timeout', gParam['req_Tout'] / 1000)
+        generation = self.__generation
+        res = self.session().request(method, url, **kwargs)
+        if self.authenticated and self.isExpired(res) and self.reauthenticate(generation):
+            res = self.session().request(method, url, **kwargs)
+        return res
+
+    def get(self, url, **kwargs):
+        return self.request('GET', url, **kwargs)
+
+    def post(self, url, **kwargs):
+        return self.request('POST', url, **kwargs)
+
+    def head(self, url, **kwargs):
+        kwargs.setdefault('allow_redirects', False)
+        return self.session().request('HEAD', url, **kwargs)
+
+    def close(self):
+        self.adapter.close()
+
+
+class ConnectionManager:
+    """
+    连接管理器，每个服务器（以urlHead区分）只持有一个ServerConnection。
+    登录窗口、后台监控线程及查询客户端均从此处取得连接，不再各自创建Session。
+    """
+    def __init__(self):
+        self.__lock = threading.Lock()
+        self.__connections = {}
+
+    def connection(self, urlHead):
+        with self.__lock:
+            connection = self.__connections.get(urlHead)
+            if connection is None:
+                connection = self.__connections[urlHead] = ServerConnection(urlHead)
+            return connection
+
+    def urlHeads(self):
+        with self.__lock:
+            return list(self.__connections.keys())
+
+    def close(self, urlHead = None):
+        """
+        关闭指定服务器的连接，urlHead为None时关闭全部连接。
+        """
+        with self.__lock:
+            if urlHead is None:
+                connections = list(self.__connections.values())
+                self.__connections.clear()
+            else:
+                connection = self.__connections.pop(urlHead, None)
+                connections = [connection] if connection is not None else []
+        for connection in connections:
+            connection.close()
+
+
+connectionManager = ConnectionManager()  # 进程内共享的连接管理器
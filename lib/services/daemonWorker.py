@@ -0,0 +1,226 @@
+import time
+import functools
+import logging
+import PySide2.QtCore as QtC
+from lib.globalParameters import globalParameters as gParam
+from lib.customUtilities.metricsRecorder import MetricsRecorder
+from lib.customUtilities.records import BoringParameterRecord, RockInformationRecord, PayloadRecord
+from lib.customUtilities.timeUtilities import localNowMs, toIsoformat, ServerClock, IngestionDelay
+from lib.customUtilities.eventLog import DaemonEvent
+import requests as rq
+
+__all__ = ['DaemonWorker']
+
+
+class DaemonWorker(QtC.QObject):
+    """
+    单台机器的后台数据获取器。
+    只依赖服务器连接，不引用任何界面控件；各get方法由PollScheduler在线程池中调用，结果以信号送回界面线程。
+    数据以records中的记录对象（BoringParameterRecord等）发出，record_time在后台线程中解析一次。
+    请求错误等以DaemonEvent（级别、接口、事件代码、耗时等字段）经sendEvent发出，由接收方决定是否及何时格式化为文本。
+    由每个响应的Date头估计服务端时钟偏差，由请求结果及record_time估计各数据流的入库延迟，
+    据此决定请求哪一时刻的记录（requestTime），并通过pollAligner让PollScheduler在该记录预计入库后才发出请求。
+    """
+    # 轮询方法名 → 数据流（接口）名称
+    pollEndpoints = {'getBoringRecord': 'boring_parameter', 'getMuckInformation': 'muck_information',
+                     'getVibrationInformation': 'vibration_information', 'getRockInformation': 'rock_information'}
+
+    sendText = QtC.Signal(str, int, int)
+    sendEvent = QtC.Signal(object)  # DaemonEvent
+    sendBoringParameter = QtC.Signal(object)  # BoringParameterRecord
+    sendMuckInformation = QtC.Signal(object)  # PayloadRecord
+    sendVibrationInformation = QtC.Signal(object)  # PayloadRecord
+    sendRockInformation = QtC.Signal(object)  # RockInformationRecord
+    def __init__(self, connection, connectTarget = None, parent = None):
+        """
+        构造器。
+        必要参数：
+            1. connection: 连接管理器中的ServerConnection，与登录窗口、查询客户端共用的已认证连接。
+        可选参数：
+            1. connectTarget: 显示用的服务器名称，默认取connection.urlHead。
+        """
+        super(DaemonWorker, self).__init__(parent)
+        self.connection = connection
+        self.connectTarget = connectTarget or connection.urlHead
+        self.checkAliveUrl = connection.urlHead + 'api/mon/alive'
+        self.boringParameterUrl = connection.urlHead + 'api/mon/get_boring_parameter'
+        self.muckInformationUrl = connection.urlHead + 'api/mon/get_muck_information'
+        self.vibrationInformationUrl = connection.urlHead + 'api/mon/get_vibration_information'
+        self.rockInformationUrl = connection.urlHead + 'api/mon/get_rock_information'
+        self.metrics = MetricsRecorder()
+        self.clock = ServerClock(gParam['sc_Win'])  # 由各响应的Date头估计服务端时钟偏差
+        self.ingestionDelays = {endpoint: IngestionDelay(gParam['id_Init'], gParam['id_Mgn'],
+                                                     gParam['id_Cfm'], gParam['id_Exp'])
+                                for endpoint in self.pollEndpoints.values()}
+        self.lastRequestTimes = {endpoint: 0 for endpoint in self.pollEndpoints.values()}  # 各数据流上次请求的记录时间
+        now = localNowMs() // 1000 * 1000
+        self.boringParameter_Previous = BoringParameterRecord(now)
+        self.rockInformation_Previous = RockInformationRecord(now)
+
+    def checkAlive(self):
+        start = self.metrics.clock()
+        try:
+            sendMs = localNowMs()
+            res = self.connection.get(self.checkAliveUrl, timeout = gParam['req_Tout'] / 1000)
+            self.clock.addResponse(res, sendMs, localNowMs())
+            if res.status_code == 200:
+                self.metrics.recordRequest('alive', self.metrics.clock() - start, len(res.content))
+                self.sendText.emit('成功连接至服务器：' + self.connectTarget + '。',
+                                   gParam['sb_Tout'], 1)
+            else:
+                self.metrics.recordError('alive')
+                self.sendText.emit('尝试连接至' + self.connectTarget + '时发生错误：' + str(res.status_code) + '。', 5000, 1)
+        except rq.exceptions.Timeout:
+            self.metrics.recordTimeout('alive')
+            self.sendText.emit('连接服务器超时：' + self.connectTarget + '。',
+                               gParam['sb_Tout'], 1)
+        except rq.exceptions.ConnectionError:
+            self.metrics.recordError('alive')
+            self.sendText.emit('无法连接至服务器：' + self.connectTarget + '。',
+                               gParam['sb_Tout'], 1)
+
+    def emitEvent(self, level, endpoint, code, latency = None, detail = None):
+        self.sendEvent.emit(DaemonEvent(level, endpoint, code, latency, detail, self.connectTarget))
+
+    def postRequest(self, endpoint, url, data):
+        """
+        向服务端post请求，并记录时延、响应体大小、解码耗时及错误/超时次数。
+        成功时返回解码后的json对象；连接失败、超时、状态码异常或响应体不是json时返回None。
+        """
+        start = self.metrics.clock()
+        try:
+            sendMs = localNowMs()
+            res = self.connection.post(url, data = data, timeout = gParam['req_Tout'] / 1000)
+            self.clock.addResponse(res, sendMs, localNowMs())
+        except rq.exceptions.Timeout: # ConnectTimeout同时属于ConnectionError，需先于其捕获
+            self.metrics.recordTimeout(endpoint)
+            self.emitEvent(logging.WARNING, endpoint, 'timeout', self.metrics.clock() - start)
+            return None
+        except rq.exceptions.ConnectionError:
+            self.metrics.recordError(endpoint)
+            self.emitEvent(logging.ERROR, endpoint, 'connection_failed', self.metrics.clock() - start)
+            return None
+        latency = self.metrics.clock() - start
+        if res.status_code != 200:
+            self.metrics.recordError(endpoint)
+            self.emitEvent(logging.ERROR, endpoint, 'http_error', latency, res.status_code)
+            return None
+        decodeStart = self.metrics.clock()
+        try:
+            res_Json = res.json()
+        except ValueError:
+            self.metrics.recordError(endpoint)
+            self.emitEvent(logging.ERROR, endpoint, 'invalid_response', latency)
+            return None
+        self.metrics.recordRequest(endpoint, latency, len(res.content), self.metrics.clock() - decodeStart)
+        return res_Json
+
+    def requestTime(self, endpoint):
+        """
+        请求“当前”记录时发给服务端的时间：按时钟偏差换算的服务端当前时间减去该数据流的入库延迟估计，精确到秒，
+        且不早于上次请求的记录之后一秒：时钟偏差估计变小或入库延迟估计变大时，不会重复请求、重复发出同一条记录。
+        返回(毫秒时间戳, isoformat字符串, 记录年龄ms)。尚未取得时钟样本时记录年龄为None，不参与入库延迟估计。
+        """
+        serverNow = self.clock.serverNowMs()
+        getTime = max((serverNow - self.ingestionDelays[endpoint].requestAge()) // 1000 * 1000,
+                      self.lastRequestTimes[endpoint] + 1000)
+        self.lastRequestTimes[endpoint] = getTime
+        return getTime, toIsoformat(getTime), serverNow - getTime if self.clock.isSynchronized() else None
+
+    def recordReceived(self, endpoint, age, getTime, record):
+        """
+        请求到记录后更新入库延迟估计。服务端返回的记录早于请求时刻时，说明请求的记录尚未入库。
+        """
+        if age is not None:
+            self.ingestionDelays[endpoint].addObservation(age, record.recordTime >= getTime)
+
+    def recordMissing(self, endpoint, age):
+        """
+        服务端没有请求时刻的记录时更新入库延迟估计。
+        返回是否确属数据缺失：试探入库延迟时的失败在预期之内，不报告、不重发上一条记录，由fetchRecord稍后重新请求。
+        """
+        if age is None:
+            return True
+        probing = self.ingestionDelays[endpoint].isProbing(age)
+        self.ingestionDelays[endpoint].addObservation(age, False)
+        return not probing
+
+    def nextPollDelay(self, endpoint, interval):
+        """
+        距下一次轮询的本机时间间隔ms：约一个interval之后、下一条整秒记录预计已入库的时刻。
+        下一条记录不早于上次请求的记录之后一秒，时钟偏差估计变化时也不会重复请求同一条记录。
+        """
+        serverNow = self.clock.serverNowMs()
+        age = self.ingestionDelays[endpoint].requestAge()
+        nextTime = max((serverNow + interval - age) // 1000 * 1000, self.lastRequestTimes[endpoint] + 1000)
+        delay = nextTime + age - serverNow
+        while delay <= 0:  # 记录精确到秒，间隔小于1s时按1s对齐
+            delay += 1000
+        return delay
+
+    def pollAligner(self, method):
+        """
+        PollScheduler.addJob的aligner参数：数据轮询方法按记录入库时刻对齐，其他方法（checkAlive）为None。
+        """
+        endpoint = self.pollEndpoints.get(method)
+        return functools.partial(self.nextPollDelay, endpoint) if endpoint else None
+
+    def fetchRecord(self, endpoint, url, responseKey, recordClass):
+        """
+        请求数据流endpoint当前应请求的记录（requestTime）。
+        返回(毫秒时间戳, isoformat字符串, 记录对象或None, 是否确属数据缺失)；请求出错时记录为None且不属于数据缺失。
+        试探入库延迟的请求失败时，等到该记录达到已知可成功的年龄（上界）后以同一时刻重新请求一次，不丢失该时刻的记录。
+        """
+        getTime, getTimeIso, age = self.requestTime(endpoint)
+        while True:
+            res_Json = self.postRequest(endpoint, url, {'time': getTimeIso}) # 发向后端的time为isoformat
+            if res_Json is None:
+                return getTime, getTimeIso, None, False
+            if res_Json['ret'] == 0:
+                record = recordClass.fromDict(res_Json[responseKey]) # 后端传回的record_time为isoformat
+                self.recordReceived(endpoint, age, getTime, record)
+                return getTime, getTimeIso, record, False
+            if self.recordMissing(endpoint, age):
+                return getTime, getTimeIso, None, True
+            wait = self.ingestionDelays[endpoint].bounds[1] - (self.clock.serverNowMs() - getTime)
+            if wait > 0:
+                time.sleep(wait / 1000)
+            age = self.clock.serverNowMs() - getTime
+
+    def getBoringRecord(self):
+        getTime, getTimeIso, parameter, missing = self.fetchRecord(
+            'boring_parameter', self.boringParameterUrl, 'boring_Parameter', BoringParameterRecord)
+        if parameter is not None:
+            self.sendBoringParameter.emit(parameter)
+            self.boringParameter_Previous = parameter
+        elif missing:
+            self.boringParameter_Previous = self.boringParameter_Previous.retimed(getTime, getTimeIso)
+            self.emitEvent(logging.WARNING, 'boring_parameter', 'record_missing', detail = getTime)
+            self.sendBoringParameter.emit(self.boringParameter_Previous)
+
+    def getMuckInformation(self):
+        getTime, _, parameter, missing = self.fetchRecord(
+            'muck_information', self.muckInformationUrl, 'muck_Information', PayloadRecord)
+        if parameter is not None:
+            self.sendMuckInformation.emit(parameter)
+        elif missing:
+            self.emitEvent(logging.WARNING, 'muck_information', 'record_missing', detail = getTime)
+
+    def getVibrationInformation(self):
+        getTime, _, parameter, missing = self.fetchRecord(
+            'vibration_information', self.vibrationInformationUrl, 'vibration_Information', PayloadRecord)
+        if parameter is not None:
+            self.sendVibrationInformation.emit(parameter)
+        elif missing:
+            self.emitEvent(logging.WARNING, 'vibration_information', 'record_missing', detail = getTime)
+
+    def getRockInformation(self):
+        getTime, getTimeIso, parameter, missing = self.fetchRecord(
+            'rock_information', self.rockInformationUrl, 'rock_Information', RockInformationRecord)
+        if parameter is not None:
+            self.sendRockInformation.emit(parameter)
+            self.rockInformation_Previous = parameter
+        elif missing:
+            self.rockInformation_Previous = self.rockInformation_Previous.retimed(getTime, getTimeIso)
+            self.emitEvent(logging.WARNING, 'rock_information', 'record_missing', detail = getTime)
+            self.sendRockInformation.emit(self.rockInformation_Previous)
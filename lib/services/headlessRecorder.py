@@ -0,0 +1,151 @@
+import os
+import signal
+import logging
+import argparse
+import PySide2.QtCore as QtC
+from lib.publicModules import GlobalContainer as GC
+from lib.globalParameters import globalParameters as gParam
+from lib.services.connectionManager import connectionManager
+from lib.services.pollScheduler import PollScheduler
+from lib.services.daemonWorker import DaemonWorker
+from lib.services.timeSeriesStore import TimeSeriesStore
+from lib.customUtilities.eventLog import BinaryEventLog
+
+__all__ = ['HeadlessRecorder', 'runHeadless']
+
+# 轮询方法名 → 轮询间隔参数，与主窗口startMonitoring一致
+pollIntervals = (('checkAlive', 'ca_Int'), ('getBoringRecord', 'gbp_Int'), ('getMuckInformation', 'gmi_Int'),
+                 ('getVibrationInformation', 'gvi_Int'), ('getRockInformation', 'gri_Int'))
+
+
+class HeadlessRecorder(QtC.QObject):
+    """
+    无界面记录器。
+    与界面使用同一套DaemonWorker、PollScheduler和连接管理器，只是把获取到的数据写入本地TimeSeriesStore，而不是绘图。
+    记录的数据可由界面通过MachineContext.backfill载入。
+    """
+    def __init__(self, store, eventLog = None, parent = None):
+        """
+        构造器。
+        必要参数：
+            1. store: TimeSeriesStore。
+        可选参数：
+            1. eventLog: BinaryEventLog，为None时事件只写入logging。
+        """
+        super(HeadlessRecorder, self).__init__(parent)
+        self.store = store
+        self.eventLog = eventLog
+        self.logger = logging.getLogger('AssisstantBoring.recorder')
+        self.workers = {}  # DaemonWorker → 机器名称
+        self.pollJobs = []
+        if not GC.pollScheduler:
+            GC.pollScheduler = PollScheduler(gParam['ps_MW'])
+        self.flushTimer = QtC.QTimer(self)
+        self.flushTimer.timeout.connect(self.flush)
+        self.flushTimer.start(gParam['hr_FInt'])
+
+    def addMachine(self, name, connection):
+        worker = DaemonWorker(connection, name, self)
+        self.workers[worker] = name
+        worker.sendText.connect(self.onStatusText)
+        worker.sendEvent.connect(self.onEvent)
+        worker.sendBoringParameter.connect(self.onBoringParameter)
+        worker.sendMuckInformation.connect(self.onMuckInformation)
+        worker.sendVibrationInformation.connect(self.onVibrationInformation)
+        worker.sendRockInformation.connect(self.onRockInformation)
+        for method, intervalKey in pollIntervals:
+            self.pollJobs.append(GC.pollScheduler.addJob(getattr(worker, method), gParam[intervalKey],
+                                                         worker.pollAligner(method)))
+        self.logger.info('Recording %s (%s).', name, connection.urlHead)
+
+    @QtC.Slot(str, int, int)
+    def onStatusText(self, text, timeout, priority):
+        self.logger.info('[%s] %s', self.workers.get(self.sender(), '?'), text)
+
+    @QtC.Slot(object)
+    def onEvent(self, event):
+        # 事件自带机器名称；logging只在级别启用时才格式化
+        self.logger.log(event.level, '%s', event)
+        if self.eventLog:
+            self.eventLog.write(event)
+
+    @QtC.Slot(object)
+    def onBoringParameter(self, parameter):
+        self.store.append('boring_parameter', self.workers[self.sender()], parameter)
+
+    @QtC.Slot(object)
+    def onMuckInformation(self, parameter):
+        self.store.append('muck_information', self.workers[self.sender()], parameter)
+
+    @QtC.Slot(object)
+    def onVibrationInformation(self, parameter):
+        self.store.append('vibration_information', self.workers[self.sender()], parameter)
+
+    @QtC.Slot(object)
+    def onRockInformation(self, parameter):
+        self.store.append('rock_information', self.workers[self.sender()], parameter)
+
+    @QtC.Slot()
+    def flush(self):
+        self.store.flush()
+        if self.eventLog:
+            self.eventLog.flush()
+
+    def stop(self):
+        for jobId in self.pollJobs:
+            GC.pollScheduler.removeJob(jobId)
+        self.pollJobs = []
+        GC.pollScheduler.shutdown()
+        self.flushTimer.stop()
+        self.store.close()
+        if self.eventLog:
+            self.eventLog.close()
+        connectionManager.close()
+
+
+def runHeadless(argv):
+    """
+    无界面记录器的入口：python main.py --headless --server http://127.0.0.1:8000/ --username xxx [--password xxx] [--store xxx]
+    [--eventLog xxx]
+    密码也可由环境变量AB_PASSWORD提供；gParam['mm_Servers']中的机器以相同的凭据一并记录。返回进程退出码。
+    """
+    parser = argparse.ArgumentParser(prog = 'main.py --headless', description = 'Record TBM data without the GUI.')
+    parser.add_argument('--headless', action = 'store_true')
+    parser.add_argument('--server', required = True, help = 'server url, e.g. http://127.0.0.1:8000/')
+    parser.add_argument('--name', help = 'machine name, defaults to the server address')
+    parser.add_argument('--username', required = True)
+    parser.add_argument('--password', default = os.environ.get('AB_PASSWORD', ''))
+    parser.add_argument('--store', default = gParam['hr_Store'], help = 'sqlite file to record into')
+    parser.add_argument('--eventLog', default = gParam['dl_BFile'], help = 'binary event log file')
+    args, _ = parser.parse_known_args(argv[1:])
+    logging.basicConfig(level = logging.INFO, format = '%(asctime)s %(levelname)s %(message)s')
+    logger = logging.getLogger('AssisstantBoring.recorder')
+
+    app = QtC.QCoreApplication(argv)
+    servers = [{'name': args.name or args.server.split('://')[-1].rstrip('/'),
+                'urlHead': args.server if args.server.endswith('/') else args.server + '/'}]
+    servers += [server for server in gParam['mm_Servers'] if server['name'] != servers[0]['name']]
+    recorder = HeadlessRecorder(TimeSeriesStore(args.store), BinaryEventLog(args.eventLog) if args.eventLog else None)
+    for server in servers:
+        connection = connectionManager.connection(server['urlHead'])
+        try:
+            resObj = connection.signin(args.username, args.password)
+        except Exception as e:
+            logger.error('Failed to sign in to %s: %s', server['name'], e)
+            continue
+        if resObj.get('ret') != 0:
+            logger.error('Failed to sign in to %s: %s', server['name'], resObj.get('msg'))
+            continue
+        recorder.addMachine(server['name'], connection)
+    if not recorder.workers:
+        recorder.stop()
+        return 1
+    # Ctrl+C/SIGTERM时退出事件循环；Python只在解释器运行时处理信号，用一个空计时器定期返回解释器
+    signal.signal(signal.SIGINT, lambda *_: app.quit())
+    signal.signal(signal.SIGTERM, lambda *_: app.quit())
+    signalTimer = QtC.QTimer()
+    signalTimer.timeout.connect(lambda: None)
+    signalTimer.start(500)
+    code = app.exec_()
+    recorder.stop()
+    return code
@@ -0,0 +1,178 @@
+import itertools
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+import PySide2.QtCore as QtC
+from lib.customUtilities.sharedBuffer import SharedBufferRegistry, sharedBuffers
+
+__all__ = ['JobExecutor', 'CancelToken']
+
+
+class CancelToken:
+    """
+    跨进程的协作式取消标志。
+    底层为1字节的共享内存，子进程中的分析函数可周期性调用isCancelled()检查是否应提前退出。
+    """
+    def __init__(self, name = None):
+        if name is None:
+            self._shm = shared_memory.SharedMemory(create = True, size = 1)
+            self._shm.buf[0] = 0
+        else:
+            self._shm = shared_memory.SharedMemory(name = name)
+
+    @property
+    def name(self):
+        return self._shm.name
+
+    def cancel(self):
+        self._shm.buf[0] = 1
+
+    def isCancelled(self):
+        return self._shm.buf[0] == 1
+
+    def close(self):
+        self._shm.close()
+
+    def unlink(self):
+        self._shm.unlink()
+
+    def __getstate__(self):  # 传入子进程时只传递共享内存的名称
+        return self._shm.name
+
+    def __setstate__(self, name):
+        self._shm = shared_memory.SharedMemory(name = name)
+
+
+def _runJob(func, descriptors, args, kwargs):
+    """
+    在子进程中运行的任务入口。
+    按描述符将共享内存挂载为Numpy数组视图（不拷贝），以关键字参数传给分析函数。
+    """
+    blocks = []
+    arrays = {}
+    try:
+        for key, descriptor in descriptors.items():
+            shm, arrays[key] = SharedBufferRegistry.attach(descriptor)
+            blocks.append(shm)
+        return func(*args, **arrays, **kwargs)
+    finally:
+        arrays.clear()  # 释放视图后才能关闭共享内存
+        for shm in blocks:
+            try:
+                shm.close()
+            except BufferError:  # 返回值仍引用共享内存时无法关闭，交由进程退出时回收
+                pass
+        token = kwargs.get('cancelToken')
+        if token is not None:
+            token.close()
+
+
+class JobExecutor(QtC.QObject):
+    """
+    基于进程池的分析任务执行服务。
+    分析窗体通过submit提交CPU密集型任务，输入数组经共享内存传递，结果以Qt信号返回界面线程。
+    提交的函数必须是模块级函数（可被pickle），共享数组以关键字参数的形式传入。
+    函数的返回值不应是共享数组的视图，需要返回数组时请返回其副本。
+    """
+    jobFinished = QtC.Signal(int, object)  # 任务编号、结果
+    jobFailed = QtC.Signal(int, str)  # 任务编号、错误信息
+    jobCancelled = QtC.Signal(int)  # 任务编号
+
+    def __init__(self, maxWorkers = None, parent = None):
+        super(JobExecutor, self).__init__(parent)
+        self.pool = ProcessPoolExecutor(max_workers = maxWorkers)  # 子进程在首次提交任务时才创建
+        self.__jobIds = itertools.count(1)
+        self.__inputs = SharedBufferRegistry()  # 任务输入数组的登记处，任务结束后释放
+        self.__jobs = {}  # 任务编号 → (future, 输入数组登记名称列表, CancelToken)
+        self.__cancelled = set()
+        self.__lock = threading.Lock()
+
+    def submit(self, func, *args, sharedArrays = None, cooperative = False, **kwargs):
+        """
+        提交一个分析任务，返回任务编号。
+        参数：
+            1. func: 模块级分析函数。
+            2. *args, **kwargs: 传给func的普通参数（经pickle传递）。
+            3. sharedArrays: {参数名: Numpy数组或sharedBuffers中的登记名称}，经共享内存传给func。
+               Numpy数组拷贝一次进入共享内存；登记名称直接传递，不再拷贝。
+            4. cooperative: 为True时以cancelToken关键字参数向func传入CancelToken，使运行中的任务也可被取消。
+        提交失败（如进程池已损坏或已关闭）时释放已发布的输入数组及CancelToken，再原样抛出异常。
+        """
+        jobId = next(self.__jobIds)
+        inputNames = []
+        descriptors = {}
+        token = None
+        try:
+            for key, array in (sharedArrays or {}).items():
+                if isinstance(array, str):
+                    descriptors[key] = sharedBuffers.descriptor(array)
+                else:
+                    inputName = str(jobId) + '/' + key
+                    self.__inputs.publish(inputName, array)
+                    inputNames.append(inputName)
+                    descriptors[key] = self.__inputs.descriptor(inputName)
+            if cooperative:
+                token = CancelToken()
+                kwargs['cancelToken'] = token
+            with self.__lock:
+                future = self.pool.submit(_runJob, func, descriptors, args, kwargs)
+                self.__jobs[jobId] = (future, inputNames, token)
+        except Exception:
+            for inputName in inputNames:
+                self.__inputs.release(inputName)
+            if token is not None:
+                token.close()
+                token.unlink()
+            raise
+        future.add_done_callback(lambda f, jobId = jobId: self.__onDone(jobId, f))
+        return jobId
+
+    def cancel(self, jobId):
+        """
+        取消任务。
+        尚未开始的任务直接从队列中移除；运行中的协作式任务会收到取消标志；
+        其余运行中的任务无法中断，其结果将被丢弃。三种情况均发出jobCancelled信号。
+        """
+        with self.__lock:
+            if jobId not in self.__jobs:
+                return False
+            future, inputNames, token = self.__jobs[jobId]
+            self.__cancelled.add(jobId)
+        if token is not None:
+            token.cancel()
+        future.cancel()
+        return True
+
+    def isRunning(self, jobId):
+        with self.__lock:
+            return jobId in self.__jobs
+
+    def __onDone(self, jobId, future):
+        """
+        任务结束的回调（在进程池的管理线程中执行）。释放共享内存后发出相应信号，Qt会将其排队投递到接收者线程。
+        """
+        with self.__lock:
+            _, inputNames, token = self.__jobs.pop(jobId)
+            cancelled = jobId in self.__cancelled
+            self.__cancelled.discard(jobId)
+        for inputName in inputNames:
+            self.__inputs.release(inputName)
+        if token is not None:
+            token.close()
+            token.unlink()
+        if cancelled or future.cancelled():
+            self.jobCancelled.emit(jobId)
+        elif future.exception() is not None:
+            self.jobFailed.emit(jobId, repr(future.exception()))
+        else:
+            self.jobFinished.emit(jobId, future.result())
+
+    def shutdown(self):
+        """
+        取消所有任务并关闭进程池。
+        """
+        with self.__lock:
+            jobIds = list(self.__jobs.keys())
+        for jobId in jobIds:
+            self.cancel(jobId)
+        self.pool.shutdown(wait = False, cancel_futures = True)
@@ -0,0 +1,86 @@
+import PySide2.QtCore as QtC
+from lib.globalParameters import globalParameters as gParam, boringParameterFields
+from lib.customUtilities.timeSeriesBuffer import RingBuffer, AggregatePyramid
+from lib.customUtilities.indicatorEngine import IndicatorEngine
+from lib.customUtilities.spectralPipeline import SpectralWorker
+from lib.services.daemonWorker import DaemonWorker
+from lib.services.queryClient import QueryClient
+
+__all__ = ['MachineContext']
+
+
+class MachineContext(QtC.QObject):
+    """
+    单台机器的数据上下文。
+    持有该机器的DaemonWorker、查询客户端、掘进参数缓冲区/聚合金字塔/衍生指标引擎及振动频谱分析器；
+    连接、轮询线程池、频谱线程及matplotlib等由全部机器共用，每增加一台机器只增加上述数据结构及一个监控窗口。
+    monitor、subWindow为该机器的监控窗口，由主窗口创建后赋值。
+    """
+    def __init__(self, name, connection, parent = None):
+        """
+        构造器。
+        必要参数：
+            1. name: 机器名称，用于日志、性能指标及监控窗口标题。
+            2. connection: 连接管理器中已登录的ServerConnection。
+        """
+        super(MachineContext, self).__init__(parent)
+        self.name = name
+        self.connection = connection
+        self.daemonWorker = DaemonWorker(connection, name, self)
+        self.queryClient = QueryClient(connection, connection.urlHead, settledTime = self.settledTime)
+        self.boringParameterBuffer = RingBuffer(gParam['bpb_Cap'], len(boringParameterFields))
+        self.boringParameterPyramid = AggregatePyramid(boringParameterFields, gParam['ap_Cap'])
+        self.indicatorEngine = IndicatorEngine(self.boringParameterBuffer, boringParameterFields,
+                                               gParam['tbm_D'], gParam['tbm_NC'], gParam['ie_RW'])
+        # 振动频谱分析器需移入频谱线程，不能有父对象
+        self.spectralWorker = SpectralWorker(gParam['sp_FSize'], gParam['sp_Hop'], gParam['sp_Fs'],
+                                             gParam['sp_Cap'], gParam['sp_Bands'], gParam['sp_SKey'])
+        self.daemonWorker.sendBoringParameter.connect(self.appendBoringParameter)
+        self.daemonWorker.sendVibrationInformation.connect(self.spectralWorker.processVibrationInformation)
+        self.monitor = None
+        self.subWindow = None
+
+    def settledTime(self):
+        """
+        服务端掘进参数已完整入库的毫秒时间戳：按时钟偏差换算的服务端当前时间，减去入库延迟估计及gParam['qc_Settle']余量。
+        查询客户端只缓存早于此时刻结束的数据块。
+        """
+        worker = self.daemonWorker
+        return worker.clock.serverNowMs() - worker.ingestionDelays['boring_parameter'].requestAge() - gParam['qc_Settle']
+
+    @QtC.Slot(object)
+    def appendBoringParameter(self, parameter):
+        """
+        将后台线程发来的掘进参数写入原始数据缓冲区及聚合金字塔。
+        绘图时可用boringParameterPyramid.queryForView按可见跨度取数，
+        衍生指标序列可用indicatorEngine.series取得（取数时才批量计算新样本）。
+        """
+        values = parameter.values()
+        self.boringParameterBuffer.append(parameter.recordTime, values)
+        self.boringParameterPyramid.append(parameter.recordTime, values)
+
+    def backfill(self, store, since = None):
+        """
+        从无界面记录器的TimeSeriesStore载入本机的掘进参数，返回载入的条数。
+        参数：
+            1. store: TimeSeriesStore。
+            2. since: 载入的起始毫秒时间戳，为None时载入缓冲区容量允许的最近记录。
+        只载入早于缓冲区中最早样本的记录，避免与实时轮询到的数据重复。
+        """
+        room = self.boringParameterBuffer.capacity - len(self.boringParameterBuffer)
+        if room <= 0:
+            return 0
+        end = int(self.boringParameterBuffer.times()[0]) if len(self.boringParameterBuffer) else None
+        times, values = store.boringParameterRange(self.name, since, end)
+        times, values = times[-room:], values[-room:]
+        if not times.shape[0]:
+            return 0
+        recentTimes, recentValues = self.boringParameterBuffer.times().copy(), self.boringParameterBuffer.values().copy()
+        self.boringParameterBuffer.clear()
+        self.boringParameterBuffer.extend(times, values)
+        self.boringParameterBuffer.extend(recentTimes, recentValues)
+        self.boringParameterPyramid.clear()
+        for time, value in zip(self.boringParameterBuffer.times(), self.boringParameterBuffer.values()):
+            self.boringParameterPyramid.append(int(time), value)
+        self.indicatorEngine.reset()
+        return times.shape[0]
@@ -0,0 +1,102 @@
+import itertools
+import math
+import time
+import traceback
+from concurrent.futures import ThreadPoolExecutor
+import PySide2.QtCore as QtC
+from lib.globalParameters import globalParameters as gParam
+
+__all__ = ['PollScheduler']
+
+
+class PollScheduler(QtC.QObject):
+    """
+    共享的轮询调度器。
+    全部机器的全部轮询任务共用界面线程中的一个单次计时器和一个有上限的线程池：
+    计时器只在最近一个任务到期时触发，到期任务提交到线程池执行，网络请求不占用界面线程。
+    同一任务上一次尚未返回时跳过本次轮询，慢速链路不会堆积请求；机器数量增加时线程数不随之线性增长。
+    任务函数在线程池中运行，应通过Qt信号把结果送回界面线程。
+    """
+    def __init__(self, maxWorkers = None, parent = None):
+        super(PollScheduler, self).__init__(parent)
+        self.__executor = ThreadPoolExecutor(max_workers = gParam['ps_MW'] if maxWorkers is None else maxWorkers,
+                                             thread_name_prefix = 'poll')
+        self.__jobIds = itertools.count(1)
+        self.__jobs = {}  # 任务编号 → [任务函数, 间隔ms, 下次到期时刻ms, Future, aligner]
+        self.timer = QtC.QTimer(self)
+        self.timer.setSingleShot(True)
+        self.timer.timeout.connect(self.dispatch)
+
+    @staticmethod
+    def clock():
+        return time.perf_counter() * 1000
+
+    def addJob(self, func, interval, aligner = None):
+        """
+        添加轮询任务，首次在一个间隔后执行，返回任务编号。
+        aligner(interval)若给出，则每次执行后由它返回距下次执行的毫秒数（如DaemonWorker.pollAligner，
+        按服务端记录的入库时刻对齐），而不是固定的interval。
+        """
+        jobId = next(self.__jobIds)
+        self.__jobs[jobId] = [func, interval, self.clock() + self.__nextDelay(interval, aligner), None, aligner]
+        self.__reschedule()
+        return jobId
+
+    def setInterval(self, jobId, interval):
+        job = self.__jobs.get(jobId)
+        if job is not None:
+            if job[4] is None:
+                job[2] += interval - job[1]
+            else:
+                job[2] = self.clock() + self.__nextDelay(interval, job[4])
+            job[1] = interval
+            self.__reschedule()
+
+    @staticmethod
+    def __nextDelay(interval, aligner):
+        return interval if aligner is None else aligner(interval)
+
+    def removeJob(self, jobId):
+        """
+        移除轮询任务。正在执行的一次不会被打断。
+        """
+        self.__jobs.pop(jobId, None)
+        self.__reschedule()
+
+    def jobCount(self):
+        return len(self.__jobs)
+
+    def __reschedule(self):
+        if not self.__jobs:
+            self.timer.stop()
+            return
+        due = min(job[2] for job in self.__jobs.values())
+        self.timer.start(max(0, math.ceil(due - self.clock())))
+
+    @QtC.Slot()
+    def dispatch(self):
+        now = self.clock()
+        for job in list(self.__jobs.values()):
+            func, interval, due, future, aligner = job
+            if due > now:
+                continue
+            if future is None or future.done():
+                job[3] = self.__executor.submit(func)
+                job[3].add_done_callback(self.__reportException)
+            if aligner is not None:
+                job[2] = now + aligner(interval)
+            else:
+                job[2] = due + interval if due + interval > now else now + interval # 落后时不补发错过的轮询
+        self.__reschedule()
+
+    @staticmethod
+    def __reportException(future):
+        # 与Qt槽函数中未捕获的异常一样打印到标准错误，不中断其他任务
+        if not future.cancelled() and future.exception() is not None:
+            e = future.exception()
+            traceback.print_exception(type(e), e, e.__traceback__)
+
+    def shutdown(self):
+        self.__jobs.clear()
+        self.timer.stop()
+        self.__executor.shutdown(wait = False)
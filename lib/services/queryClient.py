@@ -0,0 +1,198 @@
+import datetime
+import math
+import threading
+from collections import OrderedDict
+import requests as rq
+import pandas as pd
+from lib.globalParameters import globalParameters as gParam
+from lib.customUtilities.customExceptions import QueryError
+from lib.customUtilities.timeUtilities import parseIsoArray, localNowMs, toEpochMs
+
+__all__ = ['QueryClient']
+
+
+class QueryClient:
+    """
+    历史数据查询客户端。
+    对于跨度较大的时间范围，向服务端请求按时间桶降采样后的min/mean/max数据；
+    只有当视图放大到原始采样分辨率时才请求原始数据。
+    每个分辨率级别的数据按对齐的数据块缓存，再次缩放到已访问过的级别时无需重复请求。
+    表格浏览使用分页查询getPage，每页以(查询, 页码)为键缓存。
+    """
+    resolutionLevels = (1, 10, 60, 600, 3600)  # 可用的时间桶大小，单位s。1代表原始数据
+    aggregates = ('min', 'mean', 'max')
+
+    def __init__(self, session, urlHead, timeout = None, cacheSize = None, chunkBuckets = None, settledTime = None):
+        """
+        构造器。
+        必要参数：
+            1. session: 已登录的requests.Session对象，或连接管理器中的ServerConnection。
+            2. urlHead: 服务端地址前缀，形如'http://127.0.0.1:80/'。
+        可选参数：
+            1. timeout: 请求超时（ms），默认取gParam['req_Tout']。
+            2. cacheSize: 缓存的数据块个数上限，默认取gParam['qc_CS']。
+            3. chunkBuckets: 每个缓存数据块包含的时间桶个数，默认取gParam['qc_CB']。
+            4. settledTime: 无参函数，返回服务端数据已完整入库的毫秒时间戳，早于此时刻结束的数据块及查询才写入缓存。
+               默认为本机当前时间减gParam['qc_Settle']，不考虑时钟偏差及入库延迟。
+        """
+        self.session = session
+        self.urlHead = urlHead
+        self.rawRangeUrl = urlHead + 'api/query/get_boring_parameter_range'
+        self.aggregatedRangeUrl = urlHead + 'api/query/get_boring_parameter_aggregated'
+        self.pagedRangeUrl = urlHead + 'api/query/get_boring_parameter_page'
+        self.timeout = (gParam['req_Tout'] if timeout is None else timeout) / 1000
+        self.cacheSize = gParam['qc_CS'] if cacheSize is None else cacheSize
+        self.chunkBuckets = gParam['qc_CB'] if chunkBuckets is None else chunkBuckets
+        self.settledTime = settledTime or (lambda: localNowMs() - gParam['qc_Settle'])
+        self.__cache = OrderedDict()
+        self.__pageCache = OrderedDict()
+        self.__lock = threading.Lock()
+
+    def post(self, url, payload):
+        """
+        向服务端post查询请求，返回记录列表。
+        网络错误、状态码异常、响应体不是json或缺少ret/records时均抛出QueryError，调用方只需捕获QueryError。
+        """
+        try:
+            res = self.session.post(url, json = payload, timeout = self.timeout)
+        except rq.exceptions.RequestException as e:
+            raise QueryError(url, e)
+        if res.status_code != 200:
+            raise QueryError(url, 'HTTP ' + str(res.status_code))
+        try:
+            res_Json = res.json()
+            if res_Json['ret'] != 0:
+                raise QueryError(url, res_Json.get('msg', 'ret = ' + str(res_Json['ret'])))
+            records = res_Json['records']
+        except (ValueError, KeyError, TypeError, AttributeError) as e:
+            raise QueryError(url, 'Invalid response: ' + repr(e))
+        if not isinstance(records, list):
+            raise QueryError(url, 'Invalid response: records is not a list')
+        return records
+
+    @staticmethod
+    def recordsToDataFrame(records):
+        """
+        将服务端返回的记录列表转化为DataFrame，record_time统一解析为datetime64。
+        """
+        dataFrame = pd.DataFrame.from_records(records)
+        if 'record_time' in dataFrame.columns:
+            dataFrame['record_time'] = parseIsoArray(dataFrame['record_time'].to_numpy()).astype('datetime64[ms]')
+        return dataFrame
+
+    def getRawRange(self, start, end, fields = None):
+        """
+        请求[start, end)区间内的原始数据。
+        """
+        payload = {'start': start.isoformat(), 'end': end.isoformat()}
+        if fields:
+            payload['fields'] = list(fields)
+        return self.recordsToDataFrame(self.post(self.rawRangeUrl, payload))
+
+    def getAggregatedRange(self, start, end, bucketSize, fields = None):
+        """
+        请求[start, end)区间内按bucketSize（s）分桶降采样的数据。
+        返回的DataFrame每行为一个时间桶，包含record_time（桶起点）、count及每个字段的<field>_min/_mean/_max列。
+        """
+        payload = {'start': start.isoformat(), 'end': end.isoformat(),
+                   'bucket': bucketSize, 'aggregates': list(self.aggregates)}
+        if fields:
+            payload['fields'] = list(fields)
+        return self.recordsToDataFrame(self.post(self.aggregatedRangeUrl, payload))
+
+    @classmethod
+    def selectLevel(cls, start, end, pixels):
+        """
+        根据时间跨度与可用像素数选择分辨率级别：取每个像素对应时长以内最粗的时间桶。
+        """
+        secondsPerPixel = (end - start).total_seconds() / max(pixels, 1)
+        level = cls.resolutionLevels[0]
+        for candidate in cls.resolutionLevels:
+            if candidate <= secondsPerPixel:
+                level = candidate
+        return level
+
+    def getRange(self, start, end, pixels, fields = None):
+        """
+        按视图宽度获取[start, end)区间的数据。
+        跨度较大时返回降采样数据，放大至原始分辨率时返回原始数据。
+        返回(level, DataFrame)，level为所用的时间桶大小（s），1代表原始数据。
+        """
+        level = self.selectLevel(start, end, pixels)
+        chunkSpan = level * self.chunkBuckets
+        startEpoch = start.timestamp()
+        endEpoch = end.timestamp()
+        fieldsKey = tuple(fields) if fields else None
+        frames = []
+        for chunkId in range(math.floor(startEpoch / chunkSpan), math.ceil(endEpoch / chunkSpan)):
+            frames.append(self.getChunk(level, chunkId, fieldsKey))
+        frames = [frame for frame in frames if not frame.empty]
+        if not frames:
+            return level, pd.DataFrame()
+        dataFrame = pd.concat(frames, ignore_index = True)
+        mask = (dataFrame['record_time'] >= pd.Timestamp(start)) & (dataFrame['record_time'] < pd.Timestamp(end))
+        return level, dataFrame.loc[mask].reset_index(drop = True)
+
+    def getChunk(self, level, chunkId, fieldsKey):
+        """
+        获取某一分辨率级别下的一个对齐数据块，优先从缓存读取。
+        结束时刻晚于settledTime的数据块（服务端可能尚缺最近的记录）不写入缓存。
+        """
+        key = (level, chunkId, fieldsKey)
+        with self.__lock:
+            if key in self.__cache:
+                self.__cache.move_to_end(key)
+                return self.__cache[key]
+        chunkSpan = level * self.chunkBuckets
+        chunkStart = datetime.datetime.fromtimestamp(chunkId * chunkSpan)
+        chunkEnd = datetime.datetime.fromtimestamp((chunkId + 1) * chunkSpan)
+        if level == self.resolutionLevels[0]:
+            dataFrame = self.getRawRange(chunkStart, chunkEnd, fieldsKey)
+        else:
+            dataFrame = self.getAggregatedRange(chunkStart, chunkEnd, level, fieldsKey)
+        if toEpochMs(chunkEnd) <= self.settledTime():
+            with self.__lock:
+                self.__cache[key] = dataFrame
+                while len(self.__cache) > self.cacheSize:
+                    self.__cache.popitem(last = False)
+        return dataFrame
+
+    @staticmethod
+    def queryKey(start, end, fields = None, pageSize = None):
+        """
+        分页查询的键，同一键的各页组成一次完整的查询结果。
+        """
+        return (start.isoformat(), end.isoformat(), tuple(fields) if fields else None,
+                gParam['qc_PSize'] if pageSize is None else pageSize)
+
+    def getPage(self, queryKey, page):
+        """
+        请求分页查询的第page页（从0开始），返回记录列表，优先从缓存读取。
+        服务端按record_time升序分页，返回的记录数少于每页记录数时说明已是最后一页。
+        已满的页及结束时刻早于settledTime的查询不会再变化，写入缓存。
+        """
+        key = (queryKey, page)
+        with self.__lock:
+            if key in self.__pageCache:
+                self.__pageCache.move_to_end(key)
+                return self.__pageCache[key]
+        start, end, fields, pageSize = queryKey
+        payload = {'start': start, 'end': end, 'page': page, 'page_size': pageSize}
+        if fields:
+            payload['fields'] = list(fields)
+        records = self.post(self.pagedRangeUrl, payload)
+        if len(records) == pageSize or toEpochMs(end) <= self.settledTime():
+            with self.__lock:
+                self.__pageCache[key] = records
+                while len(self.__pageCache) > gParam['qc_PCS']:
+                    self.__pageCache.popitem(last = False)
+        return records
+
+    def isPageCached(self, queryKey, page):
+        with self.__lock:
+            return (queryKey, page) in self.__pageCache
+
+    def clearCache(self):
+        with self.__lock:
+            self.__cache.clear()
+            self.__pageCache.clear()
@@ -0,0 +1,95 @@
+import json
+import sqlite3
+import numpy as np
+from lib.globalParameters import globalParameters as gParam, boringParameterFields
+
+__all__ = ['TimeSeriesStore']
+
+
+class TimeSeriesStore:
+    """
+    本地时序数据存储（sqlite）。
+    掘进参数按字段存为数值列，便于按时间范围直接取出Numpy数组；其他数据流（渣土、振动、岩石信息）整条存为json。
+    以(机器, record_time)为主键，重复轮询到的同一条记录只保存一次。
+    写入先缓存在内存中，由flush批量提交；数据库使用WAL模式，记录器写入时界面进程可同时读取。
+    """
+    def __init__(self, filename = None):
+        self.filename = filename or gParam['hr_Store']
+        self.db = sqlite3.connect(self.filename)
+        self.db.execute('PRAGMA journal_mode=WAL')
+        self.db.execute('PRAGMA synchronous=NORMAL')
+        self.db.execute('CREATE TABLE IF NOT EXISTS boring_parameter (machine TEXT NOT NULL, record_time INTEGER NOT NULL, '
+                        + ', '.join(field + ' REAL' for field in boringParameterFields)
+                        + ', PRIMARY KEY (machine, record_time)) WITHOUT ROWID')
+        self.db.execute('CREATE TABLE IF NOT EXISTS records (stream TEXT NOT NULL, machine TEXT NOT NULL, '
+                        'record_time INTEGER NOT NULL, payload TEXT, '
+                        'PRIMARY KEY (stream, machine, record_time)) WITHOUT ROWID')
+        self.db.commit()
+        self.__boringParameterSql = 'INSERT OR REPLACE INTO boring_parameter VALUES (?, ?, {})'.format(
+            ', '.join('?' * len(boringParameterFields)))
+        self.__pendingBoringParameters = []
+        self.__pendingRecords = []
+
+    def append(self, stream, machine, record):
+        """
+        缓存一条记录，待flush时写入。
+        参数：
+            1. stream: 数据流名称，如'boring_parameter'、'rock_information'。
+            2. machine: 机器名称。
+            3. record: 后台线程发来的记录对象（records.Record）。
+        请求失败时重发的记录（synthetic）不写入，否则会以INSERT OR REPLACE占据缺失的时刻，回填时被当作真实数据。
+        """
+        if record.synthetic:
+            return
+        if stream == 'boring_parameter':
+            self.__pendingBoringParameters.append(
+                (machine, record.recordTime) + tuple(getattr(record, field) for field in boringParameterFields))
+        else:
+            self.__pendingRecords.append((stream, machine, record.recordTime, json.dumps(record.asDict())))
+
+    def pendingCount(self):
+        return len(self.__pendingBoringParameters) + len(self.__pendingRecords)
+
+    def flush(self):
+        """
+        将缓存的记录在一个事务中写入数据库。
+        """
+        if not self.pendingCount():
+            return
+        with self.db:
+            self.db.executemany(self.__boringParameterSql, self.__pendingBoringParameters)
+            self.db.executemany('INSERT OR REPLACE INTO records VALUES (?, ?, ?, ?)', self.__pendingRecords)
+        self.__pendingBoringParameters = []
+        self.__pendingRecords = []
+
+    def machines(self):
+        return [row[0] for row in self.db.execute(
+            'SELECT DISTINCT machine FROM boring_parameter UNION SELECT DISTINCT machine FROM records')]
+
+    def boringParameterRange(self, machine, start = None, end = None):
+        """
+        取出[start, end)内的掘进参数，返回(times, values)：int64毫秒时间戳及按boringParameterFields排列的二维数组。
+        start、end为毫秒时间戳，为None时不限。
+        """
+        rows = self.db.execute('SELECT record_time, ' + ', '.join(boringParameterFields)
+                               + ' FROM boring_parameter WHERE machine = ? AND record_time >= ? AND record_time < ?'
+                               ' ORDER BY record_time',
+                               (machine, -2 ** 63 if start is None else start,
+                                2 ** 63 - 1 if end is None else end)).fetchall()
+        if not rows:
+            return np.empty(0, dtype = np.int64), np.empty((0, len(boringParameterFields)))
+        data = np.array(rows, dtype = float)
+        return np.array([row[0] for row in rows], dtype = np.int64), data[:, 1:]
+
+    def records(self, stream, machine, start = None, end = None):
+        """
+        取出[start, end)内某数据流的记录字典列表。
+        """
+        return [json.loads(row[0]) for row in self.db.execute(
+            'SELECT payload FROM records WHERE stream = ? AND machine = ? AND record_time >= ? AND record_time < ?'
+            ' ORDER BY record_time',
+            (stream, machine, -2 ** 63 if start is None else start, 2 ** 63 - 1 if end is None else end))]
+
+    def close(self):
+        self.flush()
+        self.db.close()
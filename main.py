@@ -1,5 +1,24 @@
 import sys, os
-import PySide2.QtWidgets as QtW
+# 启动分析器须在其他模块导入前启用，才能记录全部模块的导入耗时。
+# 通过命令行参数--profileStartup或环境变量AB_PROFILE_STARTUP（值为报告文件路径，或1/true/yes/on使用默认路径）启用；
+# 环境变量为空或0/false/no/off时不启用。
+from lib.customUtilities.startupProfiler import startupProfiler
+reportFile = os.environ.get('AB_PROFILE_STARTUP', '').strip()
+if reportFile.lower() in ('', '0', 'false', 'no', 'off'):
+    reportFile = None
+elif reportFile.lower() in ('1', 'true', 'yes', 'on'):
+    reportFile = 'startup_profile.txt'
+if '--profileStartup' in sys.argv or reportFile:
+    startupProfiler.enable(reportFile or 'startup_profile.txt')
+    from lib.globalParameters import globalParameters as gParam
+    startupProfiler.setBudgets(gParam['su_Budget'])
+
+# 无界面记录器模式（--headless）不导入任何界面模块
+if __name__ == '__main__' and '--headless' in sys.argv:
+    from lib.services.headlessRecorder import runHeadless
+    sys.exit(runHeadless(sys.argv))
+
+import PySide2.QtWidgets as QtW, PySide2.QtCore as QtC
 from lib.publicModules import GlobalContainer as GC
 
 from widgets.loginWindow import LoginWindow
@@ -7,6 +26,9 @@ from widgets.loginWindow import LoginWindow
 if __name__ == '__main__':
     # os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'AssisstantBoring.settings')
     app = QtW.QApplication(sys.argv)
-    GC.loginWindow = LoginWindow()
+    with startupProfiler.phase('LoginWindow.__init__'):
+        GC.loginWindow = LoginWindow()
     GC.loginWindow.show()
+    # 事件循环启动、登录窗口首次绘制后再记录
+    QtC.QTimer.singleShot(0, lambda: startupProfiler.mark('login window shown'))
     sys.exit(app.exec_())
\ No newline at end of file
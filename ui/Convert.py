@@ -1,7 +1,14 @@
 import os
 import os.path
+import sys
+import json
+import time
+import hashlib
+import subprocess
+from concurrent.futures import ThreadPoolExecutor
 
 dir = './'
+cacheFile = os.path.join(dir, '.convert_cache.json') # 记录上次成功转换时各.ui文件的内容哈希
 
 def listUiFile():
     list = []
@@ -15,12 +22,53 @@ def listUiFile():
 def transPyFile(filename):
     return os.path.splitext(filename)[0] + '.py'
 
-def runMain():
-    list = listUiFile()
-    for uifile in list:
-        pyfile=transPyFile(uifile)
-        cmd = 'pyside2-uic -o {pyfile} {uifile}'.format(pyfile=pyfile,uifile=uifile)
-        os.system(cmd)
+def fileHash(filename):
+    with open(os.path.join(dir, filename), 'rb') as f:
+        return hashlib.sha256(f.read()).hexdigest()
+
+def loadCache():
+    try:
+        with open(cacheFile, 'r') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+def saveCache(cache):
+    with open(cacheFile, 'w') as f:
+        json.dump(cache, f, indent=2, sort_keys=True)
+
+def convert(uifile):
+    '''转换单个.ui文件，返回(文件名, 是否成功, 耗时s, 错误输出)'''
+    pyfile = transPyFile(uifile)
+    start = time.perf_counter()
+    try:
+        proc = subprocess.run(['pyside2-uic', '-o', pyfile, uifile], cwd=dir, capture_output=True, text=True)
+    except OSError as e: # 未安装pyside2-uic（或不在PATH中）时按转换失败报告，不中断其他文件的转换
+        return uifile, False, time.perf_counter() - start, str(e)
+    return uifile, proc.returncode == 0, time.perf_counter() - start, proc.stderr.strip()
+
+def runMain(force=False):
+    '''
+    增量转换：只转换内容哈希与上次不同或输出文件缺失的.ui文件，并行调用pyside2-uic，并输出各文件耗时。
+    force为True时忽略缓存，全部重新转换。
+    '''
+    cache = {} if force else loadCache()
+    hashes = {uifile: fileHash(uifile) for uifile in listUiFile()}
+    list = [uifile for uifile, digest in hashes.items()
+            if cache.get(uifile) != digest or not os.path.exists(os.path.join(dir, transPyFile(uifile)))]
+    for uifile in sorted(set(hashes) - set(list)):
+        print('{:<40} up to date'.format(uifile))
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=os.cpu_count() or 1) as executor:
+        for uifile, success, elapsed, error in executor.map(convert, list):
+            if success:
+                cache[uifile] = hashes[uifile]
+                print('{:<40} {:8.2f} s'.format(uifile, elapsed))
+            else:
+                cache.pop(uifile, None)
+                print('{:<40} FAILED\n{}'.format(uifile, error))
+    saveCache(cache)
+    print('{} of {} file(s) converted in {:.2f} s'.format(len(list), len(hashes), time.perf_counter() - start))
         
 if __name__ == "__main__":
-    runMain()
\ No newline at end of file
+    runMain('--force' in sys.argv)
\ No newline at end of file
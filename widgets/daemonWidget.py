@@ -1,270 +1,340 @@
 import PySide2.QtCore as QtC, PySide2.QtWidgets as QtW
+from lib.publicModules import GlobalContainer as GC
 from lib.globalParameters import globalParameters as gParam
-import datetime
-import requests as rq
+from lib.customUtilities.metricsRecorder import MetricsRecorder
+from lib.customUtilities.eventLog import DaemonEvent, BinaryEventLog
+import collections
 import json
+import os
+import logging
+import logging.handlers
 
 __all__ = ['DaemonWidget']
 
 
 class DaemonWidget(QtW.QWidget):
-
+    """
+    后台监控控件。
+    汇总各台机器DaemonWorker的日志及性能指标，并通过GC.pollScheduler统一启停各机器的轮询。
+    """
 
     def __init__(self, mainWindow = None, parent = None):
         super(DaemonWidget, self).__init__(parent)
         self.mainWindow = mainWindow
-        self.daemonWorker = DaemonWorker(self)
-        self.daemonWorker.sendText2DaemonWidget.connect(self.addText)
-        self.daemonWorker.sendText.connect(self.mainWindow.statusBarShowMessage)
-        self.daemonWorker.sendBoringParameter.connect(self.mainWindow.monitor_SubWidget.plotBoringParameter)
-        self.daemonWorker.sendMuckInformation.connect(self.mainWindow.monitor_SubWidget.plotMuckInformation)
-        self.daemonWorker.sendVibrationInformation.connect(self.mainWindow.monitor_SubWidget.plotVibrationInformation)
-        self.daemonWorker.sendRockInformation.connect(self.mainWindow.monitor_SubWidget.plotRockInformation)
-        self.checkAliveTimer = QtC.QTimer()
-        self.getBoringParameterTimer = QtC.QTimer()
-        self.getMuckInformationTimer = QtC.QTimer()
-        self.getVibrationInformationTimer = QtC.QTimer()
-        self.getRockInformationTimer = QtC.QTimer()
+        self.daemonWorker = None # 第一台（登录的）机器的DaemonWorker
+        self.workers = {} # 机器名称 → DaemonWorker
+        self.workerNames = {} # DaemonWorker → 机器名称
+        self.pollIntervals = {} # 正在轮询的方法名 → 间隔ms
+        self.pollJobs = {} # (机器名称, 方法名) → 轮询任务编号
+        self.renderWindows = {} # DaemonWorker → 绘制其数据的子窗口
+        self.pendingRenders = {} # DaemonWorker → {接口名称: 已送往绘图、尚未重绘的最新记录时间}
         self.setupUi()
+        self.pendingEvents = collections.deque(maxlen = gParam['dl_MBC']) # 超出行数上限的最早事件反正不会显示，直接丢弃
+        self.logFlushTimer = QtC.QTimer(self)
+        self.logFlushTimer.timeout.connect(self.flushText)
+        self.logFlushTimer.start(gParam['dl_FInt'])
+        self.fileLogger = None
+        if gParam['dl_File']:
+            self.setLogFile(gParam['dl_File'])
+        self.binaryLog = None
+        if gParam['dl_BFile']:
+            self.setBinaryLogFile(gParam['dl_BFile'])
+        self.metricsRefreshTimer = QtC.QTimer(self)
+        self.metricsRefreshTimer.timeout.connect(self.refreshMetrics)
+        self.metricsRefreshTimer.start(gParam['mt_RInt'])
 
     def setupUi(self):
         self.setObjectName(u"DaemonWidget")
         self.resize(800, 400)
         self.verticalLayout = QtW.QVBoxLayout(self)
         self.verticalLayout.setObjectName(u"verticalLayout")
-        self.textBrowser = QtW.QTextBrowser(self)
-        self.textBrowser.setObjectName(u"textBrowser")
-        self.verticalLayout.addWidget(self.textBrowser)
+        self.tabWidget = QtW.QTabWidget(self)
+        self.tabWidget.setObjectName(u"tabWidget")
+        self.logTextEdit = QtW.QPlainTextEdit(self.tabWidget)
+        self.logTextEdit.setObjectName(u"logTextEdit")
+        self.logTextEdit.setReadOnly(True)
+        self.logTextEdit.setUndoRedoEnabled(False)
+        self.logTextEdit.setMaximumBlockCount(gParam['dl_MBC']) # 超出行数上限时自动丢弃最早的行
+        self.tabWidget.addTab(self.logTextEdit, "")
+        self.metricsTab = QtW.QWidget(self.tabWidget)
+        self.metricsTab.setObjectName(u"metricsTab")
+        self.metricsLayout = QtW.QVBoxLayout(self.metricsTab)
+        self.metricsLayout.setObjectName(u"metricsLayout")
+        self.metricsTable = QtW.QTableWidget(self.metricsTab)
+        self.metricsTable.setObjectName(u"metricsTable")
+        self.metricsTable.setColumnCount(len(MetricsRecorder.summaryKeys))
+        self.metricsTable.setHorizontalHeaderLabels(MetricsRecorder.summaryKeys)
+        self.metricsTable.setEditTriggers(QtW.QAbstractItemView.NoEditTriggers)
+        self.metricsTable.verticalHeader().setVisible(False)
+        self.metricsLayout.addWidget(self.metricsTable)
+        self.metricsButtonLayout = QtW.QHBoxLayout()
+        self.metricsButtonLayout.setObjectName(u"metricsButtonLayout")
+        self.metricsButtonLayout.addItem(QtW.QSpacerItem(40, 20, QtW.QSizePolicy.Expanding, QtW.QSizePolicy.Minimum))
+        self.resetMetricsButton = QtW.QPushButton(self.metricsTab)
+        self.resetMetricsButton.setObjectName(u"resetMetricsButton")
+        self.metricsButtonLayout.addWidget(self.resetMetricsButton)
+        self.exportMetricsButton = QtW.QPushButton(self.metricsTab)
+        self.exportMetricsButton.setObjectName(u"exportMetricsButton")
+        self.metricsButtonLayout.addWidget(self.exportMetricsButton)
+        self.metricsLayout.addLayout(self.metricsButtonLayout)
+        self.tabWidget.addTab(self.metricsTab, "")
+        self.verticalLayout.addWidget(self.tabWidget)
 
         self.setWindowTitle(QtC.QCoreApplication.translate("DaemonWidget", u"\u540e\u53f0\u76d1\u63a7\u5668", None))
+        self.tabWidget.setTabText(self.tabWidget.indexOf(self.logTextEdit),
+                                  QtC.QCoreApplication.translate("DaemonWidget", u"\u65e5\u5fd7", None))
+        self.tabWidget.setTabText(self.tabWidget.indexOf(self.metricsTab),
+                                  QtC.QCoreApplication.translate("DaemonWidget", u"\u6027\u80fd\u6307\u6807", None))
+        self.resetMetricsButton.setText(QtC.QCoreApplication.translate("DaemonWidget", u"\u91cd\u7f6e", None))
+        self.exportMetricsButton.setText(QtC.QCoreApplication.translate("DaemonWidget", u"\u5bfc\u51fa", None))
 
         QtC.QMetaObject.connectSlotsByName(self)
 
+    def addWorker(self, name, worker, subWindow = None):
+        """
+        登记一台机器的DaemonWorker，并按当前正在轮询的方法及间隔开始轮询。
+        subWindow为绘制该机器数据的子窗口：端到端时延在其中的绘图控件实际重绘（onRepainted）时才统计；
+        为None时在数据槽执行时统计，此时应在机器的绘图槽连接之后调用。
+        """
+        self.workers[name] = worker
+        self.workerNames[worker] = name
+        if subWindow is not None:
+            self.renderWindows[worker] = subWindow
+            self.pendingRenders[worker] = {}
+        if self.daemonWorker is None:
+            self.daemonWorker = worker
+        worker.sendEvent.connect(self.addEvent)
+        if self.mainWindow:
+            worker.sendText.connect(self.mainWindow.statusBarShowMessage)
+        worker.sendBoringParameter.connect(self.onBoringParameterRendered)
+        worker.sendRockInformation.connect(self.onRockInformationRendered)
+        for method, interval in self.pollIntervals.items():
+            self.startJob(name, method, interval)
+
+    def removeWorker(self, name):
+        """
+        停止一台机器的全部轮询并注销其DaemonWorker。
+        """
+        for key in [key for key in self.pollJobs if key[0] == name]:
+            GC.pollScheduler.removeJob(self.pollJobs.pop(key))
+        worker = self.workers.pop(name, None)
+        if worker is not None:
+            self.workerNames.pop(worker, None)
+            self.renderWindows.pop(worker, None)
+            self.pendingRenders.pop(worker, None)
+            worker.sendEvent.disconnect(self.addEvent)
+            worker.sendBoringParameter.disconnect(self.onBoringParameterRendered)
+            worker.sendRockInformation.disconnect(self.onRockInformationRendered)
+            if self.daemonWorker is worker:
+                self.daemonWorker = next(iter(self.workers.values()), None)
+
+    def startJob(self, name, method, interval):
+        key = (name, method)
+        if key in self.pollJobs:
+            GC.pollScheduler.setInterval(self.pollJobs[key], interval)
+        else:
+            worker = self.workers[name]
+            self.pollJobs[key] = GC.pollScheduler.addJob(getattr(worker, method), interval, worker.pollAligner(method))
+
+    def startPolling(self, method, interval):
+        """
+        所有机器开始（或以新间隔继续）轮询method，之后登记的机器同样按此轮询。
+        """
+        self.pollIntervals[method] = interval
+        for name in self.workers:
+            self.startJob(name, method, interval)
+
+    def stopPolling(self, method):
+        self.pollIntervals.pop(method, None)
+        for key in [key for key in self.pollJobs if key[1] == method]:
+            GC.pollScheduler.removeJob(self.pollJobs.pop(key))
+
+    @QtC.Slot(object)
+    def addEvent(self, event):
+        """
+        添加一条DaemonWorker发来的事件。
+        事件只存入有界的待显示队列（开启时同时写入二进制日志），不在此格式化；
+        由logFlushTimer在日志控件可见时批量格式化并追加到界面，日志控件不可见时几乎没有开销。
+        """
+        self.pendingEvents.append(event)
+        if self.binaryLog:
+            self.binaryLog.write(event)
+        if self.fileLogger:
+            self.fileLogger.log(event.level, '%s', event)
+
     @QtC.Slot(str)
     def addText(self, text):
-        self.textBrowser.setText(self.textBrowser.toPlainText() + '\n' + text)
-        self.textBrowser.verticalScrollBar().setValue(self.textBrowser.verticalScrollBar().maximum())
+        """
+        添加一条文本日志。
+        """
+        self.addEvent(DaemonEvent.message(text))
+
+    @QtC.Slot()
+    def flushText(self):
+        """
+        将待显示队列中的事件格式化后一次性追加到日志控件，监控多台机器时加上机器名称前缀。
+        滚动条原本位于底部时保持跟随，否则不打断用户的浏览。
+        """
+        if self.binaryLog:
+            self.binaryLog.flush()
+        if not self.pendingEvents or not self.logTextEdit.isVisible():
+            return
+        withMachine = len(self.workers) > 1
+        lines = [event.format(withMachine) for event in self.pendingEvents]
+        self.pendingEvents.clear()
+        scrollBar = self.logTextEdit.verticalScrollBar()
+        atBottom = scrollBar.value() == scrollBar.maximum()
+        self.logTextEdit.appendPlainText('\n'.join(lines))
+        if atBottom:
+            scrollBar.setValue(scrollBar.maximum())
+
+    def setLogFile(self, filename, maxBytes = None, backupCount = None):
+        """
+        开启日志文件轮转。
+        参数：
+            1. filename: 日志文件路径，为None时关闭文件日志。
+            2. maxBytes: 单个日志文件的大小上限，默认取gParam['dl_FSize']。
+            3. backupCount: 保留的历史日志文件个数，默认取gParam['dl_FCnt']。
+        """
+        if self.fileLogger:
+            for handler in list(self.fileLogger.handlers):
+                self.fileLogger.removeHandler(handler)
+                handler.close()
+            self.fileLogger = None
+        if not filename:
+            return
+        handler = logging.handlers.RotatingFileHandler(
+            filename,
+            maxBytes = gParam['dl_FSize'] if maxBytes is None else maxBytes,
+            backupCount = gParam['dl_FCnt'] if backupCount is None else backupCount,
+            encoding = 'utf-8')
+        handler.setFormatter(logging.Formatter('%(asctime)s %(message)s'))
+        self.fileLogger = logging.getLogger('AssisstantBoring.daemon.' + str(id(self)))
+        self.fileLogger.setLevel(logging.INFO)
+        self.fileLogger.propagate = False
+        self.fileLogger.addHandler(handler)
+
+    def setBinaryLogFile(self, filename):
+        """
+        开启二进制事件日志，事件按字段写入，不做文本格式化，可用eventLog.readBinaryEventLog读回。
+        参数：
+            1. filename: 日志文件路径，为None时关闭二进制日志。
+        """
+        if self.binaryLog:
+            self.binaryLog.close()
+            self.binaryLog = None
+        if filename:
+            self.binaryLog = BinaryEventLog(filename)
+
+    @QtC.Slot()
+    def refreshMetrics(self):
+        """
+        刷新性能指标表。控件不可见时跳过。
+        """
+        if not self.isVisible() or self.tabWidget.currentWidget() is not self.metricsTab:
+            return
+        summaries = []
+        for name, worker in self.workers.items():
+            for summary in worker.metrics.summaries():
+                if len(self.workers) > 1: # 监控多台机器时端点名加上机器名称前缀
+                    summary = dict(summary, endpoint = name + '/' + summary['endpoint'])
+                summaries.append(summary)
+        self.metricsTable.setRowCount(len(summaries))
+        for i, summary in enumerate(summaries):
+            for j, key in enumerate(MetricsRecorder.summaryKeys):
+                value = summary[key]
+                item = QtW.QTableWidgetItem(value if isinstance(value, str) else
+                                            str(round(value, 1) if isinstance(value, float) else value))
+                item.setTextAlignment(QtC.Qt.AlignHCenter | QtC.Qt.AlignVCenter)
+                self.metricsTable.setItem(i, j, item)
+
+    @QtC.Slot()
+    def on_resetMetricsButton_clicked(self):
+        for worker in self.workers.values():
+            worker.metrics.reset()
+        self.refreshMetrics()
+
+    @QtC.Slot()
+    def on_exportMetricsButton_clicked(self):
+        filename, filetype = QtW.QFileDialog.getSaveFileName(self, '导出性能指标', os.getcwd(),
+                                                             "JSON (*.json);;Comma Separated Values (*.csv)")
+        if not filename:
+            return
+        if len(self.workers) == 1:
+            self.daemonWorker.metrics.exportToFile(filename)
+        else: # 监控多台机器时每台机器导出一个文件，文件名加上机器名称
+            root, ext = os.path.splitext(filename)
+            for name, worker in self.workers.items():
+                worker.metrics.exportToFile(root + '-' + name.replace(':', '_') + ext)
+
+    def queueRendered(self, worker, endpoint, recordTime):
+        """
+        数据已送往绘图槽。绘图控件由重绘调度器延后重绘（窗口隐藏或最小化时更晚），
+        只保留每个接口的最新记录时间，待子窗口中的控件实际重绘时再统计端到端时延。
+        """
+        pending = self.pendingRenders.get(worker)
+        if pending is None:
+            worker.metrics.recordRendered(endpoint, recordTime, worker.clock.serverNowMs())
+        else:
+            pending[endpoint] = recordTime
+
+    @QtC.Slot(object)
+    def onBoringParameterRendered(self, parameter):
+        self.queueRendered(self.sender(), 'boring_parameter', parameter.recordTime)
+
+    @QtC.Slot(object)
+    def onRockInformationRendered(self, parameter):
+        self.queueRendered(self.sender(), 'rock_information', parameter.recordTime)
+
+    @QtC.Slot(object)
+    def onRepainted(self, widget):
+        """
+        连接至RepaintScheduler.repainted：绘图控件重绘完成时，统计其所在子窗口对应机器待统计的记录。
+        """
+        for worker, pending in self.pendingRenders.items():
+            if pending and self.renderWindows[worker].isAncestorOf(widget):
+                now = worker.clock.serverNowMs()
+                for endpoint, recordTime in pending.items():
+                    worker.metrics.recordRendered(endpoint, recordTime, now)
+                pending.clear()
+                return
 
     @QtC.Slot(int)
     def startCheckAlive(self, timeInterval):
-        self.checkAliveTimer.timeout.connect(self.daemonWorker.checkAlive)
-        self.checkAliveTimer.start(timeInterval)
+        self.startPolling('checkAlive', timeInterval)
 
     @QtC.Slot()
     def stopCheckAlive(self):
-        self.checkAliveTimer.stop()
-        self.checkAliveTimer.timeout.disconnect(self.daemonWorker.checkAlive)
+        self.stopPolling('checkAlive')
 
     @QtC.Slot(int)
     def startGetBoringParameter(self, timeInterval):
-        self.getBoringParameterTimer.timeout.connect(self.daemonWorker.getBoringRecord)
-        self.getBoringParameterTimer.start(timeInterval)
+        self.startPolling('getBoringRecord', timeInterval)
 
     @QtC.Slot()
     def stopGetBoringParameter(self):
-        self.getBoringParameterTimer.stop()
-        self.getBoringParameterTimer.timeout.disconnect(self.daemonWorker.getBoringRecord)
+        self.stopPolling('getBoringRecord')
 
     @QtC.Slot(int)
     def startGetMuckInformation(self, timeInterval):
-        self.getMuckInformationTimer.timeout.connect(self.daemonWorker.getMuckInformation)
-        self.getMuckInformationTimer.start(timeInterval)
+        self.startPolling('getMuckInformation', timeInterval)
 
     @QtC.Slot()
     def stopGetMuckInformation(self):
-        self.getMuckInformationTimer.stop()
-        self.getMuckInformationTimer.timeout.disconnect(self.daemonWorker.getMuckInformation)
+        self.stopPolling('getMuckInformation')
 
     @QtC.Slot(int)
     def startGetVibrationInformation(self, timeInterval):
-        self.getVibrationInformationTimer.timeout.connect(self.daemonWorker.getVibrationInformation)
-        self.getVibrationInformationTimer.start(timeInterval)
+        self.startPolling('getVibrationInformation', timeInterval)
 
     @QtC.Slot()
     def stopGetVibrationInformation(self):
-        self.getVibrationInformationTimer.stop()
-        self.getVibrationInformationTimer.timeout.disconnect(self.daemonWorker.getVibrationInformation)
+        self.stopPolling('getVibrationInformation')
 
     @QtC.Slot(int)
     def startGetRockInformation(self, timeInterval):
-        self.getRockInformationTimer.timeout.connect(self.daemonWorker.getRockInformation)
-        self.getRockInformationTimer.start(timeInterval)
+        self.startPolling('getRockInformation', timeInterval)
 
     @QtC.Slot()
     def stopGetRockInformation(self):
-        self.getRockInformationTimer.stop()
-        self.getRockInformationTimer.timeout.disconnect(self.daemonWorker.getRockInformation)
-
-
-class DaemonWorker(QtC.QObject):
-    sendText = QtC.Signal(str, int, int)
-    sendText2DaemonWidget = QtC.Signal(str)
-    sendBoringParameter = QtC.Signal(dict)
-    sendMuckInformation = QtC.Signal(dict)
-    sendVibrationInformation = QtC.Signal(dict)
-    sendRockInformation = QtC.Signal(dict)
-    def __init__(self, daemonWidget = None, parent = None):
-        super(DaemonWorker, self).__init__(parent)
-        self.daemonWidget = daemonWidget
-        self.connectTarget = self.daemonWidget.mainWindow.serverDomain + ':' + self.daemonWidget.mainWindow.serverPort
-        self.checkAliveUrl = self.daemonWidget.mainWindow.urlHead + 'api/mon/alive'
-        self.boringParameterUrl = self.daemonWidget.mainWindow.urlHead + 'api/mon/get_boring_parameter'
-        self.muckInformationUrl = self.daemonWidget.mainWindow.urlHead + 'api/mon/get_muck_information'
-        self.vibrationInformationUrl = self.daemonWidget.mainWindow.urlHead + 'api/mon/get_vibration_information'
-        self.rockInformationUrl = self.daemonWidget.mainWindow.urlHead + 'api/mon/get_rock_information'
-        self.session = rq.Session()
-        self.boringParameter_Previous = {
-            "record_time": datetime.datetime.now().replace(microsecond=0).isoformat(),
-            "propulsion_rate": 0.0,
-            "total_thrust": 0.0,
-            "RPM": 0.0,
-            "torque": 0.0,
-            "penetration": 0.0
-        }
-        self.rockInformation_Previous = {
-            "record_time": datetime.datetime.now().replace(microsecond=0).isoformat(),
-            "rock_grade": 0,
-            "UCS": 0.0,
-            "Kv": 0.0
-        }
-
-    def checkAlive(self):
-        # self.sendText2DaemonWidget.emit('Check connection status at ' + datetime.datetime.now().strftime('%Y-%m-%d::%H:%M:%S'))
-        try:
-            res = self.session.get(self.checkAliveUrl)
-            if res.status_code == 200:
-                self.sendText.emit('成功连接至服务器：' + self.connectTarget + '。',
-                                   gParam['sb_Tout'], 1)
-                # self.sendText2DaemonWidget.emit('Connection is still alive.')
-            else:
-                self.sendText.emit('尝试连接至' + self.connectTarget + '时发生错误：' + str(res.status_code) + '。', 5000, 1)
-                # self.sendText2DaemonWidget.emit('Unknown error occurred when establishing connection.')
-        except rq.exceptions.ConnectionError:
-            self.sendText.emit('无法连接至服务器：' + self.connectTarget + '。',
-                               gParam['sb_Tout'], 1)
-            # self.sendText2DaemonWidget.emit('Connection failed.')
-
-    def getBoringRecord(self):
-        getTime = datetime.datetime.now().replace(microsecond=0)# - datetime.timedelta(seconds=2)
-        # self.sendText2DaemonWidget.emit('Asking for in-time boring parameters.\nCurrent time: '\
-        #                                 + getTime.strftime('%Y-%m-%d::%H:%M:%S'))
-        try:
-            res = self.session.post(self.boringParameterUrl, data = {'time': getTime.isoformat()}) # 发向后端的time为isoformat
-            if res.status_code == 200:
-                res_Json = res.json()
-                if  res_Json['ret'] == 0:
-                    parameter = res_Json['boring_Parameter'] # 后端传回的record_time为isoformat
-                    # _buf = 'Successfully get boring paramter.\n'
-                    # _buf += 'Record time: '\
-                    #         + datetime.datetime.fromisoformat(parameter['record_time']).strftime('%Y-%m-%d::%H:%M:%S') + '\n'
-                    # _buf += 'Propulsion rate: ' + str(parameter['propulsion_rate']) + '\n'
-                    # _buf += 'Total thrust: ' + str(parameter['total_thrust']) + '\n'
-                    # _buf += 'Cutterhead RPM: ' + str(parameter['RPM']) + '\n'
-                    # _buf += 'Cutterhead torque: ' + str(parameter['torque']) + '\n'
-                    # _buf += 'Cutterblade penetration: ' + str(parameter['penetration'])
-                    # self.sendText2DaemonWidget.emit(_buf)
-                    self.sendBoringParameter.emit(parameter)
-                    self.boringParameter_Previous = parameter
-                else:
-                    self.boringParameter_Previous['record_time'] = getTime.isoformat()
-                    self.sendText2DaemonWidget.emit('Failed to get in-time boring parameters.')
-                    self.sendBoringParameter.emit(self.boringParameter_Previous)
-            else:
-                self.sendText2DaemonWidget.emit('Unknown error occurred when establishing connection.')
-        except rq.exceptions.ConnectionError:
-            self.sendText2DaemonWidget.emit('Connection failed.')
-        except Exception as e:
-            raise e
-
-    def getMuckInformation(self):
-        getTime = datetime.datetime.now().replace(microsecond=0)# - datetime.timedelta(seconds=2)
-        # self.sendText2DaemonWidget.emit('Asking for in-time boring parameters.\nCurrent time: '\
-        #                                 + getTime.strftime('%Y-%m-%d::%H:%M:%S'))
-        try:
-            res = self.session.post(self.muckInformationUrl, data = {'time': getTime.isoformat()}) # 发向后端的time为isoformat
-            if res.status_code == 200:
-                res_Json = res.json()
-                if  res_Json['ret'] == 0:
-                    parameter = res_Json['muck_Information'] # 后端传回的record_time为isoformat
-                    # _buf = 'Successfully get boring paramter.\n'
-                    # _buf += 'Record time: '\
-                    #         + datetime.datetime.fromisoformat(parameter['record_time']).strftime('%Y-%m-%d::%H:%M:%S') + '\n'
-                    # _buf += 'Propulsion rate: ' + str(parameter['propulsion_rate']) + '\n'
-                    # _buf += 'Total thrust: ' + str(parameter['total_thrust']) + '\n'
-                    # _buf += 'Cutterhead RPM: ' + str(parameter['RPM']) + '\n'
-                    # _buf += 'Cutterhead torque: ' + str(parameter['torque']) + '\n'
-                    # _buf += 'Cutterblade penetration: ' + str(parameter['penetration'])
-                    # self.sendText2DaemonWidget.emit(_buf)
-                    self.sendMuckInformation.emit(parameter)
-                else:
-                    self.sendText2DaemonWidget.emit('Failed to get in-time muck information.')
-            else:
-                self.sendText2DaemonWidget.emit('Unknown error occurred when establishing connection.')
-        except rq.exceptions.ConnectionError:
-            self.sendText2DaemonWidget.emit('Connection failed.')
-        except Exception as e:
-            raise e
-
-    def getVibrationInformation(self):
-        getTime = datetime.datetime.now().replace(microsecond=0)# - datetime.timedelta(seconds=2)
-        # self.sendText2DaemonWidget.emit('Asking for in-time boring parameters.\nCurrent time: '\
-        #                                 + getTime.strftime('%Y-%m-%d::%H:%M:%S'))
-        try:
-            res = self.session.post(self.vibrationInformationUrl, data = {'time': getTime.isoformat()}) # 发向后端的time为isoformat
-            if res.status_code == 200:
-                res_Json = res.json()
-                if  res_Json['ret'] == 0:
-                    parameter = res_Json['vibration_Information'] # 后端传回的record_time为isoformat
-                    # _buf = 'Successfully get boring paramter.\n'
-                    # _buf += 'Record time: '\
-                    #         + datetime.datetime.fromisoformat(parameter['record_time']).strftime('%Y-%m-%d::%H:%M:%S') + '\n'
-                    # _buf += 'Propulsion rate: ' + str(parameter['propulsion_rate']) + '\n'
-                    # _buf += 'Total thrust: ' + str(parameter['total_thrust']) + '\n'
-                    # _buf += 'Cutterhead RPM: ' + str(parameter['RPM']) + '\n'
-                    # _buf += 'Cutterhead torque: ' + str(parameter['torque']) + '\n'
-                    # _buf += 'Cutterblade penetration: ' + str(parameter['penetration'])
-                    # self.sendText2DaemonWidget.emit(_buf)
-                    self.sendVibrationInformation.emit(parameter)
-                else:
-                    self.sendText2DaemonWidget.emit('Failed to get in-time vibration information.')
-            else:
-                self.sendText2DaemonWidget.emit('Unknown error occurred when establishing connection.')
-        except rq.exceptions.ConnectionError:
-            self.sendText2DaemonWidget.emit('Connection failed.')
-        except Exception as e:
-            raise e
-
-    def getRockInformation(self):
-        getTime = datetime.datetime.now().replace(microsecond=0)# - datetime.timedelta(seconds=2)
-        # self.sendText2DaemonWidget.emit('Asking for in-time boring parameters.\nCurrent time: '\
-        #                                 + getTime.strftime('%Y-%m-%d::%H:%M:%S'))
-        try:
-            res = self.session.post(self.rockInformationUrl, data = {'time': getTime.isoformat()}) # 发向后端的time为isoformat
-            if res.status_code == 200:
-                res_Json = res.json()
-                if  res_Json['ret'] == 0:
-                    parameter = res_Json['rock_Information'] # 后端传回的record_time为isoformat
-                    # _buf = 'Successfully get boring paramter.\n'
-                    # _buf += 'Record time: '\
-                    #         + datetime.datetime.fromisoformat(parameter['record_time']).strftime('%Y-%m-%d::%H:%M:%S') + '\n'
-                    # _buf += 'Propulsion rate: ' + str(parameter['propulsion_rate']) + '\n'
-                    # _buf += 'Total thrust: ' + str(parameter['total_thrust']) + '\n'
-                    # _buf += 'Cutterhead RPM: ' + str(parameter['RPM']) + '\n'
-                    # _buf += 'Cutterhead torque: ' + str(parameter['torque']) + '\n'
-                    # _buf += 'Cutterblade penetration: ' + str(parameter['penetration'])
-                    # self.sendText2DaemonWidget.emit(_buf)
-                    self.sendRockInformation.emit(parameter)
-                    self.rockInformation_Previous = parameter
-                else:
-                    self.rockInformation_Previous['record_time'] = getTime.isoformat()
-                    self.sendText2DaemonWidget.emit('Failed to get in-time rock information.')
-                    self.sendRockInformation.emit(self.rockInformation_Previous)
-            else:
-                self.sendText2DaemonWidget.emit('Unknown error occurred when establishing connection.')
-        except rq.exceptions.ConnectionError:
-            self.sendText2DaemonWidget.emit('Connection failed.')
-        except Exception as e:
-            raise e
-
-
-
+        self.stopPolling('getRockInformation')
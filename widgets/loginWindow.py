@@ -1,29 +1,98 @@
 import PySide2.QtWidgets as QtW, PySide2.QtCore as QtC
 from lib.publicModules import GlobalContainer as GC
-import requests as rq
-from widgets.mainWindow import MainWindow
-from ui.Ui_LoginWindow import Ui_LoginWindow
+from lib.globalParameters import globalParameters as gParam
+from lib.customUtilities.moduleWarmer import ModuleWarmer
+from lib.customUtilities.startupProfiler import startupProfiler
+from lib.customUtilities.uiLoader import uiFormLoader
+
+# 登录窗口显示后在后台预热的模块，按主窗口的导入顺序排列。
+# requests与主窗口均在登录时才导入，使登录窗口只依赖PySide2即可显示。
+warmUpModules = ['requests', 'numpy', 'pandas', 'qtawesome', 'matplotlib',
+                 'matplotlib.backends.backend_qt5agg', 'widgets.mainWindow']
+
+Ui_LoginWindow = uiFormLoader.formClass('Ui_LoginWindow') # 按gParam['ui_Mode']选择生成的或运行时加载的表单
+
 
 class LoginWindow(QtW.QWidget, Ui_LoginWindow):
     '''
     辅助掘进系统登录窗口。
+    登录请求在后台线程中发送，等待响应期间界面线程构建主窗口，认证成功后即可切换。
     '''
+    requestSignin = QtC.Signal(object, str, str)
+    requestMachineSignin = QtC.Signal(object, str, str, str)
+    requestPrewarm = QtC.Signal(object)
+
     def __init__(self):
         super(LoginWindow, self).__init__()
-        self.setupUi(self)
+        with startupProfiler.phase('LoginWindow.setupUi'):
+            self.setupUi(self)
         self.adjustUi()
-        self.session = None
+        self.connection = None
+        # 初始化登录线程
+        self.signinWorker = SigninWorker()
+        self.signinThread = QtC.QThread(self)
+        self.signinWorker.moveToThread(self.signinThread)
+        self.requestSignin.connect(self.signinWorker.signin)
+        self.requestMachineSignin.connect(self.signinWorker.signinMachine)
+        self.requestPrewarm.connect(self.signinWorker.prewarm)
+        self.signinWorker.signinSucceeded.connect(self.onSigninSucceeded)
+        self.signinWorker.signinFailed.connect(self.onSigninFailed)
+        self.signinWorker.machineSignedIn.connect(self.onMachineSignedIn)
+        self.signinWorker.machineSigninFailed.connect(self.onMachineSigninFailed)
+        self.signinThread.start()
+        QtW.QApplication.instance().aboutToQuit.connect(self.signinThread.quit)
+        # 服务器地址修改后预先建立TCP/TLS连接
+        self.domain_LineEdit.editingFinished.connect(self.prewarmConnection)
+        self.port_LineEdit.editingFinished.connect(self.prewarmConnection)
+        self.sslCheckBox.toggled.connect(self.prewarmConnection)
+        self.moduleWarmer = ModuleWarmer(warmUpModules, self)
+        self.moduleWarmer.finished.connect(self.prewarmConnection) # requests导入完成后即预先建立连接
+        QtC.QTimer.singleShot(0, self.moduleWarmer.start) # 待事件循环启动、窗口显示后再开始预热
 
     def adjustUi(self):
         '''
-        初始化高级选项折叠控件。
+        初始化高级选项折叠控件及登录进度条。
         '''
         self.collapseWidget.toggle_Button.setText(\
             QtC.QCoreApplication.translate("LoginWindow", u"\u9ad8\u7ea7\u9009\u9879", None)\
             )
         self.contentAreaLayout.setParent(None)
         self.collapseWidget.setContentLayout(self.contentAreaLayout)
+        # 登录请求等待期间显示的忙碌进度条
+        self.signin_ProgressBar = QtW.QProgressBar(self)
+        self.signin_ProgressBar.setRange(0, 0)
+        self.signin_ProgressBar.setTextVisible(False)
+        self.signin_ProgressBar.setMaximumHeight(8)
+        self.signin_ProgressBar.hide()
+        self.verticalLayout.insertWidget(self.verticalLayout.indexOf(self.collapseWidget), self.signin_ProgressBar)
+
+    def serverUrl(self):
+        '''利用高级选项控件中的协议、域名和端口生成服务器url'''
+        return 'http' + ('s' if self.sslCheckBox.isChecked() else '')\
+               + '://' + self.domain_LineEdit.text().strip()\
+               + ':' + self.port_LineEdit.text().strip() + '/'
 
+    def ensureConnection(self):
+        '''从连接管理器取得当前服务器的连接，登录线程与主窗口各子系统共用'''
+        from lib.services.connectionManager import connectionManager # requests通常已由moduleWarmer在后台导入
+        self.connection = connectionManager.connection(self.serverUrl())
+        return self.connection
+
+    @QtC.Slot()
+    def prewarmConnection(self):
+        '''在后台线程中预先与服务器建立连接，登录请求可直接复用'''
+        if self.domain_LineEdit.text().strip() and self.port_LineEdit.text().strip():
+            self.requestPrewarm.emit(self.ensureConnection())
+
+    def setSigninPending(self, pending):
+        '''登录请求等待期间禁用输入控件。服务器地址同样禁用，避免prewarmConnection替换正在登录的连接'''
+        self.signin_ProgressBar.setVisible(pending)
+        self.login_PushButton.setEnabled(not pending)
+        self.username_LineEdit.setEnabled(not pending)
+        self.password_LineEdit.setEnabled(not pending)
+        self.domain_LineEdit.setEnabled(not pending)
+        self.port_LineEdit.setEnabled(not pending)
+        self.sslCheckBox.setEnabled(not pending)
 
     @QtC.Slot()
     def on_advance_ToolButton_pressed(self):
@@ -45,33 +114,126 @@ class LoginWindow(QtW.QWidget, Ui_LoginWindow):
     @QtC.Slot()
     def on_login_PushButton_clicked(self):
         '''登录按钮的触发槽'''
-        # 获取控件中输入的用户名及密码
-        username = self.username_LineEdit.text().strip()
-        password = self.password_LineEdit.text().strip()
-        # 如果第一次登陆，创建Session对象
-        if not self.session:
-            session = rq.Session()
-        # 利用高级选项控件中的域名和端口创建登录url
-        url = 'http' + ('s' if self.sslCheckBox.isChecked() else '')\
-              + '://' + self.domain_LineEdit.text().strip()\
-              + ':' + self.port_LineEdit.text().strip()\
-              + '/api/mgr/signin'
-        # 向服务端post登录信息，获得响应。消息体为json格式
-        res = session.post(url, json = {
-            "action" : "signin",
-            "username" : username,
-            "password" : password
-        })
-        # 解码响应消息体，若返回值ret不为零，说明登录失败，显示失败原因
-        resObj = res.json()
-        if resObj['ret'] != 0:
-            QtW.QMessageBox.warning(self, '登陆失败', resObj['msg'])
+        if not self.login_PushButton.isEnabled(): # 登录请求尚未返回
             return
-        # 若ret为0，说明登录成功，打开主窗口并隐藏登录窗口
-        if not GC.mainWindow: # 如果GlobalContainer中没有已创建的主窗口实例，则创建
-            GC.mainWindow = MainWindow({'Session': session,
+        startupProfiler.mark('sign-in requested')
+        self.setSigninPending(True)
+        # 在后台线程中post登录信息
+        self.requestSignin.emit(self.ensureConnection(),
+                                self.username_LineEdit.text().strip(),
+                                self.password_LineEdit.text().strip())
+        # 等待响应期间构建主窗口。先返回事件循环一次，使进度条显示出来
+        QtC.QTimer.singleShot(0, self.prepareMainWindow)
+
+    @QtC.Slot()
+    def prepareMainWindow(self):
+        '''如果GlobalContainer中没有已创建的主窗口实例，则创建（不显示，也不开始后台监控）'''
+        if GC.mainWindow:
+            return
+        with startupProfiler.phase('import widgets.mainWindow'):
+            from widgets.mainWindow import MainWindow # 通常已由moduleWarmer在后台导入
+        with startupProfiler.phase('MainWindow.__init__'):
+            GC.mainWindow = MainWindow({'Connection': self.connection,
                                         'domain': self.domain_LineEdit.text().strip(),
                                         'port': self.port_LineEdit.text().strip(),
                                         'protocol': 'http' + ('s' if self.sslCheckBox.isChecked() else '') + '://'})
+
+    def discardMainWindow(self):
+        '''丢弃预先构建、尚未开始后台监控的主窗口，下次登录时按当时的服务器地址重新构建'''
+        if GC.mainWindow and not GC.mainWindow.isMonitoring():
+            GC.mainWindow.discard()
+            GC.mainWindow = None
+
+    @QtC.Slot()
+    def onSigninSucceeded(self):
+        '''登录成功，打开主窗口、开始后台监控并隐藏登录窗口'''
+        if GC.mainWindow and GC.mainWindow.connection is not self.connection: # 预先构建的主窗口连接的不是本次登录的服务器
+            self.discardMainWindow()
+        self.prepareMainWindow() # 登录响应先于主窗口构建返回时在此构建
+        self.setSigninPending(False)
+        GC.mainWindow.startMonitoring()
         GC.mainWindow.show()
-        self.hide()
\ No newline at end of file
+        startupProfiler.mark('main window shown')
+        self.hide()
+        # 以相同的凭据在后台登录其他机器，登录成功后加入主窗口
+        from lib.services.connectionManager import connectionManager
+        for server in gParam['mm_Servers']:
+            if server['name'] not in GC.mainWindow.machines:
+                self.requestMachineSignin.emit(connectionManager.connection(server['urlHead']), server['name'],
+                                               self.username_LineEdit.text().strip(),
+                                               self.password_LineEdit.text().strip())
+
+    @QtC.Slot(object, str)
+    def onMachineSignedIn(self, connection, name):
+        GC.mainWindow.addMachine(name, connection)
+
+    @QtC.Slot(str, str)
+    def onMachineSigninFailed(self, name, msg):
+        GC.mainWindow.statusBarShowMessage('登录' + name + '失败：' + msg, gParam['sb_Tout'], 1)
+
+    @QtC.Slot(str)
+    def onSigninFailed(self, msg):
+        '''登录失败，显示失败原因。预先构建的主窗口连接的可能是错误的服务器地址，予以丢弃'''
+        self.setSigninPending(False)
+        self.discardMainWindow()
+        QtW.QMessageBox.warning(self, '登陆失败', msg)
+
+
+class SigninWorker(QtC.QObject):
+    '''
+    登录线程。
+    登录及预先建立连接均通过连接管理器中的ServerConnection进行，认证cookie及已建立的连接由主窗口各子系统共用。
+    '''
+    signinSucceeded = QtC.Signal()
+    signinFailed = QtC.Signal(str)
+    machineSignedIn = QtC.Signal(object, str)
+    machineSigninFailed = QtC.Signal(str, str)
+
+    @QtC.Slot(object)
+    def prewarm(self, connection):
+        '''
+        向服务器发送一次轻量请求，使Session的连接池中保留已完成TCP/TLS握手的连接。
+        失败不影响登录，登录时会重新报告连接错误。
+        '''
+        import requests as rq
+        try:
+            connection.head(connection.urlHead, timeout = gParam['pw_Tout'] / 1000)
+        except rq.RequestException:
+            pass
+
+    @QtC.Slot(object, str, str)
+    def signin(self, connection, username, password):
+        import requests as rq
+        try:
+            resObj = connection.signin(username, password)
+        except rq.Timeout:
+            self.signinFailed.emit('登录超时，请检查网络连接。')
+            return
+        except rq.ConnectionError:
+            self.signinFailed.emit('无法连接服务器，请检查高级选项中的地址和端口。')
+            return
+        except (rq.RequestException, ValueError):
+            self.signinFailed.emit('服务器响应无效。')
+            return
+        # 解码响应消息体，若返回值ret不为零，说明登录失败
+        if resObj.get('ret') != 0:
+            self.signinFailed.emit(str(resObj.get('msg', '未知错误。')))
+            return
+        self.signinSucceeded.emit()
+
+    @QtC.Slot(object, str, str, str)
+    def signinMachine(self, connection, name, username, password):
+        '''登录其他监控的机器'''
+        import requests as rq
+        try:
+            resObj = connection.signin(username, password)
+        except rq.RequestException:
+            self.machineSigninFailed.emit(name, '无法连接服务器。')
+            return
+        except ValueError:
+            self.machineSigninFailed.emit(name, '服务器响应无效。')
+            return
+        if resObj.get('ret') != 0:
+            self.machineSigninFailed.emit(name, str(resObj.get('msg', '未知错误。')))
+            return
+        self.machineSignedIn.emit(connection, name)
@@ -2,15 +2,24 @@ import datetime
 import sys, os
 import PySide2.QtWidgets as QtW, PySide2.QtCore as QtC, PySide2.QtGui as QtG
 import numpy as np
-import pandas as pd
-import qtawesome as qta
 from lib.publicModules import GlobalContainer as GC
 from lib.globalParameters import globalParameters as gParam
+from lib.customUtilities.repaintScheduler import RepaintScheduler
+from lib.customUtilities.iconProvider import iconProvider
+from lib.customUtilities.startupProfiler import startupProfiler
+from lib.customWidgets.matplotlibWidget import QMatplotlibWidget
+from lib.customModels.pagedQueryModel import QPagedQueryModel
 from widgets.daemonWidget import DaemonWidget
-from lib.customWidgets.ipythonConsoleWidget import QIPythonConsoleWidget
-from ui.Ui_MainWindow import Ui_MainWindow
+from lib.services.jobExecutor import JobExecutor
+from lib.services.pollScheduler import PollScheduler
+from lib.services.machineContext import MachineContext
+from lib.services.timeSeriesStore import TimeSeriesStore
+from lib.services.connectionManager import connectionManager
+from lib.customUtilities.uiLoader import uiFormLoader
 from widgets.mdiSubWidgets import *
 
+Ui_MainWindow = uiFormLoader.formClass('Ui_MainWindow') # 按gParam['ui_Mode']选择生成的或运行时加载的表单
+
 
 class MainWindow(QtW.QMainWindow, Ui_MainWindow):
     '''
@@ -29,29 +38,53 @@ class MainWindow(QtW.QMainWindow, Ui_MainWindow):
     def __init__(self, connection, disableConsole = True):
         super(MainWindow, self).__init__()
         # 初始化UI（Designer规定动作）
-        self.setupUi(self)
+        with startupProfiler.phase('MainWindow.setupUi'):
+            self.setupUi(self)
         # 初始化参数
         self.__currentStatusBarPriority = 0
         self.__disableConsole = disableConsole
-        self.session = connection['Session']
+        self.connection = connection['Connection'] # 连接管理器中的已认证连接，各子系统共用
         self.serverDomain = connection['domain']
         self.serverPort = connection['port']
         self.connectionProtocol = connection['protocol']
         self.urlHead = self.connectionProtocol + self.serverDomain + ':' + self.serverPort + '/'
         # 初始化状态栏的连接
         self.statusBar().messageChanged.connect(self.resetStatusBarPriority)
+        # 初始化分析任务进程池，分析窗体通过GC.jobExecutor提交任务
+        if not GC.jobExecutor:
+            GC.jobExecutor = JobExecutor(gParam['je_MW'])
+        # 初始化轮询调度器，全部机器的后台数据获取共用一个计时器和线程池
+        if not GC.pollScheduler:
+            GC.pollScheduler = PollScheduler(gParam['ps_MW'])
+        # 初始化振动频谱分析线程，全部机器的频谱计算共用该线程，不占用界面线程
+        self.spectralThread = QtC.QThread()
+        self.spectralThread.start()
         # 初始化MDI区域
-        self.initializeMDIArea()
+        with startupProfiler.phase('MainWindow.initializeMDIArea'):
+            self.initializeMDIArea()
         # 调整UI
-        self.adjustUi()
+        with startupProfiler.phase('MainWindow.adjustUi'):
+            self.adjustUi()
         # 初始化后台监控控件
-        self.daemonWidget = DaemonWidget(self)
-        # 初始化后台监控线程
-        self.daemonThread = QtC.QThread()
-        self.daemonThread.start()
-        self.daemonWidget.daemonWorker.moveToThread(self.daemonThread)
-        # 显示后台监控控件，正式发布后隐藏
-        self.daemonWidget.show()
+        with startupProfiler.phase('MainWindow.DaemonWidget'):
+            self.daemonWidget = DaemonWidget(self)
+        self.repaintScheduler.repainted.connect(self.daemonWidget.onRepainted) # 端到端时延在实际重绘后统计
+        self.__monitoring = False # 后台监控在登录认证成功后由startMonitoring开始
+        # 初始化登录的机器，其监控窗口为monitor_SubWindow。其他机器由addMachine添加
+        self.machines = {} # 机器名称 → MachineContext
+        with startupProfiler.phase('MainWindow.addMachine'):
+            self.primaryMachine = self.addMachine(self.serverDomain + ':' + self.serverPort, self.connection,
+                                                  self.monitor_SubWidget, self.monitor_SubWindow)
+        # 登录机器的查询客户端、掘进参数缓冲区/聚合金字塔/衍生指标引擎及频谱分析器
+        self.queryClient = self.primaryMachine.queryClient
+        self.queryModel = QPagedQueryModel(self.queryClient, self) # 查询窗口的结果表格使用，按页加载
+        self.boringParameterBuffer = self.primaryMachine.boringParameterBuffer
+        self.boringParameterPyramid = self.primaryMachine.boringParameterPyramid
+        self.indicatorEngine = self.primaryMachine.indicatorEngine
+        self.spectralWorker = self.primaryMachine.spectralWorker
+        if startupProfiler.enabled: # 记录首个掘进参数到达及首次绘图的时刻
+            self.daemonWidget.daemonWorker.sendBoringParameter.connect(self.onFirstBoringParameter)
+            self.repaintScheduler.repainted.connect(self.onFirstRepaint)
         # 后台监控相关信号连接
         self.startCheckAlive.connect(self.daemonWidget.startCheckAlive)
         self.stopCheckAlive.connect(self.daemonWidget.stopCheckAlive)
@@ -63,16 +96,49 @@ class MainWindow(QtW.QMainWindow, Ui_MainWindow):
         self.stopGetVibrationInformation.connect(self.daemonWidget.stopGetVibrationInformation)
         self.startGetRockInformation.connect(self.daemonWidget.startGetRockInformation)
         self.stopGetRockInformation.connect(self.daemonWidget.stopGetRockInformation)
-        # 发送开始后台监控的信号
+
+        # 初始化控制台
+        if not disableConsole:
+            with startupProfiler.phase('MainWindow.initConsole'):
+                self.initConsole()
+        startupProfiler.mark('MainWindow initialized')
+
+    def startMonitoring(self):
+        """
+        发送开始后台监控的信号。主窗口可在登录请求返回前构建，认证成功后再调用本方法；重复调用无效。
+        """
+        if self.__monitoring:
+            return
+        self.__monitoring = True
+        # 显示后台监控控件，正式发布后隐藏
+        self.daemonWidget.show()
+        for machine in self.machines.values():
+            self.backfillFromRecorder(machine)
         self.startCheckAlive.emit(gParam['ca_Int'])
         self.startGetBoringParameter.emit(gParam['gbp_Int'])
         self.startGetMuckInformation.emit(gParam['gmi_Int'])
         self.startGetVibrationInformation.emit(gParam['gvi_Int'])
         self.startGetRockInformation.emit(gParam['gri_Int'])
 
-        # 初始化控制台
-        if not disableConsole:
-            self.initConsole()
+    def isMonitoring(self):
+        return self.__monitoring
+
+    def discard(self):
+        """
+        丢弃尚未开始后台监控的主窗口（登录失败，或登录时的服务器地址已改变）：停止其线程、关闭日志文件并延后删除。
+        全部机器共用的轮询调度器及分析任务进程池保留，供重新构建的主窗口使用。
+        """
+        for name in list(self.machines):
+            self.daemonWidget.removeWorker(name)
+        self.machines = {}
+        self.spectralThread.quit()
+        self.spectralThread.wait()
+        self.queryModel.loaderThread.quit()
+        self.queryModel.loaderThread.wait()
+        self.daemonWidget.setLogFile(None)
+        self.daemonWidget.setBinaryLogFile(None)
+        self.daemonWidget.deleteLater()
+        self.deleteLater()
 
     def initializeMDIArea(self):
         # 初始化MDI子窗口
@@ -90,6 +156,77 @@ class MainWindow(QtW.QMainWindow, Ui_MainWindow):
         self.muckAnalysis_SubWindow = self.mdiArea.subWindowList()[1]
         self.vibrationAnalysis_SubWindow = self.mdiArea.subWindowList()[2]
         self.query_SubWindow = self.mdiArea.subWindowList()[3]
+        # 初始化重绘调度器：子窗口中的绘图控件只在可见时按限定帧率重绘，隐藏时只积累数据
+        self.repaintScheduler = RepaintScheduler(gParam['rp_FPS'], self)
+        for subWindow in self.mdiArea.subWindowList():
+            self.attachRepaintScheduler(subWindow)
+
+    def attachRepaintScheduler(self, subWindow):
+        for plotWidget in subWindow.widget().findChildren(QMatplotlibWidget):
+            plotWidget.setRepaintScheduler(self.repaintScheduler, subWindow)
+
+    def addMachine(self, name, connection, monitor = None, subWindow = None):
+        """
+        添加一台监控的机器，返回其MachineContext。
+        参数：
+            1. name: 机器名称。同名机器已存在时直接返回。
+            2. connection: 连接管理器中已登录的ServerConnection。
+            3. monitor, subWindow: 机器的监控窗口，为None时新建一个监控窗口。
+        机器共用连接管理器、轮询调度器、频谱线程及重绘调度器，只单独持有数据结构和监控窗口。
+        """
+        if name in self.machines:
+            return self.machines[name]
+        machine = MachineContext(name, connection, self)
+        machine.spectralWorker.moveToThread(self.spectralThread)
+        if monitor is None:
+            monitor = Monitor_SubWidget()
+            subWindow = self.mdiArea.addSubWindow(monitor)
+            subWindow.setWindowTitle(monitor.windowTitle() + ' - ' + name)
+            self.attachRepaintScheduler(subWindow)
+            subWindow.destroyed.connect(lambda: self.removeMachine(name, False))
+            subWindow.show()
+        machine.monitor, machine.subWindow = monitor, subWindow
+        worker = machine.daemonWorker
+        worker.sendBoringParameter.connect(monitor.plotBoringParameter)
+        worker.sendMuckInformation.connect(monitor.plotMuckInformation)
+        worker.sendVibrationInformation.connect(monitor.plotVibrationInformation)
+        worker.sendRockInformation.connect(monitor.plotRockInformation)
+        # 端到端时延在监控窗口实际重绘后统计；主窗口已开始监控时立即开始轮询
+        self.daemonWidget.addWorker(name, worker, subWindow)
+        self.machines[name] = machine
+        if self.__monitoring:
+            self.backfillFromRecorder(machine)
+        return machine
+
+    def backfillFromRecorder(self, machine):
+        """
+        本机运行了无界面记录器时，从其数据库载入该机器最近gParam['hr_Backfill']秒的掘进参数。
+        """
+        if not gParam['hr_Backfill'] or not os.path.exists(gParam['hr_Store']):
+            return
+        store = TimeSeriesStore(gParam['hr_Store'])
+        try:
+            since = machine.daemonWorker.clock.serverNowMs() - gParam['hr_Backfill'] * 1000 # 记录时间为服务端时间
+            count = machine.backfill(store, since)
+        finally:
+            store.close()
+        if count:
+            self.daemonWidget.addText('Loaded ' + str(count) + ' recorded boring parameters of ' + machine.name + '.')
+
+    def removeMachine(self, name, closeMonitor = True):
+        """
+        停止一台机器的轮询并移除。登录的机器不可移除。
+        """
+        machine = self.machines.get(name)
+        if machine is None or machine is self.primaryMachine:
+            return
+        del self.machines[name]
+        self.daemonWidget.removeWorker(name)
+        self.repaintScheduler.unregisterWindow(machine.subWindow) # 子窗口被删除前注销，调度器不再访问其中的控件
+        machine.spectralWorker.deleteLater()
+        if closeMonitor:
+            machine.subWindow.close()
+        machine.deleteLater()
 
     def adjustUi(self):
         # 定义窗口按钮相关映射字典
@@ -123,9 +260,11 @@ class MainWindow(QtW.QMainWindow, Ui_MainWindow):
         font.setBold(True)
         font.setWeight(75)
         self.toolBar.setFont(font)
+        # 预先渲染toolbar图标的全部状态（焦点为gold，其余为deepskyblue），之后切换焦点只读取缓存
+        iconProvider.preload(self.iconString_Mapper.values(), ('gold', 'deepskyblue'), self.toolBar_IconScale)
         # 设置toolbar图标
         for k, v in self.iconString_Mapper.items():
-            k.setIcon(qta.icon(v, color = 'deepskyblue', scale_factor = self.toolBar_IconScale))
+            k.setIcon(iconProvider.icon(v, 'deepskyblue', self.toolBar_IconScale))
         self.toolBar.setToolButtonStyle(QtC.Qt.ToolButtonTextUnderIcon)
         # 初始化mdi子窗口状态
         self.monitor_SubWindow.setWindowState(self.monitor_SubWindow.windowState() ^ QtC.Qt.WindowMaximized)
@@ -172,7 +311,10 @@ class MainWindow(QtW.QMainWindow, Ui_MainWindow):
                 status = QtW.QMessageBox.question(self, '确认', '确定要退出TBM智能辅助掘进系统？')
                 if status == QtW.QMessageBox.Yes:
                     event.accept()
-                    self.daemonThread.terminate()
+                    GC.pollScheduler.shutdown()
+                    self.spectralThread.quit()
+                    GC.jobExecutor.shutdown()
+                    connectionManager.close()
                     self.daemonWidget.close()
                     if not self.__disableConsole:
                         self.console.close()
@@ -192,8 +334,8 @@ class MainWindow(QtW.QMainWindow, Ui_MainWindow):
         elif event.type() == QtC.QEvent.WindowStateChange and watched.isMinimized():
             if watched in self.action_Mapper.keys():
                 self.action_Mapper[watched].setIcon(
-                    qta.icon(self.iconString_Mapper[self.action_Mapper[watched]],
-                             color = 'deepskyblue', scale_factor = self.toolBar_IconScale))
+                    iconProvider.icon(self.iconString_Mapper[self.action_Mapper[watched]],
+                                      'deepskyblue', self.toolBar_IconScale))
                 event.accept()
                 return super(MainWindow, self).eventFilter(watched, event)
         return super(MainWindow, self).eventFilter(watched, event)
@@ -208,17 +350,33 @@ class MainWindow(QtW.QMainWindow, Ui_MainWindow):
     def resetStatusBarPriority(self):
         self.__currentStatusBarPriority = 0
 
+    @QtC.Slot(object)
+    def onFirstBoringParameter(self, parameter):
+        """
+        启动分析：记录首个掘进参数到达的时刻，仅触发一次。
+        """
+        self.daemonWidget.daemonWorker.sendBoringParameter.disconnect(self.onFirstBoringParameter)
+        startupProfiler.mark('first boring parameter received')
+        startupProfiler.writeReport()
+
+    @QtC.Slot(object)
+    def onFirstRepaint(self, widget):
+        """
+        启动分析：记录首次绘制数据的时刻并写出报告，仅触发一次。
+        """
+        self.repaintScheduler.repainted.disconnect(self.onFirstRepaint)
+        startupProfiler.mark('first plotted sample')
+        startupProfiler.writeReport()
+
     @QtC.Slot(QtC.QObject)
     def onSubWindowActivated(self, subWindow):
         if subWindow:
-            action = self.action_Mapper[subWindow]
-            if not subWindow.isMinimized(): # 焦点切换至最小化的窗口时图标不变色
-                action.setIcon(qta.icon(self.iconString_Mapper[action], color = 'gold',
-                                        scale_factor = self.toolBar_IconScale))
+            action = self.action_Mapper.get(subWindow)
+            if action and not subWindow.isMinimized(): # 焦点切换至最小化的窗口时图标不变色；其他机器的监控窗口没有对应按钮
+                action.setIcon(iconProvider.icon(self.iconString_Mapper[action], 'gold', self.toolBar_IconScale))
             for k, v in self.action_Mapper.items():
                 if k is not subWindow:
-                    v.setIcon(qta.icon(self.iconString_Mapper[v], color = 'deepskyblue',
-                                       scale_factor = self.toolBar_IconScale))
+                    v.setIcon(iconProvider.icon(self.iconString_Mapper[v], 'deepskyblue', self.toolBar_IconScale))
 
     @QtC.Slot(bool)
     def onActionToggled(self, triggered):
@@ -236,8 +394,7 @@ class MainWindow(QtW.QMainWindow, Ui_MainWindow):
                     self.mdiArea.subWindowActivated.emit(subWindow) # 发出焦点转移信号，强制图标变色
                 else:# 窗口为当前焦点且未被最小化，此时按下按钮为关闭窗口
                     subWindow.hide()
-                    action.setIcon(qta.icon(iconString, color = 'deepskyblue',
-                                            scale_factor = self.toolBar_IconScale))
+                    action.setIcon(iconProvider.icon(iconString, 'deepskyblue', self.toolBar_IconScale))
             else:# 窗口不是当前焦点
                 if subWindow.isMinimized(): # 窗口不是当前焦点，但被最小化
                     subWindow.setWindowState(subWindow.windowState() ^ QtC.Qt.WindowMinimized)  # 还原窗口
@@ -268,7 +425,10 @@ class MainWindow(QtW.QMainWindow, Ui_MainWindow):
     def initConsole(self):
         """
         初始化调试控制台。
+        qtconsole/IPython导入耗时较长，仅在启用控制台时导入。
         """
+        import pandas as pd
+        from lib.customWidgets.ipythonConsoleWidget import QIPythonConsoleWidget
         self.console = QIPythonConsoleWidget(self, self)
         self.console.push({"sys": sys, "os": os, "QtC": QtC, "QtW": QtW, "QtG": QtG, "np": np, "pd": pd})
 
@@ -276,13 +436,12 @@ class MainWindow(QtW.QMainWindow, Ui_MainWindow):
 if __name__ == '__main__':
     import argparse
     from lib.customUtilities.customFunctions import str2bool
-    import requests as rq
     parser = argparse.ArgumentParser()
     parser.add_argument('--disableConsole', '-d', default='True')
     args=parser.parse_args()
     _disableConsole, ok = str2bool(args.disableConsole)
     app = QtW.QApplication(sys.argv)
-    win = MainWindow({'Session': rq.Session(),
+    win = MainWindow({'Connection': connectionManager.connection('http://127.0.0.1:80/'),
                       'domain': '127.0.0.1',
                       'port': '80',
                       'protocol': 'http://'},